@@ -10,29 +10,2594 @@ import sys
 import subprocess
 import os
 import re
+import mmap
+import zlib
+import lzma
+import gzip
+import bz2
+import json
+import zipfile
+import tempfile
+import shlex
+import secrets
+import socket
+import fnmatch
+import asyncio
+import xml.etree.ElementTree as ElementTree
+import hashlib
+import random
+import shutil
+import sqlite3
+import queue
+import collections
+import contextlib
+import bisect
+import array
+import html
+import threading
+import time
+import multiprocessing
+import concurrent.futures
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QPushButton, QLabel, QLineEdit, QComboBox, QTextEdit,
     QFileDialog, QGroupBox, QCheckBox, QSpinBox, QDoubleSpinBox,
-    QProgressBar, QMessageBox, QListWidget, QSplitter
+    QProgressBar, QMessageBox, QListWidget, QSplitter, QTableWidget, QTableWidgetItem,
+    QAbstractScrollArea, QToolTip
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QProcess, QTimer, QSettings
-from PyQt6.QtGui import QFont, QTextCursor, QColor, QPalette
+from PyQt6.QtCore import (Qt, QThread, QObject, pyqtSignal, QProcess, QTimer, QSettings,
+                          QFileSystemWatcher, QSocketNotifier)
+from PyQt6.QtGui import QFont, QTextCursor, QColor, QPalette, QShortcut, QKeySequence, QPainter
+
+# NumPy is optional; it speeds up whole-image work such as ROM-set splitting
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# zstandard is optional; backups fall back to xz (lzma) without it
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Record/replay stand-in shipped next to this file (see minipro_replay.py)
+REPLAY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minipro_replay.py")
+
+# minipro flag -> operation name, checked in order
+OPERATION_FLAGS = [
+    ("-l", "list"), ("-r", "read"), ("-w", "write"), ("-m", "verify"),
+    ("-E", "erase"), ("-b", "blank"), ("-T", "logic"), ("-z", "pin_check"),
+    ("-D", "chip_id"), ("-k", "detect"), ("-d", "info"), ("-F", "firmware"),
+    ("-a", "auto_detect"), ("-t", "hardware_check"), ("-Q", "query"),
+]
+
+
+def option_value(args, flag):
+    """Return the value following a flag in a minipro argument string"""
+    try:
+        tokens = shlex.split(args)
+    except ValueError:
+        return None
+    if flag in tokens:
+        index = tokens.index(flag)
+        if index + 1 < len(tokens):
+            return tokens[index + 1]
+    return None
+
+
+def operation_name(args):
+    """Name the operation a minipro argument string performs"""
+    try:
+        tokens = shlex.split(args)
+    except ValueError:
+        tokens = args.split()
+    for flag, name in OPERATION_FLAGS:
+        if flag in tokens:
+            return name
+    return "other"
+
+
+# Image file helpers
+
+def image_format(path):
+    """Guess an image's format from its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".hex", ".ihex", ".ihx"):
+        return "ihex"
+    if extension in (".srec", ".s19", ".s28", ".s37", ".mot"):
+        return "srec"
+    return "binary"
+
+
+def parse_ihex(text):
+    """Decode Intel HEX text into bytes, filling gaps with 0xFF"""
+    data = bytearray()
+    base = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith(":"):
+            continue
+        record = bytes.fromhex(line[1:])
+        count, address, kind = record[0], int.from_bytes(record[1:3], "big"), record[3]
+        payload = record[4:4 + count]
+        if kind == 0x00:
+            start = base + address
+            if len(data) < start + count:
+                data.extend(b"\xff" * (start + count - len(data)))
+            data[start:start + count] = payload
+        elif kind == 0x01:
+            break
+        elif kind == 0x02:
+            base = int.from_bytes(payload, "big") << 4
+        elif kind == 0x04:
+            base = int.from_bytes(payload, "big") << 16
+    return bytes(data)
+
+
+def parse_srec(text):
+    """Decode Motorola S-record text into bytes, filling gaps with 0xFF"""
+    address_sizes = {"1": 2, "2": 3, "3": 4}
+    data = bytearray()
+    for line in text.splitlines():
+        line = line.strip()
+        if len(line) < 4 or line[0] != "S" or line[1] not in address_sizes:
+            continue
+        record = bytes.fromhex(line[2:])
+        size = address_sizes[line[1]]
+        start = int.from_bytes(record[1:1 + size], "big")
+        payload = record[1 + size:-1]
+        if len(data) < start + len(payload):
+            data.extend(b"\xff" * (start + len(payload) - len(data)))
+        data[start:start + len(payload)] = payload
+    return bytes(data)
+
+
+def format_ihex(data, width=16):
+    """Encode bytes as Intel HEX text"""
+    lines = []
+    upper = -1
+    for offset in range(0, len(data), width):
+        if offset >> 16 != upper:
+            upper = offset >> 16
+            record = bytes([2, 0, 0, 4]) + upper.to_bytes(2, "big")
+            lines.append(":" + (record + bytes([-sum(record) & 0xFF])).hex().upper())
+        chunk = bytes(data[offset:offset + width])
+        record = bytes([len(chunk)]) + (offset & 0xFFFF).to_bytes(2, "big") + b"\x00" + chunk
+        lines.append(":" + (record + bytes([-sum(record) & 0xFF])).hex().upper())
+    lines.append(":00000001FF")
+    return "\n".join(lines) + "\n"
+
+
+def format_srec(data, width=16):
+    """Encode bytes as Motorola S3 records"""
+    lines = []
+    for offset in range(0, len(data), width):
+        chunk = bytes(data[offset:offset + width])
+        record = bytes([len(chunk) + 5]) + offset.to_bytes(4, "big") + chunk
+        lines.append("S3" + (record + bytes([~sum(record) & 0xFF])).hex().upper())
+    record = bytes([5, 0, 0, 0, 0])
+    lines.append("S7" + (record + bytes([~sum(record) & 0xFF])).hex().upper())
+    return "\n".join(lines) + "\n"
+
+
+def load_image(path):
+    """Return an image's bytes as a buffer
+    
+    Binary dumps are memory-mapped read-only, so every process working on
+    the same dump shares its pages through the page cache.
+    """
+    kind = image_format(path)
+    if kind != "binary":
+        with open(path) as f:
+            text = f.read()
+        return parse_ihex(text) if kind == "ihex" else parse_srec(text)
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# Post-read pipeline stages (module level so worker processes can unpickle them)
+
+def stage_hash(path):
+    """SHA-256 and CRC32 of the dump"""
+    image = load_image(path)
+    return (f"SHA-256 {hashlib.sha256(image).hexdigest()}  "
+            f"CRC32 {zlib.crc32(image) & 0xFFFFFFFF:08X}  ({len(image)} bytes)")
+
+
+def stage_convert(path, target):
+    """Write the dump in another format next to the original
+    
+    An existing file is never replaced: the output gets the first free
+    name of base.ext, base-1.ext, base-2.ext, ...
+    """
+    image = load_image(path)
+    base, _ = os.path.splitext(path)
+    extension = {"ihex": ".hex", "srec": ".srec", "binary": ".bin"}[target]
+    if os.path.abspath(base + extension) == os.path.abspath(path):
+        return f"already {target}, nothing to convert"
+    if target == "binary":
+        data, mode = image, "xb"
+    else:
+        data, mode = format_ihex(image) if target == "ihex" else format_srec(image), "x"
+    output, n = base + extension, 0
+    while True:
+        try:
+            with open(output, mode) as f:
+                f.write(data)
+            return f"wrote {output}"
+        except FileExistsError:
+            n += 1
+            output = f"{base}-{n}{extension}"
+
+
+def stage_blank_regions(path, min_length=256):
+    """Find runs of erased (0xFF) or zeroed bytes"""
+    image = load_image(path)
+    regions = []
+    for fill in (b"\xff", b"\x00"):
+        pattern = re.compile(re.escape(fill) + b"{%d,}" % min_length)
+        regions.extend((m.start(), m.end() - m.start(), fill[0]) for m in pattern.finditer(image))
+    if not regions:
+        return "no blank regions"
+    regions.sort()
+    blank = sum(length for _, length, _ in regions)
+    largest = max(regions, key=lambda region: region[1])
+    return (f"{len(regions)} blank region(s), {blank} bytes ({100 * blank / len(image):.1f}%); "
+            f"largest 0x{largest[0]:X}+0x{largest[1]:X} (0x{largest[2]:02X})")
+
+
+def stage_compare(path, golden, chunk_size=1 << 16):
+    """Compare the dump with a golden image"""
+    image = load_image(path)
+    reference = load_image(golden)
+    differing = 0
+    first = None
+    for offset in range(0, min(len(image), len(reference)), chunk_size):
+        a = image[offset:offset + chunk_size]
+        b = reference[offset:offset + chunk_size]
+        if a != b:
+            # Only mismatching chunks are walked byte by byte
+            for index, (x, y) in enumerate(zip(a, b)):
+                if x != y:
+                    differing += 1
+                    if first is None:
+                        first = offset + index
+    if len(image) != len(reference):
+        size_note = f", sizes differ ({len(image)} vs {len(reference)})"
+    else:
+        size_note = ""
+    if not differing and not size_note:
+        return f"matches {os.path.basename(golden)}"
+    where = f"first at 0x{first:X}" if first is not None else "common part equal"
+    return f"MISMATCH: {differing} byte(s) differ, {where}{size_note}"
+
+
+def run_stage(name, function, args):
+    """Run one stage and time it (executed in a worker process)"""
+    started = time.perf_counter()
+    try:
+        summary = function(*args)
+        ok = not summary.startswith("MISMATCH")
+    except Exception as e:
+        summary, ok = f"error: {e}", False
+    return name, summary, time.perf_counter() - started, ok
+
+
+# Per-part serialization
+
+def data_dir(*parts):
+    """Per-user data directory for the GUI's local stores"""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    path = os.path.join(base, "minipro-gui", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write(path, data):
+    """Replace a file's contents so readers see either the old or the new version"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Make the rename itself durable
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def encode_serial(number, length, encoding):
+    """Encode a serial number as little/big-endian binary or zero-padded ASCII"""
+    if encoding == "ascii":
+        text = str(number).rjust(length, "0")
+        if len(text) > length:
+            raise ValueError(f"serial {number} does not fit in {length} ASCII digits")
+        return text.encode("ascii")
+    byteorder = "little" if encoding == "little-endian" else "big"
+    return number.to_bytes(length, byteorder)
+
+
+def parse_mac(text):
+    """Parse a MAC address like 02:00:00:00:00:00 into an integer"""
+    digits = re.sub(r"[^0-9a-fA-F]", "", text)
+    if len(digits) != 12:
+        raise ValueError(f"invalid MAC address: {text}")
+    return int(digits, 16)
+
+
+def format_mac(value):
+    """Format an integer as a colon-separated MAC address"""
+    return ":".join(f"{b:02X}" for b in value.to_bytes(6, "big"))
+
+
+class SerialAllocator:
+    """Crash-safe sequence numbers for per-part serialization
+    
+    A number is reserved before programming and committed only after a
+    successful write. Committed numbers are appended to an fsync'd log
+    before the state file advances, so a crash never skips a number. A
+    crash after a write but before commit() leaves the number reserved, and
+    it is handed out again to the next part.
+    """
+    
+    def __init__(self, name, start=1):
+        self.path = os.path.join(data_dir("serials"), f"{name}.json")
+        self.log_path = os.path.join(data_dir("serials"), f"{name}.log")
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {"next": start, "pending": None}
+        self.recover()
+        self.ensure_start(start)
+        
+    def recover(self):
+        """Finish a commit interrupted between the log append and the state update"""
+        pending = self.state.get("pending")
+        if pending is None or not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb") as f:
+            lines = f.read().splitlines()
+        if lines and lines[-1].split(b"\t", 1)[0] == str(pending).encode():
+            self.state = {"next": pending + 1, "pending": None}
+            self.save()
+            
+    def ensure_start(self, start):
+        """Move the sequence forward to start; it never moves backwards"""
+        if self.state["pending"] is None and self.state["next"] < start:
+            self.state["next"] = start
+            self.save()
+            
+    def save(self):
+        atomic_write(self.path, json.dumps(self.state).encode())
+        
+    @property
+    def next_number(self):
+        pending = self.state["pending"]
+        return pending if pending is not None else self.state["next"]
+        
+    def reserve(self):
+        """Reserve the next number; an unfinished reservation is handed out again"""
+        if self.state["pending"] is None:
+            self.state["pending"] = self.state["next"]
+            self.save()
+        return self.state["pending"]
+        
+    def commit(self, number, note=""):
+        """Record a number as issued"""
+        with open(self.log_path, "ab") as f:
+            f.write(f"{number}\t{time.strftime('%Y-%m-%dT%H:%M:%S')}\t{note}\n".encode())
+            f.flush()
+            os.fsync(f.fileno())
+        self.state = {"next": number + 1, "pending": None}
+        self.save()
+        
+    def release(self, number):
+        """Give a reserved number back after a failed write"""
+        if self.state["pending"] == number:
+            self.state["pending"] = None
+            self.save()
+
+
+class ImagePatcher:
+    """Per-part copy of a base image, patched in place
+    
+    The base is copied to a working file once; each part then puts back the
+    ranges the previous part patched and rewrites only its own fields and
+    the CRC through a shared mapping, so just the touched pages are dirtied
+    instead of the whole file being rewritten.
+    """
+    
+    def __init__(self, base_path):
+        self.base_path = os.path.abspath(base_path)
+        # Bases with the same file name in different folders get separate work files
+        key = hashlib.sha256(self.base_path.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+        self.work_path = os.path.join(data_dir("serials"), f"work-{key}-{os.path.basename(base_path)}")
+        # Records which base the work file was copied from and which ranges differ from it
+        self.stamp_path = self.work_path + ".base"
+        
+    def save_stamp(self, stamp):
+        atomic_write(self.stamp_path, json.dumps(stamp).encode())
+        
+    def prepare(self):
+        """Refresh the working copy unless it was prepared from this exact base
+        
+        Returns (stamp, ranges): ranges are the (offset, length) pairs that
+        earlier parts patched and that still differ from the base.
+        """
+        stat = os.stat(self.base_path)
+        stamp = {"base": self.base_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        try:
+            with open(self.stamp_path) as f:
+                prepared = json.load(f)
+            touched = prepared.pop("touched")
+        except (OSError, ValueError, KeyError, AttributeError):
+            prepared, touched = None, []
+        if prepared != stamp or not os.path.exists(self.work_path):
+            shutil.copyfile(self.base_path, self.work_path)
+            touched = []
+            self.save_stamp(dict(stamp, touched=touched))
+        return stamp, touched
+        
+    def apply(self, patches, crc=None):
+        """Write (offset, bytes) patches, then an optional CRC32 fix-up
+        
+        crc is (start, end, offset): CRC32 of [start, end) stored little-endian
+        at offset. Returns the working file path.
+        """
+        stamp, touched = self.prepare()
+        ranges = [(offset, len(data)) for offset, data in patches] + ([(crc[2], 4)] if crc else [])
+        # Both sets are recorded first, so a part interrupted half way is undone by the next one
+        self.save_stamp(dict(stamp, touched=touched + ranges))
+        with open(self.base_path, "rb") as base, open(self.work_path, "r+b") as f:
+            image = mmap.mmap(f.fileno(), 0)
+            try:
+                for offset, length in touched:
+                    base.seek(offset)
+                    original = base.read(length)
+                    image[offset:offset + len(original)] = original
+                for offset, data in patches:
+                    if offset + len(data) > len(image):
+                        raise ValueError(f"patch at 0x{offset:X} runs past the end of the image")
+                    image[offset:offset + len(data)] = data
+                if crc:
+                    start, end, offset = crc
+                    value = zlib.crc32(image[start:end]) & 0xFFFFFFFF
+                    image[offset:offset + 4] = value.to_bytes(4, "little")
+                image.flush()
+            finally:
+                image.close()
+        self.save_stamp(dict(stamp, touched=ranges))
+        return self.work_path
+
+
+# ROM sets (one image interleaved across 2 or 4 chips)
+
+def rom_set_lane_path(path, lane):
+    """File name of one lane of a ROM set"""
+    return f"{os.path.splitext(path)[0]}.lane{lane}.bin"
+
+
+def split_rom_set(data, ways, width=1):
+    """Split an image into byte or word lanes (even/odd or 4-way)
+    
+    With NumPy the lanes are strided views of a single reshaped array, so
+    splitting is one copy per lane.
+    """
+    stride = ways * width
+    if len(data) % stride:
+        data = bytes(data) + b"\xff" * (stride - len(data) % stride)
+    if np is not None:
+        # One element per lane word; lanes are columns of a (words, ways) view
+        view = np.frombuffer(data, dtype=f"u{width}").reshape(-1, ways)
+        return [view[:, lane].tobytes() for lane in range(ways)]
+    words = memoryview(data).cast({1: "B", 2: "H", 4: "I"}[width])
+    return [words[lane::ways].tobytes() for lane in range(ways)]
+
+
+def merge_rom_set(lanes, width=1):
+    """Interleave lane images back into one image"""
+    ways = len(lanes)
+    size = min(len(lane) for lane in lanes) // width * width
+    if np is not None:
+        merged = np.empty((size // width, ways), dtype=f"u{width}")
+        for index, lane in enumerate(lanes):
+            merged[:, index] = np.frombuffer(lane, dtype=f"u{width}", count=size // width)
+        return merged.tobytes()
+    merged = bytearray(size * ways)
+    words = memoryview(merged).cast({1: "B", 2: "H", 4: "I"}[width])
+    for index, lane in enumerate(lanes):
+        words[index::ways] = memoryview(bytes(lane[:size])).cast(words.format)
+    return bytes(merged)
+
+
+# Test patterns and burn-in
+
+TEST_PATTERNS = ("checkerboard", "walking ones", "address in data", "random")
+BURNIN_CONSOLE_LINES = 5000  # console lines kept while a burn-in runs
+
+
+def generate_pattern(name, size, cycle=0, seed=0):
+    """Test image of a pattern for one burn-in cycle
+
+    Checkerboard and address-in-data invert on odd cycles and walking ones
+    moves one bit per cycle, so every cell sees both levels over a run.
+    Random data is reproducible from seed and cycle (NumPy's PCG64 when
+    installed, Python's Mersenne Twister otherwise).
+    """
+    invert = 0xFF if cycle % 2 else 0x00
+    if np is not None:
+        address = np.arange(size, dtype=np.uint32)
+        if name == "checkerboard":
+            data = np.where(address & 1, 0xAA, 0x55).astype(np.uint8) ^ invert
+        elif name == "walking ones":
+            data = (np.uint8(1) << ((address + cycle) % 8).astype(np.uint8)).astype(np.uint8)
+        elif name == "address in data":
+            data = ((address ^ (address >> 8) ^ (address >> 16) ^ (address >> 24)) & 0xFF).astype(np.uint8) ^ invert
+        elif name == "random":
+            return np.random.default_rng([seed, cycle]).bytes(size)
+        else:
+            raise ValueError(f"unknown pattern {name}")
+        return data.tobytes()
+
+    if name == "checkerboard":
+        return bytes([0x55 ^ invert, 0xAA ^ invert]) * (size // 2) + bytes([0x55 ^ invert]) * (size % 2)
+    if name == "walking ones":
+        return bytes(1 << ((i + cycle) % 8) for i in range(size))
+    if name == "address in data":
+        return bytes((i ^ (i >> 8) ^ (i >> 16) ^ (i >> 24)) & 0xFF ^ invert for i in range(size))
+    if name == "random":
+        return random.Random(seed * 1000003 + cycle).getrandbits(8 * size).to_bytes(size, "little") if size else b""
+    raise ValueError(f"unknown pattern {name}")
+
+
+class PatternStats:
+    """Mismatch counts over a burn-in run, in constant memory
+    
+    Keeps totals per address bit (how many failing bytes had that address
+    line high) and per data bit, plus the first failing addresses. A stuck or
+    shorted address line shows up as failures concentrated on one bit.
+    """
+    
+    def __init__(self, size, keep=16):
+        self.address_bits = max(1, (size - 1).bit_length())
+        self.address_counts = [0] * self.address_bits
+        self.data_counts = [0] * 8
+        self.mismatches = 0
+        self.bytes_compared = 0
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.first_failures = []
+        self.cycle_first_failure = None
+        self.keep = keep
+        
+    def compare(self, expected, actual, chunk_size=1 << 20):
+        """Add one cycle's comparison; returns that cycle's mismatch count"""
+        mismatches = 0
+        self.cycle_first_failure = None
+        if len(actual) != len(expected):
+            # Missing bytes count as failures at the addresses they should have been
+            actual = bytes(actual[:len(expected)]).ljust(len(expected), b"\x00")
+        for start in range(0, len(expected), chunk_size):
+            a = expected[start:start + chunk_size]
+            b = actual[start:start + chunk_size]
+            if a == b:
+                continue
+            if np is not None:
+                left = np.frombuffer(a, dtype=np.uint8)
+                right = np.frombuffer(b, dtype=np.uint8)
+                offsets = np.flatnonzero(left != right)
+                addresses = offsets.astype(np.uint64) + start
+                flipped = left[offsets] ^ right[offsets]
+                for bit in range(self.address_bits):
+                    self.address_counts[bit] += int(((addresses >> np.uint64(bit)) & 1).sum())
+                for bit in range(8):
+                    self.data_counts[bit] += int(((flipped >> bit) & 1).sum())
+                count = len(offsets)
+                failing = addresses[:self.keep].tolist()
+            else:
+                count = 0
+                failing = []
+                for offset in range(len(a)):
+                    if a[offset] != b[offset]:
+                        address = start + offset
+                        count += 1
+                        if len(failing) < self.keep:
+                            failing.append(address)
+                        for bit in range(self.address_bits):
+                            self.address_counts[bit] += (address >> bit) & 1
+                        for bit in range(8):
+                            self.data_counts[bit] += ((a[offset] ^ b[offset]) >> bit) & 1
+            if self.cycle_first_failure is None and failing:
+                self.cycle_first_failure = int(failing[0])
+            mismatches += count
+            room = self.keep - len(self.first_failures)
+            self.first_failures.extend(int(address) for address in failing[:max(0, room)])
+        self.cycles += 1
+        self.bytes_compared += len(expected)
+        self.mismatches += mismatches
+        self.failed_cycles += bool(mismatches)
+        return mismatches
+        
+    def suspect_lines(self, threshold=0.95, minimum=16):
+        """Address lines failing only at one level, and data bits flipped in nearly every failure
+        
+        Returns (["A4 low", ...], ["D3", ...]); needs a few failures to be meaningful.
+        """
+        if self.mismatches < minimum:
+            return [], []
+        address = []
+        for bit, count in enumerate(self.address_counts):
+            if count >= threshold * self.mismatches:
+                address.append(f"A{bit} high")
+            elif count <= (1 - threshold) * self.mismatches:
+                address.append(f"A{bit} low")
+        data = [f"D{bit}" for bit, count in enumerate(self.data_counts)
+                if count >= threshold * self.mismatches]
+        return address, data
+
+
+# Logic IC testing
+
+LOGIC_VECTOR = re.compile(r"^\s*(\d+):\s+(.*\S)\s*$")
+
+
+def parse_logic_test(text):
+    """Parse `minipro -T` output into a per-vector, per-pin result matrix
+
+    Returns {"pins": [pin numbers], "vectors": [{"index", "states", "failed"}],
+    "failures": {pin: failing vectors}, "passed": True/False/None}. states
+    holds one token per pin (0/1 inputs, H/L expected outputs, G/V supply);
+    minipro marks a pin whose output did not match with a trailing '-'.
+    """
+    pins = []
+    vectors = []
+    failures = {}
+    passed = None
+    for line in re.split(r"[\r\n]+", text):
+        match = LOGIC_VECTOR.match(line)
+        if match:
+            tokens = match.group(2).split()
+            numbers = pins or list(range(1, len(tokens) + 1))
+            failed = [pin for pin, token in zip(numbers, tokens) if token.endswith(("-", "!", "*"))]
+            vectors.append({"index": int(match.group(1)),
+                            "states": [token.rstrip("-!*") for token in tokens],
+                            "failed": failed})
+            for pin in failed:
+                failures[pin] = failures.get(pin, 0) + 1
+        elif re.fullmatch(r"\s*(\d+\s+)+\d+\s*", line) and not pins:
+            pins = [int(number) for number in line.split()]
+        elif re.search(r"logic test (successful|passed|ok)", line, re.I):
+            passed = True
+        elif re.search(r"logic test failed|\b0*[1-9]\d*\s+errors?\b", line, re.I) and vectors:
+            # "Logic test failed: 3 errors." or a non-zero count; "0 errors" is a pass
+            passed = False
+    if passed is None and vectors:
+        passed = not failures
+    return {"pins": pins, "vectors": vectors, "failures": failures, "passed": passed}
+
+
+def bin_logic_part(result, returncode):
+    """Bin a tested part: "good", "stuck pin N high/low", "dead" or "error"
+
+    "error" means minipro produced no vectors (programmer or command
+    problem), so the part itself has not been judged.
+    """
+    if not result["vectors"]:
+        return "error"
+    if returncode == 0 and not result["failures"]:
+        return "good"
+    pins = result["pins"] or list(range(1, len(result["vectors"][0]["states"]) + 1))
+    outputs = {pin for vector in result["vectors"]
+               for pin, state in zip(pins, vector["states"]) if state in ("H", "L")}
+    failing = sorted(result["failures"])
+    if not failing or (outputs and len(failing) * 2 > len(outputs)):
+        return "dead"
+    # A pin that only fails where it should be low is stuck high, and vice versa
+    labels = []
+    for pin in failing:
+        column = pins.index(pin)
+        expected = {vector["states"][column] for vector in result["vectors"] if pin in vector["failed"]}
+        level = " high" if expected == {"L"} else " low" if expected == {"H"} else ""
+        labels.append(f"{pin}{level}")
+    return ("stuck pin " if len(labels) == 1 else "stuck pins ") + ", ".join(labels)
+
+
+# minipro's logic IC database (vectors per part), searched in this order
+LOGIC_DATABASE_PATHS = [
+    os.path.expanduser("~/.local/share/minipro/logicic.xml"),
+    "/usr/local/share/minipro/logicic.xml",
+    "/usr/share/minipro/logicic.xml",
+]
+
+# Parts tried first when nothing has been tested locally yet
+COMMON_LOGIC_PARTS = [
+    "7400", "7404", "7408", "7432", "7402", "7486", "7474", "74138", "74245", "74244",
+    "74373", "74374", "74595", "74164", "74161", "74157", "74125", "7414", "7410", "7420",
+    "4011", "4001", "4049", "4050", "4017", "4040", "4066", "4093",
+]
+LOGIC_NAME = re.compile(r"^(?:74|54)[A-Z]*\d|^4[05]\d\d", re.IGNORECASE)
+
+
+class LogicDatabase:
+    """Logic parts with their pin count and a fingerprint of their test vectors
+    
+    Read from minipro's logicic.xml when one is installed. Parts whose vectors
+    are identical (7400, 74LS00, 74HC00, ...) share a fingerprint, so a chip
+    only needs testing once per distinct vector set.
+    """
+    
+    def __init__(self, path=None):
+        self.parts = {}  # name -> {"pins": int, "vectors": fingerprint}
+        if path is None:
+            path = next((p for p in LOGIC_DATABASE_PATHS if os.path.exists(p)), "")
+        self.path = path
+        if self.path:
+            self.load(self.path)
+            
+    def load(self, path):
+        for _, element in ElementTree.iterparse(path):
+            if element.get("name") and element.get("pins"):
+                vectors = [" ".join((vector.text or "").split()) for vector in element]
+                if vectors:
+                    fingerprint = hashlib.sha1("\n".join(vectors).encode()).hexdigest()
+                    for name in element.get("name").split(","):
+                        self.parts[name.strip()] = {"pins": int(element.get("pins")), "vectors": fingerprint}
+                element.clear()
+                
+    def candidates(self, pins, known_names=(), usage=None):
+        """Candidate (name, fingerprint) pairs for a pin count, most likely first
+        
+        Without a database, logic-looking names from the device list are
+        used with their own name as fingerprint (their package is checked
+        before testing starts).
+        """
+        usage = usage or {}
+        if self.parts:
+            names = [name for name, part in self.parts.items() if part["pins"] == pins]
+        else:
+            names = [name for name in known_names if LOGIC_NAME.match(name)]
+        common = {name: rank for rank, name in enumerate(COMMON_LOGIC_PARTS)}
+        
+        def likelihood(name):
+            # Family prefixes (LS, HC, ...) share the base part's popularity
+            base = re.sub(r"^(74|54)[A-Z]+", r"\1", name.upper())
+            return (-usage.get(name, 0), common.get(name, common.get(base, len(common))), len(name), name)
+            
+        return [(name, self.parts[name]["vectors"] if self.parts else name)
+                for name in sorted(names, key=likelihood)]
+
+
+# JEDEC fuse maps (GAL/PAL)
+
+# Fuse count and fuses per row (one product term) of common GAL families
+GAL_LAYOUTS = {
+    "16V8": (2194, 32),
+    "20V8": (2706, 40),
+    "18V10": (3540, 36),
+    "22V10": (5892, 44),
+}
+FUSE_BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def gal_layout(device):
+    """(fuse count, row width) for a GAL device name, or None"""
+    for family, layout in GAL_LAYOUTS.items():
+        if family in device.upper():
+            return layout
+    return None
+
+
+def jedec_fuse_checksum(fuses):
+    """16-bit sum of the fuses packed into bytes, fuse 0 in bit 0 of the first byte"""
+    if np is not None:
+        packed = np.packbits(np.frombuffer(bytes(fuses), dtype=np.uint8), bitorder="little")
+        return int(packed.sum(dtype=np.uint64)) & 0xFFFF
+    total = 0
+    for start in range(0, len(fuses), 8):
+        for bit, fuse in enumerate(fuses[start:start + 8]):
+            total += fuse << bit
+    return total & 0xFFFF
+
+
+def parse_jedec(data):
+    """Parse a JEDEC (JESD3) fuse file from bytes
+
+    Returns {"fuses": bytearray of 0/1, "fuse_count", "pins", "device",
+    "checksum": (declared, computed), "transmission": (declared, computed),
+    "undefined": fuses given no value, "security"}. Declared values are None
+    when the file omits them. Raises ValueError for a malformed file.
+    """
+    text = data.decode("latin-1")
+    start = text.find("\x02")
+    end = text.find("\x03", start + 1)
+    transmission = (None, None)
+    if start >= 0 and end > start:
+        declared = text[end + 1:end + 5]
+        if re.fullmatch(r"[0-9A-Fa-f]{4}", declared) and declared != "0000":
+            # 0000 is the standard "not computed" placeholder
+            transmission = (int(declared, 16), sum(data[start:end + 1]) & 0xFFFF)
+        body = text[start + 1:end]
+    elif start >= 0:
+        raise ValueError("missing end of transmission (ETX) character")
+    else:
+        body = text
+
+    # The design specification runs up to the first '*'; fields follow
+    header, _, fields = body.partition("*")
+    device = re.search(r"\b(?:GAL|PALCE|PAL|ATF)\w+", header + fields[:512], re.I)
+    fuse_count = pins = default = declared_checksum = None
+    security = False
+    rows = []
+    for field in fields.split("*"):
+        field = field.strip()
+        if not field:
+            continue
+        code, value = field[0], field[1:]
+        try:
+            if field.startswith("QF"):
+                fuse_count = int(field[2:])
+            elif field.startswith("QP"):
+                pins = int(field[2:])
+            elif code == "F":
+                default = int(value.strip())
+            elif code == "L":
+                # The address may be followed by a space or a line break
+                address, *bits = value.split(None, 1)
+                rows.append((int(address), "".join(bits)))
+            elif code == "C":
+                declared_checksum = int(value.strip(), 16)
+            elif code == "G":
+                security = value.strip() == "1"
+        except ValueError:
+            raise ValueError(f"bad {code} field: {field[:40]}") from None
+    if fuse_count is None:
+        if not rows:
+            raise ValueError("no fuse data (QF or L fields)")
+        fuse_count = max(address + len("".join(bits.split())) for address, bits in rows)
+
+    fuses = bytearray([default or 0]) * fuse_count
+    given = bytearray(fuse_count) if default is None else None
+    for address, bits in rows:
+        bits = "".join(bits.split()).encode("latin-1")
+        if bits.strip(b"01"):
+            raise ValueError(f"L{address}: fuse values must be 0 or 1")
+        if address + len(bits) > fuse_count:
+            raise ValueError(f"L{address}: {len(bits)} fuses run past QF{fuse_count}")
+        fuses[address:address + len(bits)] = bits.translate(FUSE_BITS)
+        if given is not None:
+            given[address:address + len(bits)] = b"\x01" * len(bits)
+    return {
+        "fuses": fuses,
+        "fuse_count": fuse_count,
+        "pins": pins,
+        "device": device.group(0).upper() if device else "",
+        "checksum": (declared_checksum, jedec_fuse_checksum(fuses)),
+        "transmission": transmission,
+        "undefined": given.count(0) if given is not None else 0,
+        "security": security,
+    }
+
+
+def jedec_problems(jed, device=""):
+    """Reasons a parsed JEDEC file should not be written to device"""
+    problems = []
+    declared, computed = jed["checksum"]
+    if declared is not None and declared != computed:
+        problems.append(f"fuse checksum is {computed:04X}, file says {declared:04X}")
+    declared, computed = jed["transmission"]
+    if declared is not None and declared != computed:
+        problems.append(f"transmission checksum is {computed:04X}, file says {declared:04X} "
+                        "(file damaged or edited)")
+    if jed["undefined"]:
+        problems.append(f"{jed['undefined']} fuses have no value and there is no F field")
+    layout = gal_layout(device)
+    if layout and jed["fuse_count"] != layout[0]:
+        problems.append(f"{jed['fuse_count']} fuses, but {device} has {layout[0]}")
+    return problems
+
+
+def diff_fuse_maps(a, b):
+    """Indices of fuses that differ; fuses beyond the shorter map all count"""
+    common = min(len(a), len(b))
+    if np is not None:
+        left = np.frombuffer(bytes(a[:common]), dtype=np.uint8)
+        right = np.frombuffer(bytes(b[:common]), dtype=np.uint8)
+        differing = np.flatnonzero(left != right).tolist()
+    else:
+        differing = [i for i in range(common) if a[i] != b[i]]
+    return differing + list(range(common, max(len(a), len(b))))
+
+
+# Config (fuse) words of microcontrollers
+
+# Lock bits shared by the AVR families below
+AVR_LOCK_FIELDS = [
+    {"name": "LB", "word": "lock_byte", "mask": 0x03,
+     "values": {3: "no lock", 2: "further programming disabled", 0: "programming and verification disabled"}},
+    {"name": "BLB0", "word": "lock_byte", "mask": 0x0C,
+     "values": {3: "no restriction", 2: "SPM cannot write the application section",
+                0: "application section write- and read-protected", 1: "boot loader cannot read the application"}},
+    {"name": "BLB1", "word": "lock_byte", "mask": 0x30,
+     "values": {3: "no restriction", 2: "SPM cannot write the boot section",
+                0: "boot section write- and read-protected", 1: "application cannot read the boot section"}},
+]
+AVR_BODLEVEL = {7: "brown-out detection off", 6: "1.8 V", 5: "2.7 V", 4: "4.3 V"}
+RSTDISBL = {"name": "RSTDISBL", "word": "fuses_hi", "mask": 0x80,
+            "values": {0: "reset pin is I/O", 1: "reset enabled"},
+            "danger": {0: "disables reset and ISP; only high-voltage programming recovers the part"}}
+DWEN = {"name": "DWEN", "word": "fuses_hi", "mask": 0x40, "values": {0: "debugWIRE enabled", 1: "off"},
+        "danger": {0: "debugWIRE takes over the reset pin and disables ISP"}}
+SPIEN = {"name": "SPIEN", "word": "fuses_hi", "mask": 0x20,
+         "values": {0: "serial programming enabled", 1: "serial programming disabled"},
+         "danger": {1: "disables ISP (serial) programming"}}
+
+# Config word layouts and bit fields by device name (without package)
+#
+# words: (name, bits, factory default); fields: mask within the word, the
+# meaning of raw field values and the values that lock ISP out ("danger").
+# Word names follow minipro's config files; CONFIG_WORD_ALIASES lists other
+# spellings (avrdude's, for one) that files and definitions may use instead.
+CONFIG_FAMILIES = [
+    {"match": r"ATMEGA328P?",
+     "words": [("fuses_lo", 8, 0x62), ("fuses_hi", 8, 0xD9), ("fuses_ext", 8, 0xFF), ("lock_byte", 8, 0xFF)],
+     "fields": [
+         {"name": "CKDIV8", "word": "fuses_lo", "mask": 0x80, "values": {0: "clock divided by 8", 1: "not divided"}},
+         {"name": "CKOUT", "word": "fuses_lo", "mask": 0x40, "values": {0: "clock output on PB0", 1: "off"}},
+         {"name": "SUT", "word": "fuses_lo", "mask": 0x30, "values": {}},
+         {"name": "CKSEL", "word": "fuses_lo", "mask": 0x0F,
+          "values": {0x0: "external clock", 0x2: "internal 8 MHz RC", 0x3: "internal 128 kHz RC",
+                     0x4: "low-frequency crystal", 0x5: "low-frequency crystal", 0x6: "full-swing crystal",
+                     0x7: "full-swing crystal", **{value: "low-power crystal" for value in range(0x8, 0x10)}}},
+         RSTDISBL, DWEN, SPIEN,
+         {"name": "WDTON", "word": "fuses_hi", "mask": 0x10,
+          "values": {0: "watchdog always on", 1: "set by software"}},
+         {"name": "EESAVE", "word": "fuses_hi", "mask": 0x08,
+          "values": {0: "EEPROM kept on chip erase", 1: "erased"}},
+         {"name": "BOOTSZ", "word": "fuses_hi", "mask": 0x06,
+          "values": {0: "2048 words", 1: "1024 words", 2: "512 words", 3: "256 words"}},
+         {"name": "BOOTRST", "word": "fuses_hi", "mask": 0x01,
+          "values": {0: "reset into boot loader", 1: "reset to 0"}},
+         {"name": "BODLEVEL", "word": "fuses_ext", "mask": 0x07, "values": AVR_BODLEVEL},
+     ] + AVR_LOCK_FIELDS},
+    {"match": r"ATMEGA8A?",
+     "words": [("fuses_lo", 8, 0xE1), ("fuses_hi", 8, 0xD9), ("lock_byte", 8, 0xFF)],
+     "fields": [
+         {"name": "BODLEVEL", "word": "fuses_lo", "mask": 0x80, "values": {0: "4.0 V", 1: "2.7 V"}},
+         {"name": "BODEN", "word": "fuses_lo", "mask": 0x40, "values": {0: "brown-out detection on", 1: "off"}},
+         {"name": "SUT", "word": "fuses_lo", "mask": 0x30, "values": {}},
+         {"name": "CKSEL", "word": "fuses_lo", "mask": 0x0F,
+          "values": {0x0: "external clock", 0x1: "internal 1 MHz RC", 0x2: "internal 2 MHz RC",
+                     0x3: "internal 4 MHz RC", 0x4: "internal 8 MHz RC",
+                     **{value: "external RC oscillator" for value in range(0x5, 0x9)},
+                     0x9: "low-frequency crystal", **{value: "crystal" for value in range(0xA, 0x10)}}},
+         RSTDISBL,
+         {"name": "WDTON", "word": "fuses_hi", "mask": 0x40,
+          "values": {0: "watchdog always on", 1: "set by software"}},
+         SPIEN,
+         {"name": "CKOPT", "word": "fuses_hi", "mask": 0x10,
+          "values": {0: "full-swing oscillator", 1: "low-power oscillator"}},
+         {"name": "EESAVE", "word": "fuses_hi", "mask": 0x08,
+          "values": {0: "EEPROM kept on chip erase", 1: "erased"}},
+         {"name": "BOOTSZ", "word": "fuses_hi", "mask": 0x06,
+          "values": {0: "1024 words", 1: "512 words", 2: "256 words", 3: "128 words"}},
+         {"name": "BOOTRST", "word": "fuses_hi", "mask": 0x01,
+          "values": {0: "reset into boot loader", 1: "reset to 0"}},
+     ] + AVR_LOCK_FIELDS},
+    {"match": r"ATTINY(25|45|85)V?",
+     "words": [("fuses_lo", 8, 0x62), ("fuses_hi", 8, 0xDF), ("fuses_ext", 8, 0xFF), ("lock_byte", 8, 0xFF)],
+     "fields": [
+         {"name": "CKDIV8", "word": "fuses_lo", "mask": 0x80, "values": {0: "clock divided by 8", 1: "not divided"}},
+         {"name": "CKOUT", "word": "fuses_lo", "mask": 0x40, "values": {0: "clock output on PB4", 1: "off"}},
+         {"name": "SUT", "word": "fuses_lo", "mask": 0x30, "values": {}},
+         {"name": "CKSEL", "word": "fuses_lo", "mask": 0x0F,
+          "values": {0x0: "external clock", 0x1: "PLL clock", 0x2: "internal 8 MHz RC", 0x4: "internal 128 kHz RC",
+                     0x6: "low-frequency crystal", **{value: "crystal" for value in range(0x8, 0x10)}}},
+         RSTDISBL, DWEN, SPIEN,
+         {"name": "WDTON", "word": "fuses_hi", "mask": 0x10,
+          "values": {0: "watchdog always on", 1: "set by software"}},
+         {"name": "EESAVE", "word": "fuses_hi", "mask": 0x08,
+          "values": {0: "EEPROM kept on chip erase", 1: "erased"}},
+         {"name": "BODLEVEL", "word": "fuses_hi", "mask": 0x07, "values": AVR_BODLEVEL},
+         {"name": "SELFPRGEN", "word": "fuses_ext", "mask": 0x01,
+          "values": {0: "self-programming enabled", 1: "disabled"}},
+         AVR_LOCK_FIELDS[0],
+     ]},
+    {"match": r"PIC16F6(27|28|48)A",
+     "words": [("conf_word", 14, 0x3FFF)],
+     "fields": [
+         {"name": "CP", "word": "conf_word", "mask": 0x2000, "values": {0: "code protected", 1: "off"}},
+         {"name": "CPD", "word": "conf_word", "mask": 0x0100, "values": {0: "data EEPROM protected", 1: "off"}},
+         {"name": "LVP", "word": "conf_word", "mask": 0x0080,
+          "values": {1: "low-voltage programming on (RB4 is PGM)", 0: "off, RB4 is I/O"}},
+         {"name": "BOREN", "word": "conf_word", "mask": 0x0040, "values": {1: "brown-out reset on", 0: "off"}},
+         {"name": "MCLRE", "word": "conf_word", "mask": 0x0020,
+          "values": {1: "RA5 is MCLR", 0: "RA5 is input, MCLR internal"}},
+         {"name": "PWRTE", "word": "conf_word", "mask": 0x0008, "values": {0: "power-up timer on", 1: "off"}},
+         {"name": "WDTE", "word": "conf_word", "mask": 0x0004, "values": {1: "watchdog on", 0: "off"}},
+         {"name": "FOSC", "word": "conf_word", "mask": 0x0013,
+          "values": {7: "RC, CLKOUT on RA6", 6: "RC, RA6 is I/O", 5: "INTOSC, CLKOUT on RA6", 4: "INTOSC, RA6 is I/O",
+                     3: "EC, RA6 is I/O", 2: "HS crystal", 1: "XT crystal", 0: "LP crystal"}},
+     ]},
+]
+CONFIG_WORD_ALIASES = {
+    "fuses_lo": ("lfuse", "low_fuse", "fuse_low", "fuses_low", "low"),
+    "fuses_hi": ("hfuse", "high_fuse", "fuse_high", "fuses_high", "high"),
+    "fuses_ext": ("efuse", "extended_fuse", "fuse_ext", "fuses_extended", "extended"),
+    "lock_byte": ("lock", "lockbits", "lock_bits"),
+    "conf_word": ("config_word", "config", "config1", "configuration"),
+}
+CONFIG_WORD_NAMES = {alias: name for name, aliases in CONFIG_WORD_ALIASES.items() for alias in aliases}
+
+
+def config_word_key(words, name):
+    """The key under which words holds the word called name (in any spelling), or None"""
+    wanted = name.lower()
+    wanted = CONFIG_WORD_NAMES.get(wanted, wanted)
+    return next((key for key in words if CONFIG_WORD_NAMES.get(key.lower(), key.lower()) == wanted), None)
+
+
+def extract_bits(word, mask):
+    """Value of the (possibly non-contiguous) bits of word selected by mask"""
+    value = bit = 0
+    for position in range(mask.bit_length()):
+        if mask >> position & 1:
+            value |= (word >> position & 1) << bit
+            bit += 1
+    return value
+
+
+def deposit_bits(word, mask, value):
+    """word with the bits selected by mask replaced by value"""
+    bit = 0
+    for position in range(mask.bit_length()):
+        if mask >> position & 1:
+            word = word & ~(1 << position) | (value >> bit & 1) << position
+            bit += 1
+    return word
+
+
+class ConfigDefinitions:
+    """Config word layouts resolved once per device
+    
+    Built-in families come first; a JSON list in the same format (with
+    string value keys such as "0x3") can add or override parts. Each device
+    is matched once and the result, including "no definition", is cached.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path if path is not None else os.path.join(data_dir("config"), "config_fields.json")
+        self.families = None
+        self.cache = {}
+        self.problems = []
+        
+    def load(self):
+        families = []
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for family in json.load(f):
+                        for field in family["fields"]:
+                            field["mask"] = int(str(field["mask"]), 0)
+                            for key in ("values", "danger"):
+                                field[key] = {int(str(value), 0): text
+                                              for value, text in field.get(key, {}).items()}
+                        family["words"] = [(name, int(bits), int(str(default), 0))
+                                           for name, bits, default in family["words"]]
+                        families.append(family)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.problems.append(f"{self.path}: {e}")
+        self.families = families + CONFIG_FAMILIES
+        
+    def for_device(self, device):
+        """Layout {"words", "fields"} for a device name, or None"""
+        name = device.split("@")[0].strip().upper()
+        if name not in self.cache:
+            if self.families is None:
+                self.load()
+            self.cache[name] = next((family for family in self.families
+                                     if re.fullmatch(family["match"], name)), None)
+        return self.cache[name]
+        
+
+def parse_config_words(data, definition=None):
+    """{word name: value} from a config file read by minipro
+    
+    Text files hold one "name = 0x..." line per word. Names are kept as
+    written, so the words go back to minipro under the names it used;
+    config_word_key() matches them to a definition. Other files are taken
+    as the raw words in definition order, little-endian. Raises ValueError
+    when nothing can be read.
+    """
+    text = data.decode("latin-1")
+    words = {}
+    for match in re.finditer(r"^\s*([A-Za-z_][\w.]*)\s*[=:]\s*(0[xX][0-9A-Fa-f]+|\d+)\s*$", text, re.M):
+        words[match.group(1)] = int(match.group(2), 0)
+    if words:
+        return words
+    if definition and data.strip(b"\r\n\t "):
+        offset = 0
+        for name, bits, _ in definition["words"]:
+            size = (bits + 7) // 8
+            if offset + size > len(data):
+                break
+            words[name] = int.from_bytes(data[offset:offset + size], "little")
+            offset += size
+    if not words:
+        raise ValueError("no config words found")
+    return words
+
+
+def format_config_words(words):
+    """Config file contents for minipro -c config -w"""
+    return "".join(f"{name} = 0x{value:02x}\n" for name, value in words.items())
+
+
+def decode_config(definition, words):
+    """One row per field: {"field", "word", "mask", "value", "meaning", "danger"}
+    
+    Words without a definition, or a device without one, show as a single
+    field covering the whole word.
+    """
+    rows = []
+    fields = definition["fields"] if definition else []
+    defined = set()
+    for field in fields:
+        # Rows name the word as words spells it, so edits go back under the same name
+        key = config_word_key(words, field["word"])
+        if key is None:
+            continue
+        defined.add(key)
+        value = extract_bits(words[key], field["mask"])
+        rows.append({"field": field["name"], "word": key, "mask": field["mask"], "value": value,
+                     "meaning": field["values"].get(value, ""), "danger": field.get("danger", {}).get(value, "")})
+    bits = {config_word_key(words, name): width for name, width, _ in definition["words"]} if definition else {}
+    for name, word in words.items():
+        if name not in defined:
+            mask = (1 << bits.get(name, max(8, word.bit_length()))) - 1
+            rows.append({"field": name, "word": name, "mask": mask, "value": word & mask,
+                         "meaning": "", "danger": ""})
+    return rows
+
+
+def config_differences(definition, words, expected):
+    """Fields whose value differs from the expected words, as readable lines"""
+    differences = []
+    expected_rows = {row["field"]: row for row in decode_config(definition, expected)}
+    for row in decode_config(definition, words):
+        want = expected_rows.get(row["field"])
+        if want and want["value"] != row["value"]:
+            actual = f"{row['value']:#x}" + (f" ({row['meaning']})" if row["meaning"] else "")
+            wanted = f"{want['value']:#x}" + (f" ({want['meaning']})" if want["meaning"] else "")
+            differences.append(f"{row['word']}.{row['field']}: {actual}, expected {wanted}")
+    for name in expected:
+        if config_word_key(words, name) is None:
+            differences.append(f"{name}: missing, expected {expected[name]:#x}")
+    return differences
+
+
+# Device database
+
+# Memory regions in read order, with the -d field names that announce them
+MEMORY_REGIONS = [
+    ("code", ("code memory", "memory", "code")),
+    ("data", ("data memory", "eeprom", "data")),
+    ("user", ("user memory", "user")),
+    ("calibration", ("calibration", "calibration memory")),
+    ("config", ("config", "configuration", "fuses", "fuse", "lock bits")),
+]
+
+
+def parse_size(text):
+    """Size in bytes from text like '16384 Words' or '256 Bytes'"""
+    match = re.search(r"(\d+)\s*(words?|bytes?)?", text, re.IGNORECASE)
+    if not match:
+        return None
+    size = int(match.group(1))
+    if match.group(2) and match.group(2).lower().startswith("word"):
+        size *= 2
+    return size
+
+
+def parse_device_info(text):
+    """Parse `minipro -d` output into fields and memory regions
+    
+    Returns {"fields": {key: value}, "regions": {region: size or None}}.
+    minipro reports code and data together as 'Memory: X Words + Y Bytes',
+    other versions use one line per region; both are understood.
+    """
+    fields = {}
+    for line in text.splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            fields[key.strip().lower()] = value.strip()
+            
+    regions = {}
+    for region, keys in MEMORY_REGIONS:
+        for key in keys:
+            if key in fields and region not in regions:
+                parts = fields[key].split("+")
+                regions[region] = parse_size(parts[0])
+                # 'Memory: X + Y' carries the data memory as its second part
+                if region == "code" and len(parts) > 1 and "data" not in regions:
+                    regions["data"] = parse_size(parts[1])
+    return {"fields": fields, "regions": regions}
+
+
+class DeviceDatabase:
+    """Device information from `minipro -d`, fetched once per device"""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.cache = {}
+        
+    def info(self, device):
+        """Parsed device information, or None if minipro does not know the device"""
+        if device not in self.cache:
+            # Failures are cached too, so an unknown part costs one lookup per session
+            info = None
+            try:
+                result = subprocess.run([self.backend.binary, "-d", device],
+                                        capture_output=True, text=True, timeout=10)
+                parsed = parse_device_info(result.stdout + result.stderr)
+                if result.returncode == 0 and parsed["fields"]:
+                    info = parsed
+            except (OSError, subprocess.SubprocessError):
+                pass
+            self.cache[device] = info
+        return self.cache[device]
+        
+    def regions(self, device):
+        """Memory regions as (name, size, optional) in read order
+        
+        Code memory is always read. Regions the device information does not
+        pin down are tried as optional and skipped if the part rejects them.
+        """
+        info = self.info(device)
+        known = info["regions"] if info else {}
+        regions = [("code", known.get("code"), False)]
+        for region, _ in MEMORY_REGIONS[1:]:
+            if region in known:
+                if known[region] != 0:
+                    regions.append((region, known[region], False))
+            elif region in ("data", "config") and info and "data" in known:
+                # Microcontrollers (code + data) normally have fuses too
+                regions.append((region, None, True))
+        return regions
+
+
+# Compressed images and backups
+
+COMPRESSED_SUFFIXES = (".xz", ".zst", ".gz", ".bz2")
+DECOMPRESS_ERRORS = (OSError, EOFError, ValueError, zlib.error, lzma.LZMAError, zipfile.BadZipFile) + \
+    ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def open_compressed(path, mode="rb"):
+    """Open a .xz/.zst/.gz/.bz2 file for streaming binary reads or writes"""
+    writing = "w" in mode
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError("reading or writing .zst needs the zstandard module")
+        raw = open(path, mode)
+        if writing:
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw)
+        return zstandard.ZstdDecompressor().stream_reader(raw)
+    if path.endswith(".xz"):
+        # A low preset keeps up with the programmer while still compressing well
+        return lzma.open(path, mode, preset=1) if writing else lzma.open(path, mode)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6) if writing else gzip.open(path, mode)
+    if path.endswith(".bz2"):
+        return bz2.open(path, mode)
+    return open(path, mode)
+
+
+class BackupStore:
+    """Compressed device backups indexed by device and time"""
+    
+    def __init__(self):
+        self.root = data_dir("backups")
+        self.index_path = os.path.join(self.root, "index.json")
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = []
+            
+    def new_path(self, device):
+        """Path for a new backup of a device"""
+        folder = os.path.join(self.root, re.sub(r"[^\w@.-]", "_", device))
+        os.makedirs(folder, exist_ok=True)
+        suffix = ".zst" if zstandard is not None else ".xz"
+        return os.path.join(folder, time.strftime("%Y%m%d-%H%M%S") + ".bin" + suffix)
+        
+    def add(self, entry):
+        """Register a finished backup"""
+        self.index.append(entry)
+        atomic_write(self.index_path, json.dumps(self.index, indent=1).encode())
+        
+    def latest(self, device):
+        """Newest backup of a device whose file still exists, or None"""
+        for entry in reversed(self.index):
+            if entry["device"] == device and os.path.exists(entry["file"]):
+                return entry
+        return None
+
+
+class ExpandedImageCache:
+    """Decompressed copies of .gz/.xz/.zst/.bz2/.zip images for minipro
+    
+    Expanded files are keyed by the SHA-256 of the packed artifact, so the
+    same artifact is only decompressed once however often it is written or
+    verified; a per-session memo on path, size and mtime skips even the hash.
+    """
+    
+    def __init__(self, keep=32):
+        self.root = data_dir("expanded")
+        self.keep = keep
+        self.memo = {}
+        
+    @staticmethod
+    def is_packed(path):
+        return path.lower().endswith(COMPRESSED_SUFFIXES + (".zip",))
+        
+    def expand(self, path):
+        """Path of a plain copy of the image; unpacked inputs are returned as is"""
+        if not self.is_packed(path):
+            return path
+        stat = os.stat(path)
+        stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        cached = self.memo.get(stamp)
+        if cached and os.path.exists(cached):
+            return cached
+            
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        if path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                member = self.zip_member(archive)
+                target = os.path.join(self.root, f"{digest.hexdigest()[:24]}-{os.path.basename(member)}")
+                if not os.path.exists(target):
+                    self.stream_to(archive.open(member), target)
+        else:
+            name = os.path.basename(path)[:-len(os.path.splitext(path)[1])]
+            target = os.path.join(self.root, f"{digest.hexdigest()[:24]}-{name}")
+            if not os.path.exists(target):
+                self.stream_to(open_compressed(path), target)
+        os.utime(target)
+        self.memo[stamp] = target
+        self.prune()
+        return target
+        
+    @staticmethod
+    def zip_member(archive):
+        """The image inside an archive: its only file, or the only .bin/.hex/.srec one"""
+        files = [info.filename for info in archive.infolist() if not info.is_dir()]
+        if len(files) != 1:
+            files = [name for name in files
+                     if name.lower().endswith((".bin", ".rom", ".hex", ".ihex", ".srec", ".s19", ".mot"))]
+        if len(files) != 1:
+            raise ValueError(f"archive holds {len(files)} candidate images; expected exactly one")
+        return files[0]
+        
+    @staticmethod
+    def stream_to(source, target):
+        """Decompress a stream into place without holding it in memory"""
+        partial = target + ".partial"
+        try:
+            with source, open(partial, "wb") as f:
+                shutil.copyfileobj(source, f, 1 << 20)
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            raise
+            
+    def prune(self):
+        """Drop the least recently used expansions beyond the limit"""
+        entries = sorted((os.path.join(self.root, name) for name in os.listdir(self.root)
+                          if not name.endswith(".partial")), key=os.path.getmtime)
+        for stale in entries[:-self.keep]:
+            os.unlink(stale)
+            self.memo = {key: value for key, value in self.memo.items() if value != stale}
+
+
+# Content-addressed image store
+
+# Gear table for content-defined chunking; derived from SHA-256 so it never changes
+GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "little") for i in range(256)]
+CHUNK_BITS = 13                        # ~8 KiB average chunks
+CHUNK_MIN, CHUNK_MAX = 2048, 65536
+
+
+def chunk_candidates(data):
+    """Offsets where the rolling gear hash allows a chunk to end
+
+    The hash is h = (h << 1) + GEAR[byte] in 32 bits, so each position only
+    depends on the last 32 bytes. NumPy computes a whole block as 32 shifted
+    sums; the pure Python loop gives identical results.
+    """
+    shift = 32 - CHUNK_BITS
+    candidates = []
+    if np is not None:
+        gear = np.array(GEAR, dtype=np.uint32)
+        source = np.frombuffer(data, dtype=np.uint8)
+        block = 1 << 22
+        for start in range(0, len(source), block):
+            lead = min(start, 31)
+            values = gear[source[start - lead:start + block]]
+            hashes = values.copy()
+            for k in range(1, 32):
+                hashes[k:] += values[:-k] << np.uint32(k)
+            hits = np.flatnonzero((hashes[lead:] >> np.uint32(shift)) == 0)
+            candidates.extend((hits + start + 1).tolist())
+        return candidates
+    h = 0
+    for index, byte in enumerate(bytes(data)):
+        h = ((h << 1) + GEAR[byte]) & 0xFFFFFFFF
+        if h >> shift == 0:
+            candidates.append(index + 1)
+    return candidates
+
+
+def chunk_boundaries(data):
+    """Chunk end offsets, honouring the minimum and maximum chunk size"""
+    ends = []
+    start = 0
+    for end in chunk_candidates(data) + [len(data)]:
+        while end - start > CHUNK_MAX:
+            start += CHUNK_MAX
+            ends.append(start)
+        if end - start >= CHUNK_MIN or (end == len(data) and end > start):
+            ends.append(end)
+            start = end
+    return ends
+
+
+class ImageStore:
+    """Content-addressed store of every image read or written
+    
+    Images are keyed by SHA-256 and split into content-defined chunks that
+    are kept once, so near-identical dumps share most of their storage.
+    An SQLite index answers lookups by device, hash or date.
+    """
+    
+    def __init__(self, root=None):
+        self.root = root or data_dir("images")
+        self.db_path = os.path.join(self.root, "index.sqlite")
+        with self.connect() as db:
+            db.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS images (
+                    sha256 TEXT PRIMARY KEY, size INTEGER, chunks INTEGER, first_seen TEXT);
+                CREATE TABLE IF NOT EXISTS chunks (sha256 TEXT PRIMARY KEY, size INTEGER);
+                CREATE TABLE IF NOT EXISTS image_chunks (
+                    image TEXT, seq INTEGER, chunk TEXT, PRIMARY KEY (image, seq));
+                CREATE TABLE IF NOT EXISTS registrations (
+                    id INTEGER PRIMARY KEY, image TEXT, device TEXT, operation TEXT,
+                    path TEXT, created TEXT);
+                CREATE INDEX IF NOT EXISTS reg_image ON registrations (image);
+                CREATE INDEX IF NOT EXISTS reg_device ON registrations (device, created);
+                CREATE INDEX IF NOT EXISTS reg_created ON registrations (created);
+            """)
+            
+    @contextlib.contextmanager
+    def connect(self):
+        """A connection for one transaction, closed afterwards; every thread uses its own"""
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+        
+    def chunk_path(self, digest):
+        return os.path.join(self.root, "chunks", digest[:2], digest)
+        
+    def register(self, path, device="", operation="", data=None):
+        """Add an image and record where it came from
+        
+        data is the image contents if already read; otherwise the file is
+        mapped. Returns (sha256, earlier registrations of the same content).
+        """
+        if data is None:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        digest = hashlib.sha256(data).hexdigest()
+        with self.connect() as db:
+            earlier = db.execute(
+                "SELECT created, device, operation, path FROM registrations "
+                "WHERE image = ? ORDER BY created", (digest,)).fetchall()
+            if not db.execute("SELECT 1 FROM images WHERE sha256 = ?", (digest,)).fetchone():
+                self.store_chunks(db, digest, data)
+            db.execute("INSERT INTO registrations (image, device, operation, path, created) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       (digest, device, operation, os.path.abspath(path),
+                        time.strftime("%Y-%m-%dT%H:%M:%S")))
+        return digest, earlier
+        
+    def store_chunks(self, db, digest, data):
+        """Store the chunks of a new image, skipping those already present"""
+        rows = []
+        start = 0
+        for seq, end in enumerate(chunk_boundaries(data)):
+            piece = data[start:end]
+            chunk = hashlib.sha256(piece).hexdigest()
+            if not db.execute("SELECT 1 FROM chunks WHERE sha256 = ?", (chunk,)).fetchone():
+                chunk_path = self.chunk_path(chunk)
+                os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                atomic_write(chunk_path, zlib.compress(piece, 6))
+                db.execute("INSERT OR IGNORE INTO chunks VALUES (?, ?)", (chunk, len(piece)))
+            rows.append((digest, seq, chunk))
+            start = end
+        db.executemany("INSERT INTO image_chunks VALUES (?, ?, ?)", rows)
+        db.execute("INSERT INTO images VALUES (?, ?, ?, ?)",
+                   (digest, len(data), len(rows), time.strftime("%Y-%m-%dT%H:%M:%S")))
+                   
+    def lookup(self, query, limit=50):
+        """Registrations matching a hash prefix, a date prefix or a device name"""
+        query = query.strip()
+        sql = ("SELECT r.created, r.device, r.operation, r.image, i.size, r.path "
+               "FROM registrations r JOIN images i ON i.sha256 = r.image WHERE ")
+        if re.fullmatch(r"[0-9a-fA-F]{8,64}", query):
+            sql += "r.image LIKE ?"
+            args = (query.lower() + "%",)
+        elif re.fullmatch(r"\d{4}(-\d{2}){0,2}", query):
+            sql += "r.created LIKE ?"
+            args = (query + "%",)
+        else:
+            sql += "r.device LIKE ?"
+            args = (f"%{query}%",)
+        with self.connect() as db:
+            return db.execute(sql + " ORDER BY r.created DESC LIMIT ?", args + (limit,)).fetchall()
+            
+    def history(self, digest):
+        """(number of registrations, first created, its device, its operation) for an image"""
+        with self.connect() as db:
+            # SQLite takes the bare columns from the row that holds MIN(created)
+            return db.execute("SELECT COUNT(*), MIN(created), device, operation "
+                              "FROM registrations WHERE image = ?", (digest,)).fetchone()
+            
+    def export(self, digest, path):
+        """Reassemble a stored image into a file"""
+        with self.connect() as db:
+            if not db.execute("SELECT 1 FROM images WHERE sha256 = ?", (digest,)).fetchone():
+                raise KeyError(digest)
+            chunks = [row[0] for row in db.execute(
+                "SELECT chunk FROM image_chunks WHERE image = ? ORDER BY seq", (digest,))]
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                with open(self.chunk_path(chunk), "rb") as piece:
+                    f.write(zlib.decompress(piece.read()))
+                    
+    def stats(self):
+        """(images, logical bytes, stored chunk bytes)"""
+        with self.connect() as db:
+            images, logical = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images").fetchone()
+            stored = db.execute("SELECT COALESCE(SUM(size), 0) FROM chunks").fetchone()[0]
+        return images, logical, stored
+
+
+class HelperProcessPool:
+    """Pre-spawned shells that wait for a command line on stdin
+    
+    Helpers are started under stdbuf, so a minipro exec'd from one inherits
+    unbuffered output without paying for a shell and stdbuf per operation.
+    """
+    HELPER_SCRIPT = 'IFS= read -r cmd && eval "exec $cmd"'
+    
+    def __init__(self, size=2):
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.filling = False
+        self.closed = False
+        
+    def helper_argv(self):
+        """Command used to start one idle helper"""
+        argv = ["sh", "-c", self.HELPER_SCRIPT]
+        if shutil.which("stdbuf"):
+            argv = ["stdbuf", "-o0", "-e0"] + argv
+        return argv
+        
+    def fill(self):
+        """Spawn helpers until the pool is full"""
+        try:
+            while True:
+                with self.lock:
+                    if self.closed or len(self.idle) >= self.size:
+                        return
+                helper = subprocess.Popen(
+                    self.helper_argv(),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=0
+                )
+                with self.lock:
+                    if not self.closed:
+                        self.idle.append(helper)
+                        continue
+                helper.kill()
+                helper.wait()
+                return
+        finally:
+            with self.lock:
+                self.filling = False
+                
+    def refill_async(self):
+        """Top the pool up in the background"""
+        with self.lock:
+            if self.filling or self.closed:
+                return
+            self.filling = True
+        threading.Thread(target=self.fill, daemon=True).start()
+        
+    def acquire(self):
+        """Take an idle helper, or None if none is ready"""
+        helper = None
+        with self.lock:
+            while self.idle:
+                candidate = self.idle.pop(0)
+                if candidate.poll() is None:
+                    helper = candidate
+                    break
+        self.refill_async()
+        return helper
+        
+    def close(self):
+        """Stop all idle helpers"""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for helper in idle:
+            helper.kill()
+            helper.wait()
+            for stream in (helper.stdin, helper.stdout, helper.stderr):
+                stream.close()
+
+
+class MiniProBackend:
+    """Starts minipro processes: binary path, helper pool and spawn timing"""
+    
+    def __init__(self, binary="minipro", pool_size=0):
+        self.binary = binary
+        self.pool = None
+        self.spawn_times = {}  # operation -> latest spawn latencies in ms
+        self.set_pool_size(pool_size)
+        
+    def set_pool_size(self, size):
+        """Resize the helper pool; 0 starts every command cold"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+        # Helpers rely on a POSIX shell
+        if size > 0 and os.name == "posix":
+            self.pool = HelperProcessPool(size)
+            self.pool.refill_async()
+            
+    def command_line(self, args):
+        """Shell command line running minipro with the given arguments"""
+        return f"{shlex.quote(self.binary)} {args}"
+        
+    def spawn(self, command):
+        """Start a shell command line
+        
+        Returns the process, the spawn latency in ms and whether a pooled
+        helper was used.
+        """
+        started = time.perf_counter()
+        helper = self.pool.acquire() if self.pool else None
+        
+        if helper:
+            helper.stdin.write(command + "\n")
+            helper.stdin.close()
+            process = helper
+        else:
+            # Try to use stdbuf for unbuffered output (Linux)
+            if shutil.which('stdbuf'):
+                command = f"stdbuf -o0 -e0 {command}"
+            
+            # Keep stdout and stderr SEPARATE
+            # minipro outputs progress to STDERR!
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,  # Keep separate!
+                text=True,
+                bufsize=0,
+                universal_newlines=True
+            )
+        
+        return process, (time.perf_counter() - started) * 1000, helper is not None
+        
+    def record_spawn(self, operation, latency_ms):
+        """Remember a spawn latency for an operation (the last 1000 are kept)"""
+        if operation not in self.spawn_times:
+            self.spawn_times[operation] = collections.deque(maxlen=1000)
+        self.spawn_times[operation].append(latency_ms)
+        
+    def spawn_summary(self, operation):
+        """Average spawn latency and sample count for an operation"""
+        samples = self.spawn_times.get(operation, [])
+        if not samples:
+            return 0.0, 0
+        return sum(samples) / len(samples), len(samples)
+        
+    def close(self):
+        """Release pooled helpers"""
+        if self.pool:
+            self.pool.close()
+
+
+class DeviceProfileStore:
+    """Named per-device settings profiles and best measured throughput
+    
+    Both live in QSettings as one JSON document each, so restoring a profile
+    is a dictionary lookup and saving one is a single write.
+    """
+    
+    def __init__(self, settings):
+        self.settings = settings
+        self.profiles = self.load("device_profiles")      # device -> label -> profile
+        self.throughput = self.load("device_throughput")  # device -> operation -> best run
+        
+    def load(self, key):
+        """Read a JSON document from settings"""
+        try:
+            return json.loads(self.settings.value(key, "{}"))
+        except (TypeError, ValueError):
+            return {}
+            
+    def store(self, key, data):
+        """Write a JSON document to settings"""
+        self.settings.setValue(key, json.dumps(data, sort_keys=True))
+        
+    @staticmethod
+    def label(name, project=""):
+        """Display name for a profile, qualified by project when given"""
+        return f"{name} [{project}]" if project else name
+        
+    def names(self, device):
+        """Profile labels stored for a device"""
+        return sorted(self.profiles.get(device, {}))
+        
+    def get(self, device, label):
+        """Return a stored profile, or None"""
+        return self.profiles.get(device, {}).get(label)
+        
+    def save(self, device, name, values, project=""):
+        """Store a profile and return its label"""
+        label = self.label(name, project)
+        self.profiles.setdefault(device, {})[label] = {
+            "name": name,
+            "project": project,
+            "settings": values,
+        }
+        self.store("device_profiles", self.profiles)
+        return label
+        
+    def delete(self, device, label):
+        """Remove a profile"""
+        device_profiles = self.profiles.get(device, {})
+        if device_profiles.pop(label, None) is not None:
+            if not device_profiles:
+                del self.profiles[device]
+            self.store("device_profiles", self.profiles)
+            
+    def record_throughput(self, device, operation, bytes_per_sec, spi_clock, pulse_delay):
+        """Remember a run's settings if it was the fastest so far; returns True if so"""
+        best = self.throughput.get(device, {}).get(operation)
+        if best and best["bytes_per_sec"] >= bytes_per_sec:
+            return False
+        self.throughput.setdefault(device, {})[operation] = {
+            "bytes_per_sec": round(bytes_per_sec, 1),
+            "spi_clock": spi_clock,
+            "pulse_delay": pulse_delay,
+        }
+        self.store("device_throughput", self.throughput)
+        return True
+        
+    def best_settings(self, device):
+        """Settings of the fastest recorded run, preferring writes"""
+        runs = self.throughput.get(device, {})
+        for operation in ("write", "verify", "read"):
+            if operation in runs:
+                return runs[operation]
+        return None
+
+
+# Scan station: barcode -> job template index
+
+SCAN_OPERATIONS = ("write", "verify", "read", "erase", "blank_check")
+
+
+def normalize_scan(code):
+    """Barcode as looked up: surrounding whitespace removed, case folded"""
+    return code.strip().upper()
+
+
+class ScanIndex:
+    """Job templates from a JSON file, indexed by every barcode that selects them
+    
+        {"confirm": "CMD-START", "cancel": "CMD-CANCEL",
+         "jobs": [{"codes": ["WO-1001", "PN-4411"], "name": "Boot ROM rev B",
+                   "device": "AT28C256@DIP28", "operation": "write",
+                   "file": "images/boot_b.bin", "profile": "fast [boot]",
+                   "memory": "code"}]}
+    
+    Relative image paths are resolved against the file's folder when the
+    index is built, so a scan is one dictionary lookup. The file is reloaded
+    when its modification time changes.
+    """
+    
+    def __init__(self, path=""):
+        self.path = path
+        self.mtime = None
+        self.jobs = {}  # normalized code -> template
+        self.templates = []
+        self.confirm = "CMD-START"
+        self.cancel = "CMD-CANCEL"
+        self.problems = []
+        
+    def refresh(self):
+        """Reload the file if it changed; returns True if the index was rebuilt"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns if self.path else None
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        self.load()
+        return True
+        
+    def load(self):
+        self.jobs = {}
+        self.templates = []
+        self.problems = []
+        if self.mtime is None:
+            if self.path:
+                self.problems.append(f"cannot read {self.path}")
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.problems.append(f"{os.path.basename(self.path)}: {e}")
+            return
+        self.confirm = normalize_scan(str(data.get("confirm", "CMD-START")))
+        self.cancel = normalize_scan(str(data.get("cancel", "CMD-CANCEL")))
+        base = os.path.dirname(os.path.abspath(self.path))
+        for number, job in enumerate(data.get("jobs", []), 1):
+            template, problem = self.build_template(job, base)
+            name = job.get("name") if isinstance(job, dict) and job.get("name") else f"job {number}"
+            if problem:
+                self.problems.append(f"{name}: {problem}")
+                continue
+            indexed = False
+            for code in template["codes"]:
+                if code in (self.confirm, self.cancel):
+                    self.problems.append(f"{name}: {code} is reserved")
+                elif code in self.jobs:
+                    self.problems.append(f"{name}: {code} already selects {self.jobs[code]['name']}")
+                else:
+                    self.jobs[code] = template
+                    indexed = True
+            if indexed:
+                self.templates.append(template)
+            
+    @staticmethod
+    def build_template(job, base):
+        """(template, None) for a valid job entry, or (None, reason)"""
+        if not isinstance(job, dict):
+            return None, "not an object"
+        codes = job.get("codes", job.get("code", []))
+        codes = [normalize_scan(str(code)) for code in ([codes] if isinstance(codes, str) else codes)]
+        operation = job.get("operation", "write")
+        device = str(job.get("device", "")).strip()
+        file = str(job.get("file", "")).strip()
+        if not any(codes):
+            return None, "no barcode"
+        if not device:
+            return None, "no device"
+        if operation not in SCAN_OPERATIONS:
+            return None, f"unknown operation {operation!r}"
+        if operation in ("write", "verify", "read") and not file:
+            return None, f"{operation} needs a file"
+        memory = job.get("memory")
+        if memory is not None and memory not in [name for name, _ in MEMORY_REGIONS]:
+            return None, f"unknown memory {memory!r}"
+        if file and not os.path.isabs(file):
+            file = os.path.join(base, file)
+        return {
+            "codes": [code for code in codes if code],
+            "name": str(job.get("name") or codes[0]),
+            "device": device,
+            "operation": operation,
+            "file": file,
+            "profile": str(job.get("profile", "")),
+            "memory": memory,
+        }, None
+        
+    def lookup(self, code):
+        """Template selected by a scanned code, or None"""
+        return self.jobs.get(normalize_scan(code))
+
+
+class SpiTuningStore:
+    """SPI clock sweep results keyed by device and socket/adapter"""
+    
+    def __init__(self, settings):
+        self.settings = settings
+        try:
+            self.results = json.loads(settings.value("spi_tuning", "{}"))
+        except (TypeError, ValueError):
+            self.results = {}
+            
+    @staticmethod
+    def key(device, adapter):
+        return f"{device}|{adapter or 'default'}"
+        
+    def get(self, device, adapter):
+        """Stored sweep for a setup, or None if it was never tuned"""
+        return self.results.get(self.key(device, adapter))
+        
+    def save(self, device, adapter, clocks, recommended):
+        """Store a finished sweep"""
+        self.results[self.key(device, adapter)] = {
+            "tested": time.strftime("%Y-%m-%d %H:%M"),
+            "clocks": clocks,
+            "recommended": recommended,
+        }
+        self.settings.setValue("spi_tuning", json.dumps(self.results, sort_keys=True))
+        
+    @staticmethod
+    def recommend(clocks):
+        """Fastest clock whose passes were all error-free"""
+        clean = [clock for clock, result in clocks.items()
+                 if result["passes"] and not result["errors"]]
+        return max(clean, key=float) if clean else None
+
+
+# Station metrics (Prometheus text format)
+
+# Histogram bucket upper bounds, in seconds
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Progress status prefix -> programming phase
+STATUS_PHASES = {"Reading": "read", "Writing": "write", "Verifying": "verify", "Erasing": "erase"}
+
+# name -> (type, help)
+METRICS = {
+    "minipro_operations_total": ("counter", "minipro commands run, by operation and result."),
+    "minipro_bytes_programmed_total": ("counter", "Image bytes written to devices."),
+    "minipro_failures_total": ("counter", "Failed commands by failure class."),
+    "minipro_retries_total": ("counter", "Automatic retries started, by failure class."),
+    "minipro_operation_duration_seconds": ("histogram", "Duration of minipro commands."),
+    "minipro_phase_duration_seconds": ("histogram", "Duration of erase, write, verify and read phases."),
+    "minipro_queue_depth": ("gauge", "Control API jobs waiting to run."),
+    "minipro_busy": ("gauge", "1 while a command is running."),
+    "minipro_programmer_connected": ("gauge", "1 when a programmer is plugged in (-1 if unknown)."),
+    "minipro_start_time_seconds": ("gauge", "When this station's GUI was started."),
+}
+
+
+class Metrics:
+    """Counters and histograms of a programming station
+    
+    Updating is a dict lookup and an addition on the GUI thread, with no
+    locking or formatting; render() builds the Prometheus text exposition
+    format when the exporter asks for it. Labels are tuples of (name, value)
+    pairs.
+    """
+    
+    def __init__(self):
+        self.counters = collections.defaultdict(float)
+        self.histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self.started = time.time()
+        self.phase = None
+        self.phase_started = 0.0
+        self.last_status = None
+        
+    def inc(self, name, labels=(), value=1):
+        self.counters[name, labels] += value
+        
+    def observe(self, name, value, labels=()):
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[name, labels] = [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+        histogram[bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+        histogram[-1] += value
+        
+    def progress(self, status):
+        """Follow phase changes in progress status text"""
+        if status == self.last_status:
+            return
+        self.last_status = status
+        phase = STATUS_PHASES.get(status.split(" ", 1)[0].rstrip(".:"))
+        if phase and phase != self.phase:
+            self.end_phase()
+            self.phase = phase
+            self.phase_started = time.perf_counter()
+            
+    def end_phase(self):
+        if self.phase:
+            self.observe("minipro_phase_duration_seconds", time.perf_counter() - self.phase_started,
+                         (("phase", self.phase),))
+            self.phase = None
+        self.last_status = None
+        
+    @staticmethod
+    def format_labels(labels, extra=""):
+        pairs = [f'{key}="{value}"' for key, value in labels]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+        
+    def render(self, gauges=None):
+        """Prometheus text format; gauges maps names to values sampled by the caller"""
+        series = collections.defaultdict(list)
+        for (name, labels), value in sorted(self.counters.items()):
+            series[name].append(f"{name}{self.format_labels(labels)} {value:.15g}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + ("+Inf",), histogram):
+                cumulative += count
+                bucket = self.format_labels(labels, f'le="{bound}"')
+                series[name].append(f"{name}_bucket{bucket} {cumulative}")
+            series[name].append(f"{name}_sum{self.format_labels(labels)} {histogram[-1]:.6g}")
+            series[name].append(f"{name}_count{self.format_labels(labels)} {cumulative}")
+        gauges = dict(gauges or {}, minipro_start_time_seconds=self.started)
+        for name, value in gauges.items():
+            series[name].append(f"{name} {value:.15g}")
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            if series.get(name):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(series[name])
+        return "\n".join(lines) + "\n"
+
+
+# Console log: line index and rotating log files
+
+# Console colors -> severity, for the index and the log files
+COLOR_SEVERITY = {
+    "#f44336": "error",
+    "#ff9800": "warning",
+    "#4caf50": "success",
+    "#4fc3f7": "info",
+    "#9c27b0": "debug",
+}
+SEVERITY_COLOR = {severity: color for color, severity in COLOR_SEVERITY.items()}
+LOG_SEVERITIES = ("output",) + tuple(SEVERITY_COLOR)
+
+# Console filter bar choices -> severities shown (empty = all)
+CONSOLE_SEVERITY_FILTERS = {
+    "All severities": (),
+    "Errors": ("error",),
+    "Warnings and errors": ("warning", "error"),
+    "Success": ("success",),
+    "Info": ("info",),
+    "Debug": ("debug",),
+    "minipro output": ("output",),
+}
+CONSOLE_FILTER_SHOWN = 2000  # newest matching lines rendered in the filtered view
+
+
+class ConsoleLog:
+    """Console lines, indexed by severity and operation for filtering
+    
+    Line numbers per severity and per operation are kept in compact arrays.
+    Text search first tests whole lowercased blocks of lines, so blocks
+    without a hit cost a single substring search; a query that extends the
+    previous one only rechecks the previous hits and the lines added since.
+    With a limit, the oldest block is dropped once a whole block more than
+    the limit is held, so the index stays bounded like the console itself.
+    Line numbers keep counting across dropped blocks.
+    """
+    BLOCK = 4096
+    
+    def __init__(self, limit=0):
+        self.limit = limit
+        self.first = 0  # number of the oldest line held
+        self.lines = []
+        self.times = array.array("d")
+        self.severities = bytearray()
+        self.operations = array.array("H")
+        self.operation_names = []
+        self.operation_ids = {}
+        self.by_severity = {severity: array.array("I") for severity in LOG_SEVERITIES}
+        self.by_operation = {}
+        self.blocks = []  # lowercased lines of each complete block held, joined by \x1f
+        self.last_search = None
+        
+    def __len__(self):
+        return len(self.lines)
+        
+    def line(self, number):
+        return self.lines[number - self.first]
+        
+    def severity(self, number):
+        return LOG_SEVERITIES[self.severities[number - self.first]]
+        
+    def add(self, text, severity, operation):
+        """Index one line; returns its number"""
+        number = self.first + len(self.lines)
+        if operation not in self.operation_ids:
+            self.operation_ids[operation] = len(self.operation_names)
+            self.operation_names.append(operation)
+            self.by_operation[operation] = array.array("I")
+        self.lines.append(text)
+        self.times.append(time.time())
+        self.severities.append(LOG_SEVERITIES.index(severity))
+        self.operations.append(self.operation_ids[operation])
+        self.by_severity[severity].append(number)
+        self.by_operation[operation].append(number)
+        if (number + 1) % self.BLOCK == 0:
+            self.block_text(number // self.BLOCK)
+        if self.limit and len(self.lines) >= self.limit + self.BLOCK:
+            self.drop_block()
+        return number
+        
+    def drop_block(self):
+        """Forget the oldest block of lines"""
+        for values in (self.lines, self.times, self.severities, self.operations):
+            del values[:self.BLOCK]
+        self.first += self.BLOCK
+        for numbers in list(self.by_severity.values()) + list(self.by_operation.values()):
+            del numbers[:bisect.bisect_left(numbers, self.first)]
+        del self.blocks[:1]
+        self.last_search = None
+        
+    def block_text(self, block):
+        index = block - self.first // self.BLOCK
+        if index < len(self.blocks):
+            return self.blocks[index]
+        start = block * self.BLOCK - self.first
+        text = "\x1f".join(self.lines[start:start + self.BLOCK]).lower()
+        if start + self.BLOCK <= len(self.lines):
+            self.blocks.append(text)
+        return text
+        
+    def matches_line(self, number, query, severities=(), operation=None):
+        """Whether one line passes a filter (query already lowercased)"""
+        index = number - self.first
+        return ((not severities or LOG_SEVERITIES[self.severities[index]] in severities)
+                and (not operation or self.operation_names[self.operations[index]] == operation)
+                and query in self.lines[index].lower())
+                
+    def search(self, query, severities=(), operation=None):
+        """Line numbers matching a text query, severities and operation, in order"""
+        query = query.lower()
+        key = (tuple(severities), operation)
+        end = self.first + len(self.lines)
+        last = self.last_search
+        if last and last[0] == key and last[1] in query and last[2] <= end:
+            # Narrowing the previous search: recheck its hits, then the new lines
+            hits = [i for i in last[3] if query in self.line(i).lower()]
+            hits.extend(i for i in range(last[2], end) if self.matches_line(i, query, severities, operation))
+        else:
+            candidates = None
+            if severities:
+                candidates = sorted(i for severity in severities for i in self.by_severity[severity])
+            if operation:
+                numbers = self.by_operation.get(operation, ())
+                candidates = numbers if candidates is None else sorted(set(candidates).intersection(numbers))
+            if candidates is not None:
+                hits = [i for i in candidates if query in self.line(i).lower()]
+            elif not query:
+                hits = list(range(self.first, end))
+            else:
+                hits = []
+                for block in range(self.first // self.BLOCK, (end + self.BLOCK - 1) // self.BLOCK):
+                    text = self.block_text(block)
+                    if query in text:
+                        start = block * self.BLOCK
+                        hits.extend(start + i for i, line in enumerate(text.split("\x1f")) if query in line)
+        self.last_search = (key, query, end, hits)
+        return hits
+        
+
+class LogSink:
+    """Writes console lines to size-rotated files on a background thread
+    
+    write() only puts the line on a queue, so the GUI thread never waits
+    for the disk. The writer drains the queue in batches and rotates
+    minipro-gui.log to .1, .2, ... when it grows past max_bytes.
+    """
+    
+    def __init__(self, directory, max_bytes=5 * 1024 * 1024, backups=5):
+        self.path = os.path.join(directory, "minipro-gui.log")
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.thread.start()
+        
+    def write(self, text, severity, operation):
+        self.queue.put((time.time(), severity, operation, text))
+        
+    def close(self):
+        """Flush what is queued and stop the writer"""
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+        
+    def format(self, entry):
+        stamp, severity, operation, text = entry
+        clock = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stamp))
+        return "".join(f"{clock}.{int(stamp % 1 * 1000):03d} {severity:<7} {operation:<10} {line}\n"
+                       for line in text.splitlines() or [""])
+                       
+    def rotate(self, f):
+        f.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        return open(self.path, "a", encoding="utf-8")
+        
+    def run(self):
+        try:
+            f = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            return
+        try:
+            while True:
+                entries = [self.queue.get()]
+                while len(entries) < 1000:
+                    try:
+                        entries.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    f.write("".join(self.format(entry) for entry in entries if entry is not None))
+                    f.flush()
+                    if f.tell() >= self.max_bytes:
+                        f = self.rotate(f)
+                except OSError:
+                    pass
+                if None in entries:
+                    return
+        finally:
+            f.close()
+
+
+# Programmer hot-plug monitoring
+
+# USB vendor/product IDs of the programmers minipro drives
+PROGRAMMER_USB_IDS = {
+    ("04d8", "e11c"): "TL866A/CS",
+    ("a466", "0a53"): "TL866II+/T48/T56",
+}
+NETLINK_KOBJECT_UEVENT = 15
+
+# Operations that do not talk to the programmer
+PROGRAMMER_FREE_OPERATIONS = ("list", "info", "query", "detect")
+
+
+def scan_usb_programmers(sysfs_root="/sys"):
+    """Sorted (USB port, model) pairs of attached programmers, or None without sysfs"""
+    base = os.path.join(sysfs_root, "bus", "usb", "devices")
+    try:
+        entries = list(os.scandir(base))
+    except OSError:
+        return None
+    found = []
+    for entry in entries:
+        try:
+            with open(os.path.join(entry.path, "idVendor")) as f:
+                vendor = f.read().strip().lower()
+            with open(os.path.join(entry.path, "idProduct")) as f:
+                product = f.read().strip().lower()
+        except OSError:
+            continue
+        model = PROGRAMMER_USB_IDS.get((vendor, product))
+        if model:
+            found.append((entry.name, model))
+    return sorted(found)
+
+
+def parse_programmer_probe(text):
+    """Model, firmware and serial number from `minipro -k` output, or None"""
+    match = re.search(r"Found\s+(\S+)\s+v?(\d[\w.]*)", text)
+    if not match:
+        return None
+    serial = re.search(r"Serial code:\s*(\S+)", text)
+    return {"model": match.group(1), "firmware": match.group(2),
+            "serial": serial.group(1) if serial else ""}
+
+
+class ProgrammerMonitor(QObject):
+    """Know whether a programmer is plugged in without running minipro
+    
+    Listens for kernel USB uevents on a netlink socket and rescans sysfs
+    when one arrives. Without netlink (other platforms, sandboxes, or a
+    sysfs_root pointing at a test tree) sysfs is polled instead. Each newly
+    attached programmer is probed once with `minipro -k`; the result is
+    cached until it is unplugged.
+    """
+    changed = pyqtSignal(dict)
+    
+    def __init__(self, binary, sysfs_root="/sys", poll_ms=2000, settle_ms=500):
+        super().__init__()
+        self.binary = binary
+        self.sysfs_root = sysfs_root
+        self.devices = None  # None until sysfs has been read (or if there is none)
+        self.probes = {}  # USB port -> parsed -k output
+        self.probing = None
+        self.can_probe = lambda: True
+        self.socket = None
+        self.notifier = None
+        self.process = None
+        self.rescan = QTimer(self)
+        self.rescan.setSingleShot(True)
+        # Give udev time to set permissions before minipro opens the device
+        self.rescan.setInterval(settle_ms)
+        self.rescan.timeout.connect(self.scan)
+        self.poll = QTimer(self)
+        self.poll.setInterval(poll_ms)
+        self.poll.timeout.connect(self.scan)
+        self.probe_retry = QTimer(self)
+        self.probe_retry.setSingleShot(True)
+        self.probe_retry.setInterval(1000)
+        self.probe_retry.timeout.connect(self.probe_next)
+        
+    def start(self):
+        """Begin monitoring; returns "netlink" or "polling" """
+        mode = "netlink" if self.open_netlink() else "polling"
+        if mode == "polling":
+            self.poll.start()
+        self.scan()
+        return mode
+        
+    def stop(self):
+        self.rescan.stop()
+        self.poll.stop()
+        self.probe_retry.stop()
+        if self.notifier:
+            self.notifier.setEnabled(False)
+            self.notifier = None
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        if self.process:
+            self.process.kill()
+            self.process = None
+            
+    def open_netlink(self):
+        if self.sysfs_root != "/sys" or not hasattr(socket, "AF_NETLINK"):
+            return False
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, 1))  # multicast group 1: kernel uevents
+            sock.setblocking(False)
+        except OSError:
+            return False
+        self.socket = sock
+        self.notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Type.Read, self)
+        self.notifier.activated.connect(self.uevent)
+        return True
+        
+    def uevent(self):
+        """Drain pending uevents; rescan once if any concerned a USB device"""
+        relevant = False
+        while True:
+            try:
+                message = self.socket.recv(16384)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            relevant = relevant or (b"SUBSYSTEM=usb\0" in message and b"DEVTYPE=usb_device" in message)
+        if relevant:
+            self.rescan.start()
+            
+    def scan(self, probe=True):
+        """Compare sysfs with the last scan; probe new programmers, forget removed ones"""
+        devices = scan_usb_programmers(self.sysfs_root)
+        if devices == self.devices:
+            return
+        self.devices = devices
+        ports = {port for port, _ in devices or ()}
+        self.probes = {port: probe for port, probe in self.probes.items() if port in ports}
+        self.changed.emit(self.state())
+        if probe:
+            self.probe_next()
+        
+    def probe_next(self):
+        """Probe the first attached programmer without a cached -k result"""
+        if self.process or not self.devices:
+            return
+        port = next((port for port, _ in self.devices if port not in self.probes), None)
+        if port is None:
+            return
+        if not self.can_probe():
+            # minipro is in use; the programmer can only serve one client
+            self.probe_retry.start()
+            return
+        self.probing = port
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.process.finished.connect(self.probe_finished)
+        self.process.errorOccurred.connect(self.probe_failed)
+        self.process.start(self.binary, ["-k"])
+        self.changed.emit(self.state())
+        
+    def probe_finished(self, *args):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        output = bytes(process.readAll()).decode("utf-8", "replace")
+        process.deleteLater()
+        probe = parse_programmer_probe(output)
+        self.probes[self.probing] = probe or {"error": output.strip()[-200:] or "minipro did not answer"}
+        self.probing = None
+        self.changed.emit(self.state())
+        self.probe_next()
+        
+    def probe_failed(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.probe_finished()
+            
+    def finish_probe(self, msecs=5000):
+        """Wait for a running -k probe so a command can have the programmer
+        
+        A probe still running after msecs is killed and its port probed
+        again later. No new probe starts while waiting.
+        """
+        process, port = self.process, self.probing
+        if process is None:
+            return
+        can_probe, self.can_probe = self.can_probe, lambda: False
+        try:
+            if not process.waitForFinished(msecs):
+                process.kill()
+                process.waitForFinished(1000)
+                self.probes.pop(port, None)
+        finally:
+            self.can_probe = can_probe
+            
+    def record_probe(self, output):
+        """Cache the result of a -k run the user started"""
+        probe = parse_programmer_probe(output)
+        if probe and self.devices:
+            self.probes[self.devices[0][0]] = probe
+            self.changed.emit(self.state())
+            
+    def state(self):
+        """{"known", "connected", "count", "usb_model", "probing", "model", "firmware", "serial", "error"}"""
+        state = {"known": self.devices is not None, "connected": bool(self.devices),
+                 "count": len(self.devices or ()), "usb_model": "", "probing": False,
+                 "model": "", "firmware": "", "serial": "", "error": ""}
+        if self.devices:
+            port, state["usb_model"] = self.devices[0]
+            state["probing"] = self.probing == port
+            state.update(self.probes.get(port, {}))
+        return state
+
+
+# Failure classification and retries
+
+# (category, pattern) checked in order against minipro's output
+FAILURE_PATTERNS = [
+    ("overcurrent", re.compile(r"over-?current|short circuit", re.I)),
+    ("pin_contact", re.compile(r"bad contact|pin test failed|pin\s*\d+\s*:?\s*(?:bad|failed)", re.I)),
+    ("id_mismatch", re.compile(r"chip id mismatch|invalid chip id|id mismatch|unexpected chip id", re.I)),
+    ("verify_error", re.compile(r"verification failed|verify error|mismatch at address|"
+                                r"failed at address", re.I)),
+    ("usb", re.compile(r"libusb|usb error|bulk_transfer|no programmer found|"
+                       r"programmer (?:not found|disconnected)|io error|timed? ?out", re.I)),
+    ("file", re.compile(r"no such file|file not found|incorrect file size|"
+                        r"can't open|cannot open|permission denied|unsupported file", re.I)),
+]
+
+# category -> (worth retrying, run a pin contact check first)
+RETRY_POLICY = {
+    "pin_contact": (True, True),
+    "id_mismatch": (True, True),
+    "verify_error": (True, False),
+    "usb": (True, False),
+    "unknown": (True, False),
+    "overcurrent": (False, False),   # retrying into a short can damage the part
+    "file": (False, False),
+}
+
+
+def classify_failure(output):
+    """Map minipro's output from a failed command to (category, detail line)"""
+    lines = [line.strip() for line in re.split(r"[\r\n]+", output) if line.strip()]
+    for category, pattern in FAILURE_PATTERNS:
+        for line in reversed(lines):
+            if pattern.search(line):
+                return category, re.sub(r"\x1b\[[0-9;]*[A-Za-z]", "", line)
+    return "unknown", lines[-1] if lines else ""
+
+
+def failed_phase(output):
+    """Last phase minipro reported before failing: erase, write, verify or read"""
+    phases = re.findall(r"(Eras|Writ|Verif|Read)(?:ing|ication|y)", output, re.I)
+    return {"eras": "erase", "writ": "write", "verif": "verify", "read": "read"}.get(
+        phases[-1].lower() if phases else "", None)
+
+
+class FailureStats:
+    """How often each failure class occurs, per device"""
+    
+    def __init__(self, settings):
+        self.settings = settings
+        try:
+            self.stats = json.loads(settings.value("failure_stats", "{}"))
+        except (TypeError, ValueError):
+            self.stats = {}
+            
+    def record(self, device, category, recovered=None):
+        """Count a failure; recovered=True/False also counts the retry's outcome"""
+        entry = self.stats.setdefault(device, {}).setdefault(
+            category, {"count": 0, "recovered": 0, "unrecovered": 0, "last": ""})
+        if recovered is None:
+            entry["count"] += 1
+            entry["last"] = time.strftime("%Y-%m-%d %H:%M")
+        else:
+            entry["recovered" if recovered else "unrecovered"] += 1
+        self.settings.setValue("failure_stats", json.dumps(self.stats, sort_keys=True))
+        
+    def summary(self, device=None):
+        """(device, category, entry) rows, most frequent first"""
+        rows = [(name, category, entry) for name, categories in self.stats.items()
+                if device is None or name == device for category, entry in categories.items()]
+        return sorted(rows, key=lambda row: -row[2]["count"])
 
 
 class CommandThread(QThread):
-    """Thread for running minipro commands without blocking the GUI"""
+    """Long-lived worker running minipro commands without blocking the GUI
+    
+    One worker serves the whole session: submit() queues a command line and
+    run() executes commands one at a time, closing each process's pipes once
+    it has exited, so threads, descriptors and signal connections do not
+    accumulate over a shift. command, debug_mode and operation describe the
+    command being run.
+    """
     output_received = pyqtSignal(str)
     error_received = pyqtSignal(str)
     finished_signal = pyqtSignal(int)
     progress_update = pyqtSignal(int, str)  # progress percentage and status text
     debug_output = pyqtSignal(str)  # debug information
     
-    def __init__(self, command, debug_mode=False):
+    def __init__(self, backend=None):
         super().__init__()
-        self.command = command
-        self.debug_mode = debug_mode
-        
+        self.backend = backend or MiniProBackend()
+        self.jobs = queue.Queue()
+        self.command = None
+        self.debug_mode = False
+        self.operation = "other"
+        
+    def submit(self, command, debug_mode=False, operation="other"):
+        """Queue a command line, starting the worker on first use"""
+        self.jobs.put((command, debug_mode, operation))
+        if not self.isRunning():
+            self.start()
+            
+    def stop(self, timeout_ms=2000):
+        """End the worker once queued commands are done"""
+        if self.isRunning():
+            self.jobs.put(None)
+            self.wait(timeout_ms)
+            
     def parse_progress(self, line):
         """Parse minipro output for progress information"""
         # Strip ANSI escape sequences like [K (clear to end of line)
@@ -118,26 +2683,33 @@ class CommandThread(QThread):
                 self.debug_output.emit("[PROGRESS] Verification success detected")
         
     def run(self):
-        try:
-            # Force unbuffered output using stdbuf if available
-            command = self.command
-            
-            # Try to use stdbuf for unbuffered output (Linux)
-            import shutil
-            if shutil.which('stdbuf'):
-                command = f"stdbuf -o0 -e0 {self.command}"
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            self.command, self.debug_mode, self.operation = job
+            self.execute()
             
-            # Keep stdout and stderr SEPARATE
-            # minipro outputs progress to STDERR!
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # Keep separate!
-                text=True,
-                bufsize=0,
-                universal_newlines=True
-            )
+    @staticmethod
+    def release(process):
+        """Reap a finished (or abandoned) process and close its pipes"""
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        for stream in (process.stdin, process.stdout, process.stderr):
+            if stream:
+                stream.close()
+                
+    def execute(self):
+        """Run the current command, emitting its output, progress and return code"""
+        process = None
+        try:
+            # Force unbuffered output; pooled helpers already run under stdbuf
+            process, spawn_ms, pooled = self.backend.spawn(self.command)
+            self.backend.record_spawn(self.operation, spawn_ms)
+            if self.debug_mode:
+                source = "pooled helper" if pooled else "cold start"
+                self.debug_output.emit(f"[SPAWN] {spawn_ms:.2f} ms ({source})")
             
             import select
             import sys
@@ -215,30 +2787,740 @@ class CommandThread(QThread):
                 stderr_thread.start()
                 stdout_thread.start()
                 
-                stderr_thread.join()
-                stdout_thread.join()
+                stderr_thread.join()
+                stdout_thread.join()
+            
+            # Wait for process to complete
+            returncode = process.wait()
+            self.release(process)
+            self.finished_signal.emit(returncode)
+            
+        except Exception as e:
+            if process:
+                self.release(process)
+            self.error_received.emit(f"Error executing command: {str(e)}")
+            self.finished_signal.emit(-1)
+
+
+def parse_device_list_line(line):
+    """Device name from one line of `minipro -l` output, or None for headers and notes"""
+    line = line.strip()
+    
+    # Skip header lines and empty lines
+    if not line or line.startswith('-') or line.startswith('Device'):
+        return None
+    if any(keyword in line.lower() for keyword in ['supported', 'device', 'name']):
+        return None
+        
+    # Extract device name (first column/word)
+    # Device names can have @ for package or be standalone
+    device_name = line.split()[0]
+    # Filter out obvious non-device lines
+    if device_name.startswith('#') or device_name.lower() in ['note:', 'warning:', 'error:', 'found', 'total']:
+        return None
+    return device_name
+
+
+class DeviceListThread(QThread):
+    """Stream the full `minipro -l` device list off the GUI thread
+    
+    Lines are parsed as minipro prints them and new names are published in
+    batches (at most every BATCH_SECONDS, the first one at once), so the
+    list is searchable long before minipro finishes. Only the set of names
+    seen so far is kept, to drop duplicates.
+    """
+    devices_found = pyqtSignal(list)  # a batch of new names, in output order
+    devices_loaded = pyqtSignal(int)  # total number of names; 0 if the list could not be read
+    
+    BATCH_SIZE = 1000
+    BATCH_SECONDS = 0.05
+    TIMEOUT = 30
+    
+    def __init__(self, binary):
+        super().__init__()
+        self.binary = binary
+        self.process = None
+        
+    def stop(self):
+        """Abandon the listing"""
+        process = self.process
+        if process and process.poll() is None:
+            process.kill()
+        self.wait()
+        
+    def run(self):
+        seen = set()
+        batch = []
+        last_flush = 0.0
+        watchdog = None
+        try:
+            self.process = subprocess.Popen([self.binary, "-l"], stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL, text=True)
+            watchdog = threading.Timer(self.TIMEOUT, self.process.kill)
+            watchdog.start()
+            for line in self.process.stdout:
+                name = parse_device_list_line(line)
+                if name is None or name in seen:
+                    continue
+                seen.add(name)
+                batch.append(name)
+                now = time.perf_counter()
+                if len(batch) >= self.BATCH_SIZE or now - last_flush >= self.BATCH_SECONDS:
+                    self.devices_found.emit(batch)
+                    batch = []
+                    last_flush = now
+            if batch:
+                self.devices_found.emit(batch)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if watchdog:
+                watchdog.cancel()
+            if self.process:
+                CommandThread.release(self.process)
+                self.process = None
+        self.devices_loaded.emit(len(seen))
+
+
+class DeviceInfoThread(QThread):
+    """Look devices up in the device database off the GUI thread
+    
+    `minipro -d` can take seconds per device; the results end up in the
+    database cache, so the GUI can use them directly afterwards.
+    """
+    info_ready = pyqtSignal(dict)  # device -> parsed information, or None
+    
+    def __init__(self, device_db, devices):
+        super().__init__()
+        self.device_db = device_db
+        self.devices = list(devices)
+        
+    def run(self):
+        self.info_ready.emit({device: self.device_db.info(device) for device in self.devices})
+
+
+class PostReadThread(QThread):
+    """Run post-read stages concurrently in a process pool"""
+    stage_finished = pyqtSignal(str, str, float, bool)  # stage, summary, seconds, ok
+    pipeline_finished = pyqtSignal(float)  # wall-clock seconds
+    
+    def __init__(self, executor, stages):
+        super().__init__()
+        self.executor = executor
+        self.stages = stages  # list of (name, function, args)
+        
+    def run(self):
+        started = time.perf_counter()
+        futures = [self.executor.submit(run_stage, name, function, args)
+                   for name, function, args in self.stages]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                self.stage_finished.emit(*future.result())
+            except Exception as e:
+                self.stage_finished.emit("pipeline", f"error: {e}", 0.0, False)
+        self.pipeline_finished.emit(time.perf_counter() - started)
+
+
+class ImageRegisterThread(QThread):
+    """Add images to the image store one at a time, off the GUI thread"""
+    registered = pyqtSignal(str, str, str, object)  # path, operation, sha256, earlier registrations
+    failed = pyqtSignal(str, str)  # path, error
+    
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.jobs = queue.Queue()
+        
+    def submit(self, path, device, operation, data):
+        self.jobs.put((path, device, operation, data))
+        
+    def stop(self):
+        self.jobs.put(None)
+        self.wait()
+        
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            path, device, operation, data = job
+            try:
+                digest, earlier = self.store.register(path, device, operation, data)
+                self.registered.emit(path, operation, digest, earlier)
+            except (OSError, sqlite3.Error) as e:
+                self.failed.emit(path, str(e))
+
+
+class ArtifactWatcher(QObject):
+    """Watch a build artifact (or the newest matching file in a folder)
+    
+    Uses QFileSystemWatcher, which is inotify-backed on Linux, and falls back
+    to stat polling when a path cannot be watched. Change events are debounced
+    until the file's size and mtime stop changing, so half-written artifacts
+    are never reported.
+    """
+    artifact_ready = pyqtSignal(str)
+    
+    def __init__(self, path, patterns=("*",), settle_ms=150, poll_ms=500):
+        super().__init__()
+        self.path = path
+        self.patterns = patterns
+        self.last_stamp = None
+        self.reported = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.changed)
+        self.watcher.directoryChanged.connect(self.changed)
+        self.settle = QTimer(self)
+        self.settle.setSingleShot(True)
+        self.settle.setInterval(settle_ms)
+        self.settle.timeout.connect(self.check)
+        self.poll = QTimer(self)
+        self.poll.setInterval(poll_ms)
+        self.poll.timeout.connect(self.check)
+        
+    def start(self):
+        """Begin watching; the current artifact counts as already seen"""
+        watched = self.watcher.addPath(self.path)
+        if not os.path.isdir(self.path):
+            # Editors and build tools often replace the file, which drops the watch
+            watched = self.watcher.addPath(os.path.dirname(os.path.abspath(self.path))) and watched
+        if not watched:
+            self.poll.start()
+        artifact = self.current_artifact()
+        self.reported = artifact and self.stamp(artifact)
+        return watched
+        
+    def stop(self):
+        self.settle.stop()
+        self.poll.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+            
+    def current_artifact(self):
+        """The watched file, or the newest matching file in the watched folder"""
+        if not os.path.isdir(self.path):
+            return self.path if os.path.isfile(self.path) else None
+        newest, newest_time = None, -1
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in self.patterns):
+                    mtime = entry.stat().st_mtime_ns
+                    if mtime > newest_time:
+                        newest, newest_time = entry.path, mtime
+        return newest
+        
+    @staticmethod
+    def stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (path, stat.st_size, stat.st_mtime_ns)
+        
+    def changed(self, path):
+        """Something changed: wait for writes to settle"""
+        if path == self.path and path not in self.watcher.files() and os.path.isfile(path):
+            self.watcher.addPath(path)
+        self.settle.start()
+        
+    def check(self):
+        """Report the artifact once it has been stable for a whole settle interval"""
+        artifact = self.current_artifact()
+        stamp = artifact and self.stamp(artifact)
+        if not stamp or not stamp[1] or stamp == self.reported:
+            self.last_stamp = stamp
+            return
+        if stamp != self.last_stamp:
+            # Still being written (or first sighting): look again after the settle interval
+            self.last_stamp = stamp
+            self.settle.start()
+            return
+        self.reported = stamp
+        self.artifact_ready.emit(artifact)
+
+
+# Device names as minipro lists them, e.g. AT28C256@DIP28 or GAL16V8D(UES)@DIP20
+DEVICE_NAME = re.compile(r"[\w@.+(),/#-]+")
+
+
+def job_params_error(method, params):
+    """Why a read/write/verify/erase/blank_check job's params cannot be used, or None
+    
+    Jobs arrive from other programs, so device names and paths are checked
+    before they get anywhere near a command line.
+    """
+    if not isinstance(params, dict):
+        return "params must be an object"
+    device = params.get("device")
+    if not device:
+        return "params.device is required"
+    if not isinstance(device, str) or not DEVICE_NAME.fullmatch(device):
+        return "params.device is not a valid device name"
+    memory = params.get("memory")
+    if memory is not None and memory not in [name for name, _ in MEMORY_REGIONS]:
+        return f"params.memory must be one of {', '.join(name for name, _ in MEMORY_REGIONS)}"
+    if method in ("read", "write", "verify"):
+        path = params.get("file")
+        if not path:
+            return "params.file is required"
+        # Characters a shell would act on are never part of an image path here
+        if not isinstance(path, str) or re.search(r'[\x00-\x1f"$`\\]', path):
+            return "params.file is not a valid path"
+        if method == "read":
+            if not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+                return "params.file: the folder does not exist"
+        elif not os.path.isfile(path):
+            return "params.file: no such file"
+    return None
+
+
+class LocalServer(QObject):
+    """asyncio server on its own thread, bound to 127.0.0.1 or a Unix socket
+    
+    Subclasses implement handle(reader, writer) for each connection.
+    """
+    THREAD_NAME = "local-server"
+    
+    def __init__(self, host="127.0.0.1", port=0, unix_path=None):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.started = threading.Event()
+        self.error = None
+        
+    def start(self):
+        """Start serving; raises OSError if the address cannot be bound"""
+        self.thread = threading.Thread(target=self.serve, name=self.THREAD_NAME, daemon=True)
+        self.thread.start()
+        self.started.wait()
+        if self.error:
+            raise self.error
+            
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=2)
+            
+    def address(self):
+        return self.unix_path or f"http://{self.host}:{self.port}"
+        
+    def serve(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            if self.unix_path:
+                if os.path.exists(self.unix_path):
+                    os.unlink(self.unix_path)
+                start = asyncio.start_unix_server(self.handle, path=self.unix_path)
+            else:
+                start = asyncio.start_server(self.handle, self.host, self.port)
+            self.server = self.loop.run_until_complete(start)
+        except OSError as e:
+            self.error = e
+            self.started.set()
+            self.loop.close()
+            return
+        self.started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.close()
+            if self.unix_path and os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+                
+    async def handle(self, reader, writer):
+        raise NotImplementedError
+
+
+class ControlServer(LocalServer):
+    """Local HTTP / JSON-RPC control API for driving the GUI from other tools
+    
+    Requests become jobs that the GUI runs one at a time through the
+    same code paths as its buttons; job state is kept here under a lock.
+    
+        POST /rpc          JSON-RPC 2.0: read, write, verify, erase, blank_check,
+                           status, jobs, job
+        GET  /status       programmer busy flag and queue length
+        GET  /jobs[/<id>]  job table or one job
+        GET  /events       server-sent events: job updates and progress
+        
+    Every request carries "Authorization: Bearer <token>" and POST bodies
+    are application/json; requests from a browser page on another origin
+    are refused. Every event subscriber has its own bounded queue; a slow
+    subscriber only loses its own oldest events and never holds up the
+    command pipeline.
+    """
+    job_submitted = pyqtSignal(dict)
+    
+    OPERATIONS = ("read", "write", "verify", "erase", "blank_check")
+    MAX_BODY = 64 * 1024  # bytes; JSON-RPC requests are a few hundred
+    THREAD_NAME = "control-api"
+    
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None, token=""):
+        super().__init__(host, port, unix_path)
+        # Every request needs the token; one is generated when none is configured
+        self.token = token or secrets.token_urlsafe(24)
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.next_id = 1
+        self.busy = False
+        self.subscribers = set()
+        
+    # Job table (called from both threads)
+    
+    def submit(self, method, params):
+        with self.lock:
+            job = {"id": self.next_id, "method": method, "params": params, "state": "queued",
+                   "returncode": None, "progress": 0, "created": time.time(),
+                   "started": None, "finished": None}
+            self.jobs[job["id"]] = job
+            self.next_id += 1
+        self.publish("job", dict(job))
+        self.job_submitted.emit(dict(job))
+        return job["id"]
+        
+    def update_job(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(fields)
+            snapshot = dict(job)
+        self.publish("job", snapshot)
+        
+    def set_busy(self, busy):
+        self.busy = busy
+        
+    def status(self):
+        with self.lock:
+            queued = sum(1 for job in self.jobs.values() if job["state"] == "queued")
+        return {"busy": self.busy, "queued": queued, "subscribers": len(self.subscribers)}
+        
+    def job_list(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
             
-            # Wait for process to complete
-            returncode = process.wait()
-            self.finished_signal.emit(returncode)
+    def job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
             
-        except Exception as e:
-            self.error_received.emit(f"Error executing command: {str(e)}")
-            self.finished_signal.emit(-1)
+    def publish(self, kind, data):
+        """Queue an event for every subscriber (safe from any thread)"""
+        if self.loop and self.loop.is_running() and self.subscribers:
+            message = f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode()
+            self.loop.call_soon_threadsafe(self.broadcast, message)
+            
+    def broadcast(self, message):
+        for subscriber in self.subscribers:
+            if subscriber.full():
+                subscriber.get_nowait()
+            subscriber.put_nowait(message)
+            
+    # HTTP
+    
+    def origins(self):
+        """Origins a browser may call the API from: the server's own address"""
+        return {f"http://{host}:{self.port}" for host in (self.host, "localhost", "127.0.0.1")}
+        
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            method, target, _ = request.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            # Browsers send an Origin; a page on another site must not reach the API
+            origin = headers.get("origin")
+            if origin and origin not in self.origins():
+                await self.respond(writer, 403, {"error": "forbidden origin"})
+                return
+            # Nothing is read from unauthenticated clients beyond the headers
+            if not secrets.compare_digest(headers.get("authorization", ""), f"Bearer {self.token}"):
+                await self.respond(writer, 401, {"error": "unauthorized"})
+                return
+            if method == "POST" and headers.get("content-type", "").split(";")[0].strip() != "application/json":
+                await self.respond(writer, 415, {"error": "Content-Type must be application/json"})
+                return
+            length = int(headers.get("content-length", 0))
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            if length > self.MAX_BODY:
+                await self.respond(writer, 413, {"error": "request body too large"})
+                return
+            body = await reader.readexactly(length)
+            if method == "GET" and target == "/events":
+                await self.stream_events(writer)
+            elif method == "GET":
+                await self.get(writer, target)
+            elif method == "POST" and target == "/rpc":
+                await self.respond(writer, 200, self.rpc(body))
+            else:
+                await self.respond(writer, 404, {"error": "not found"})
+        except (ValueError, asyncio.IncompleteReadError):
+            await self.respond(writer, 400, {"error": "bad request"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            
+    async def respond(self, writer, status, payload):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                  413: "Content Too Large", 415: "Unsupported Media Type"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        
+    async def get(self, writer, target):
+        if target == "/status":
+            await self.respond(writer, 200, self.status())
+        elif target == "/jobs":
+            await self.respond(writer, 200, self.job_list())
+        elif target.startswith("/jobs/") and target[6:].isdigit():
+            job = self.job(int(target[6:]))
+            await self.respond(writer, 200 if job else 404, job or {"error": "no such job"})
+        else:
+            await self.respond(writer, 404, {"error": "not found"})
+            
+    async def stream_events(self, writer):
+        subscriber = asyncio.Queue(maxsize=256)
+        self.subscribers.add(subscriber)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+            writer.write(f"event: status\ndata: {json.dumps(self.status())}\n\n".encode())
+            await writer.drain()
+            while True:
+                writer.write(await subscriber.get())
+                await writer.drain()
+        finally:
+            self.subscribers.discard(subscriber)
+            
+    def rpc(self, body):
+        """Answer one JSON-RPC 2.0 request"""
+        try:
+            request = json.loads(body)
+            method, params = request["method"], request.get("params", {})
+        except (ValueError, KeyError, TypeError):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "parse error"}}
+        reply = {"jsonrpc": "2.0", "id": request.get("id")}
+        if method in self.OPERATIONS:
+            error = job_params_error(method, params)
+            if error:
+                reply["error"] = {"code": -32602, "message": error}
+            else:
+                reply["result"] = {"job": self.submit(method, params)}
+        elif method == "status":
+            reply["result"] = self.status()
+        elif method == "jobs":
+            reply["result"] = self.job_list()
+        elif method == "job":
+            job = self.job(params.get("id") if isinstance(params, dict) else None)
+            if job:
+                reply["result"] = job
+            else:
+                reply["error"] = {"code": -32602, "message": "no such job"}
+        else:
+            reply["error"] = {"code": -32601, "message": f"unknown method {method}"}
+        return reply
+
+
+class MetricsServer(LocalServer):
+    """Localhost HTTP endpoint serving the last rendered metrics at GET /metrics
+    
+    The GUI thread replaces text at each export, and requests only read it.
+    """
+    THREAD_NAME = "metrics"
+    
+    def __init__(self, port=9464):
+        super().__init__(port=port)
+        self.text = ""
+        
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            method, target, _ = request.decode("latin-1").split(" ", 2)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if method == "GET" and target in ("/metrics", "/"):
+                await self.respond(writer, "200 OK", self.text.encode())
+            else:
+                await self.respond(writer, "404 Not Found", b"not found\n")
+        except ValueError:
+            await self.respond(writer, "400 Bad Request", b"bad request\n")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            
+    async def respond(self, writer, status, body):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+
+class FuseMapView(QAbstractScrollArea):
+    """Fuse map grid, one row per product term, that only paints the rows in view
+    
+    Blown (1) fuses are dark, intact (0) fuses light and fuses marked as
+    different from a compared map red. Painting cost depends on the
+    viewport size, not on the number of fuses.
+    """
+    CELL = 10
+    LABEL = 44
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fuses = bytearray()
+        self.row_width = 32
+        self.marked = set()
+        self.colors = (QColor("#e0e0e0"), QColor("#37474f"))
+        self.mark_color = QColor("#f44336")
+        self.viewport().setMouseTracking(True)
+        self.setFont(QFont("Courier", 7))
+        
+    def set_fuses(self, fuses, row_width, marked=()):
+        self.fuses = fuses
+        self.row_width = max(1, row_width)
+        self.marked = set(marked)
+        self.update_scrollbars()
+        self.viewport().update()
+        
+    def rows(self):
+        return -(-len(self.fuses) // self.row_width)
+        
+    def update_scrollbars(self):
+        page = max(1, self.viewport().height() // self.CELL)
+        self.verticalScrollBar().setPageStep(page)
+        self.verticalScrollBar().setRange(0, max(0, self.rows() - page))
+        width = self.LABEL + self.row_width * self.CELL
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+        self.horizontalScrollBar().setRange(0, max(0, width - self.viewport().width()))
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+        
+    def fuse_at(self, position):
+        """Fuse index under a viewport position, or None"""
+        column = (position.x() + self.horizontalScrollBar().value() - self.LABEL) // self.CELL
+        row = position.y() // self.CELL + self.verticalScrollBar().value()
+        index = row * self.row_width + column
+        if 0 <= column < self.row_width and 0 <= index < len(self.fuses):
+            return index
+        return None
+        
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        first = self.verticalScrollBar().value()
+        last = min(self.rows(), first + self.viewport().height() // self.CELL + 1)
+        left = self.LABEL - self.horizontalScrollBar().value()
+        for row in range(first, last):
+            y = (row - first) * self.CELL
+            start = row * self.row_width
+            painter.setPen(self.colors[1])
+            painter.drawText(left - self.LABEL + 2, y + self.CELL - 1, str(start))
+            for column, fuse in enumerate(self.fuses[start:start + self.row_width]):
+                color = self.mark_color if start + column in self.marked else self.colors[fuse]
+                painter.fillRect(left + column * self.CELL, y, self.CELL - 1, self.CELL - 1, color)
+        painter.end()
+        
+    def mouseMoveEvent(self, event):
+        index = self.fuse_at(event.position().toPoint())
+        if index is None:
+            QToolTip.hideText()
+        else:
+            state = "differs" if index in self.marked else "blown" if self.fuses[index] else "intact"
+            QToolTip.showText(event.globalPosition().toPoint(),
+                              f"Fuse {index} (row {index // self.row_width}): {state}", self.viewport())
 
 
 class MiniProGUI(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.current_thread = None
+        self.command_worker = None
         self.device_thread = None
+        self.device_list_started = 0.0
+        self.console_log = ConsoleLog()
+        self.log_sink = None
+        self.log_operation = "gui"
         
         # Initialize settings
         self.settings = QSettings("MiniProGUI", "T48Programmer")
         
+        # minipro executable; MINIPRO_BINARY lets the replay stand-in take its place
+        # (the helper pool is sized when settings are restored)
+        self.backend = MiniProBackend(
+            os.environ.get("MINIPRO_BINARY") or self.settings.value("minipro_binary", "minipro")
+        )
+        
+        self.profile_store = DeviceProfileStore(self.settings)
+        self.current_command = None
+        self.command_started = 0.0
+        self.command_done = True
+        self.on_finished = None
+        self.spi_tuning_store = SpiTuningStore(self.settings)
+        self.spi_tuning = None
+        self.post_read_executor = None
+        self.post_read_threads = []  # one per pipeline still running
+        self.image_patchers = {}
+        self.rom_set_job = None
+        self.device_db = DeviceDatabase(self.backend)
+        self.device_info_thread = None
+        self.snapshot_job = None
+        self.backup_store = BackupStore()
+        self.backup_reading = False
+        self.image_store = None
+        self.image_register_thread = None
+        self.expanded_images = ExpandedImageCache()
+        self.artifact_watcher = None
+        self.watch_pending = None
+        self.watch_programmed = {}  # device -> SHA-256 of the last image written in watch mode
+        self.control_server = None
+        self.api_queue = []
+        self.api_job = None
+        self.api_progress = None
+        self.failure_stats = FailureStats(self.settings)
+        self.command_output = collections.deque(maxlen=400)
+        self.retry_state = None
+        self.burnin_job = None
+        self.logic_batch = None
+        self.logic_db = None
+        self.logic_identify = None
+        self.jedec = None
+        self.config_defs = ConfigDefinitions()
+        self.config_device = ""
+        self.config_words = {}
+        self.config_rows = []
+        self.programmer_monitor = None
+        self.programmer_state = None
+        self.metrics = Metrics()
+        self.metrics_server = None
+        self.metrics_writer = None
+        self.metrics_write = None
+        self.scan_index = ScanIndex()
+        self.scan_armed = None
+        self.scan_job = None
+        self.scan_stats = {"parts": 0, "failed": 0, "last_end": None}
+        try:
+            self.logic_usage = json.loads(self.settings.value("logic_usage", "{}"))
+        except (TypeError, ValueError):
+            self.logic_usage = {}
+        
         self.init_ui()
         self.populate_common_devices()
         self.restore_settings()
+        self.start_programmer_monitor()
+        self.toggle_log_sink(self.log_to_disk.isChecked())
+        self.update_metrics_export()
         
     def populate_common_devices(self):
         """Populate dropdown with commonly used devices"""
@@ -294,28 +3576,149 @@ class MiniProGUI(QMainWindow):
         index = self.file_format.findText(last_format)
         if index >= 0:
             self.file_format.setCurrentIndex(index)
-    
-    def save_settings(self):
-        """Save current settings"""
-        # Save last used device
-        self.settings.setValue("last_device", self.device_combo.currentText())
+            
+        # Restore backend settings
+        self.binary_path.setText(self.backend.binary)
+        self.pool_size.setValue(int(self.settings.value("helper_pool_size", 2)))
+        
+        # Restore post-read pipeline
+        for key, check in self.post_read_checks().items():
+            check.setChecked(self.settings.value(key, check.isChecked(), type=bool))
+        index = self.post_read_target.findText(self.settings.value("post_read_target", "ihex"))
+        if index >= 0:
+            self.post_read_target.setCurrentIndex(index)
+        self.golden_file.setText(self.settings.value("golden_file", ""))
+        
+        # Restore pre-write backup option
+        self.backup_before_write.setChecked(self.settings.value("backup_before_write", False, type=bool))
+        
+        # Restore serialization
+        self.apply_serialization_settings(self.settings.value("serialization", "{}"))
+        
+        # Restore watch mode target
+        self.watch_path.setText(self.settings.value("watch_path", ""))
+        self.watch_patterns.setText(self.settings.value("watch_patterns", self.watch_patterns.text()))
+        
+        # Restore retry policy
+        self.retry_enabled.setChecked(self.settings.value("retry_enabled", True, type=bool))
+        self.retry_max.setValue(int(self.settings.value("retry_max", 2)))
+        
+        # Restore control API address
+        self.api_port.setValue(int(self.settings.value("api_port", 8765)))
+        self.api_socket.setText(self.settings.value("api_socket", ""))
+        
+        # Restore metrics export (started once the window is built)
+        self.metrics_textfile.setText(self.settings.value("metrics_textfile", ""))
+        self.metrics_port.setValue(int(self.settings.value("metrics_port", 9464)))
+        self.metrics_interval.setValue(int(self.settings.value("metrics_interval", 15)))
+        for check, key in ((self.metrics_textfile_enabled, "metrics_textfile_enabled"),
+                           (self.metrics_http_enabled, "metrics_http_enabled")):
+            check.blockSignals(True)
+            check.setChecked(self.settings.value(key, False, type=bool))
+            check.blockSignals(False)
+            
+        # Restore console log option
+        self.log_to_disk.setChecked(self.settings.value("log_to_disk", True, type=bool))
         
-        # Save window geometry
-        self.settings.setValue("window_geometry", self.saveGeometry())
+        # Restore programmer monitor
+        self.require_programmer.setChecked(self.settings.value("require_programmer", True, type=bool))
+        self.sysfs_root.setText(self.settings.value("sysfs_root", "/sys"))
         
-        # Save last used files
-        self.settings.setValue("last_read_file", self.read_file.text())
-        self.settings.setValue("last_write_file", self.write_file.text())
+        # Restore scan station
+        self.scan_templates.setText(self.settings.value("scan_templates", ""))
+        self.scan_start_key.setText(self.settings.value("scan_start_key", "F12"))
+        self.scan_keep_armed.setChecked(self.settings.value("scan_keep_armed", True, type=bool))
+        self.update_scan_shortcut()
         
-        # Save memory type
-        self.settings.setValue("last_memory_type", self.memory_type.currentText())
+        # Restore image store option
+        self.store_images.setChecked(self.settings.value("store_images", True, type=bool))
         
-        # Save file format
-        self.settings.setValue("last_format", self.file_format.currentText())
+        # Restore recording directory
+        self.record_dir.setText(self.settings.value("record_dir", os.path.expanduser("~/minipro-recordings")))
+    
+    def save_settings(self):
+        """Save current settings"""
+        values = {
+            # Last used device
+            "last_device": self.device_combo.currentText(),
+            # Window geometry
+            "window_geometry": self.saveGeometry(),
+            # Last used files
+            "last_read_file": self.read_file.text(),
+            "last_write_file": self.write_file.text(),
+            # Memory type and file format
+            "last_memory_type": self.memory_type.currentText(),
+            "last_format": self.file_format.currentText(),
+            # Backend settings
+            "helper_pool_size": self.pool_size.value(),
+            # Recording directory
+            "record_dir": self.record_dir.text(),
+            # Post-read pipeline
+            "post_read_target": self.post_read_target.currentText(),
+            "golden_file": self.golden_file.text(),
+        }
+        for key, check in self.post_read_checks().items():
+            values[key] = check.isChecked()
+        values["backup_before_write"] = self.backup_before_write.isChecked()
+        values["store_images"] = self.store_images.isChecked()
+        values["watch_path"] = self.watch_path.text()
+        values["retry_enabled"] = self.retry_enabled.isChecked()
+        values["retry_max"] = self.retry_max.value()
+        values["api_port"] = self.api_port.value()
+        values["api_socket"] = self.api_socket.text()
+        values["watch_patterns"] = self.watch_patterns.text()
+        values["require_programmer"] = self.require_programmer.isChecked()
+        values["log_to_disk"] = self.log_to_disk.isChecked()
+        values["metrics_textfile"] = self.metrics_textfile.text()
+        values["metrics_textfile_enabled"] = self.metrics_textfile_enabled.isChecked()
+        values["metrics_http_enabled"] = self.metrics_http_enabled.isChecked()
+        values["metrics_port"] = self.metrics_port.value()
+        values["metrics_interval"] = self.metrics_interval.value()
+        values["sysfs_root"] = self.sysfs_root.text()
+        values["scan_templates"] = self.scan_templates.text()
+        values["scan_start_key"] = self.scan_start_key.text()
+        values["scan_keep_armed"] = self.scan_keep_armed.isChecked()
+        values["serialization"] = json.dumps(self.serialization_settings(), sort_keys=True)
+        
+        # An environment override of the binary is not persisted
+        if not os.environ.get("MINIPRO_BINARY"):
+            values["minipro_binary"] = self.backend.binary
+            
+        self.write_settings(values)
+        
+    def write_settings(self, values):
+        """Write a batch of settings, skipping unchanged keys, and flush once"""
+        for key, value in values.items():
+            # Stored values may read back as strings; compare them as the type being written
+            if not self.settings.contains(key) or self.settings.value(key, type=type(value)) != value:
+                self.settings.setValue(key, value)
+        self.settings.sync()
     
     def closeEvent(self, event):
         """Handle window close event"""
         self.save_settings()
+        if self.command_worker:
+            self.command_worker.stop()
+        if self.device_thread:
+            self.device_thread.stop()
+        if self.device_info_thread:
+            self.device_info_thread.wait()
+        self.backend.close()
+        if self.post_read_executor:
+            self.post_read_executor.shutdown(wait=False)
+        for thread in self.post_read_threads:
+            thread.wait()
+        if self.image_register_thread:
+            self.image_register_thread.stop()
+        if self.control_server:
+            self.control_server.stop()
+        if self.programmer_monitor:
+            self.programmer_monitor.stop()
+        self.toggle_log_sink(False)
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.metrics_writer:
+            self.metrics_writer.shutdown(wait=True)
         event.accept()
         
     def init_ui(self):
@@ -337,6 +3740,10 @@ class MiniProGUI(QMainWindow):
         self.tabs.addTab(self.create_firmware_tab(), "Firmware/Erase")
         self.tabs.addTab(self.create_config_tab(), "Configuration")
         self.tabs.addTab(self.create_advanced_tab(), "Advanced")
+        self.tabs.addTab(self.create_production_tab(), "Production")
+        self.tabs.addTab(self.create_burnin_tab(), "Burn-In")
+        self.tabs.addTab(self.create_logic_tab(), "Logic ICs")
+        self.tabs.addTab(self.create_jedec_tab(), "GAL/JEDEC")
         
         splitter.addWidget(self.tabs)
         
@@ -349,19 +3756,57 @@ class MiniProGUI(QMainWindow):
         self.console.setFont(QFont("Courier", 9))
         self.console.setStyleSheet("background-color: #1e1e1e; color: #d4d4d4;")
         
+        # Filtered view of the console, shown while the filter bar is in use
+        self.console_matches = QTextEdit()
+        self.console_matches.setReadOnly(True)
+        self.console_matches.setFont(QFont("Courier", 9))
+        self.console_matches.setStyleSheet("background-color: #1e1e1e; color: #d4d4d4;")
+        self.console_matches.setVisible(False)
+        
         console_controls = QHBoxLayout()
         clear_btn = QPushButton("Clear Console")
-        clear_btn.clicked.connect(self.console.clear)
+        clear_btn.clicked.connect(self.clear_console)
         console_controls.addWidget(clear_btn)
         
         self.debug_mode = QCheckBox("Debug Mode (show parsing)")
         self.debug_mode.setToolTip("Show detailed progress parsing information")
         console_controls.addWidget(self.debug_mode)
         
+        self.log_to_disk = QCheckBox("Log to Disk")
+        self.log_to_disk.setChecked(True)
+        self.log_to_disk.setToolTip(f"Write the console to {os.path.join(data_dir('logs'), 'minipro-gui.log')} "
+                                    "(rotated at 5 MB, 5 files kept)")
+        self.log_to_disk.toggled.connect(self.toggle_log_sink)
+        console_controls.addWidget(self.log_to_disk)
+        
         console_controls.addStretch()
         
+        # Filter bar
+        self.console_search = QLineEdit()
+        self.console_search.setPlaceholderText("Filter console...")
+        self.console_search.setClearButtonEnabled(True)
+        console_controls.addWidget(self.console_search)
+        self.console_severity = QComboBox()
+        self.console_severity.addItems(list(CONSOLE_SEVERITY_FILTERS))
+        console_controls.addWidget(self.console_severity)
+        self.console_operation = QComboBox()
+        self.console_operation.addItems(["All operations", "gui"])
+        console_controls.addWidget(self.console_operation)
+        self.console_match_count = QLabel("")
+        console_controls.addWidget(self.console_match_count)
+        
+        # Typing restarts a short timer, so a burst of keys runs one search
+        self.console_filter_timer = QTimer(self)
+        self.console_filter_timer.setSingleShot(True)
+        self.console_filter_timer.setInterval(80)
+        self.console_filter_timer.timeout.connect(self.apply_console_filter)
+        self.console_search.textChanged.connect(self.console_filter_timer.start)
+        self.console_severity.currentIndexChanged.connect(self.apply_console_filter)
+        self.console_operation.currentIndexChanged.connect(self.apply_console_filter)
+        
         console_layout.addLayout(console_controls)
         console_layout.addWidget(self.console)
+        console_layout.addWidget(self.console_matches)
         
         # Add progress bar
         progress_layout = QHBoxLayout()
@@ -383,6 +3828,8 @@ class MiniProGUI(QMainWindow):
         
         # Status bar
         self.statusBar().showMessage("Ready")
+        self.programmer_status = QLabel("")
+        self.statusBar().addPermanentWidget(self.programmer_status)
         
     def create_device_tab(self):
         """Device detection and information tab"""
@@ -408,6 +3855,22 @@ class MiniProGUI(QMainWindow):
         prog_buttons.addWidget(hw_check_btn)
         
         prog_layout.addLayout(prog_buttons)
+        
+        monitor_layout = QHBoxLayout()
+        self.require_programmer = QCheckBox("Check programmer before operations")
+        self.require_programmer.setChecked(True)
+        self.require_programmer.setToolTip("Refuse to start commands while no programmer is plugged in "
+                                           "(checked over USB, without running minipro)")
+        monitor_layout.addWidget(self.require_programmer)
+        monitor_layout.addWidget(QLabel("sysfs root:"))
+        self.sysfs_root = QLineEdit("/sys")
+        self.sysfs_root.setMaximumWidth(200)
+        self.sysfs_root.setToolTip("Where USB devices are looked up; point it at a fake tree for testing")
+        self.sysfs_root.editingFinished.connect(self.start_programmer_monitor)
+        monitor_layout.addWidget(self.sysfs_root)
+        monitor_layout.addStretch()
+        prog_layout.addLayout(monitor_layout)
+        
         prog_group.setLayout(prog_layout)
         layout.addWidget(prog_group)
         
@@ -437,6 +3900,7 @@ class MiniProGUI(QMainWindow):
         )
         self.device_combo.completer().setFilterMode(Qt.MatchFlag.MatchContains)
         
+        self.device_combo.currentTextChanged.connect(self.device_changed)
         search_layout.addWidget(self.device_combo)
         
         refresh_btn = QPushButton("Load Device List")
@@ -542,6 +4006,63 @@ class MiniProGUI(QMainWindow):
         read_group.setLayout(read_layout)
         layout.addWidget(read_group)
         
+        # Post-read pipeline
+        pipeline_group = QGroupBox("After Reading")
+        pipeline_layout = QVBoxLayout()
+        
+        stage_layout = QHBoxLayout()
+        self.post_read_enabled = QCheckBox("Run post-read pipeline:")
+        stage_layout.addWidget(self.post_read_enabled)
+        
+        self.post_read_hash = QCheckBox("Hash")
+        self.post_read_hash.setChecked(True)
+        stage_layout.addWidget(self.post_read_hash)
+        
+        self.post_read_blank = QCheckBox("Blank regions")
+        self.post_read_blank.setChecked(True)
+        stage_layout.addWidget(self.post_read_blank)
+        
+        self.post_read_convert = QCheckBox("Convert to")
+        stage_layout.addWidget(self.post_read_convert)
+        self.post_read_target = QComboBox()
+        self.post_read_target.addItems(["ihex", "srec", "binary"])
+        stage_layout.addWidget(self.post_read_target)
+        stage_layout.addStretch()
+        pipeline_layout.addLayout(stage_layout)
+        
+        golden_layout = QHBoxLayout()
+        self.post_read_compare = QCheckBox("Compare with golden image:")
+        golden_layout.addWidget(self.post_read_compare)
+        self.golden_file = QLineEdit()
+        golden_layout.addWidget(self.golden_file)
+        golden_browse = QPushButton("Browse...")
+        golden_browse.clicked.connect(lambda: self.browse_file(self.golden_file, save=False))
+        golden_layout.addWidget(golden_browse)
+        pipeline_layout.addLayout(golden_layout)
+        
+        pipeline_group.setLayout(pipeline_layout)
+        layout.addWidget(pipeline_group)
+        
+        # Full-device snapshot
+        snapshot_group = QGroupBox("Full-Device Snapshot (all memory regions)")
+        snapshot_layout = QHBoxLayout()
+        snapshot_layout.addWidget(QLabel("Archive:"))
+        self.snapshot_file = QLineEdit()
+        self.snapshot_file.setPlaceholderText("device-backup.zip")
+        snapshot_layout.addWidget(self.snapshot_file)
+        
+        snapshot_browse = QPushButton("Browse...")
+        snapshot_browse.clicked.connect(lambda: self.browse_file(
+            self.snapshot_file, save=True, filter="Snapshot Archives (*.zip);;All Files (*)"))
+        snapshot_layout.addWidget(snapshot_browse)
+        
+        for label, mode in (("Snapshot", "read"), ("Verify", "verify"), ("Restore", "write")):
+            button = QPushButton(label)
+            button.clicked.connect(lambda checked, mode=mode: self.start_snapshot(mode))
+            snapshot_layout.addWidget(button)
+        snapshot_group.setLayout(snapshot_layout)
+        layout.addWidget(snapshot_group)
+        
         # Write operations
         write_group = QGroupBox("Write to Device")
         write_layout = QVBoxLayout()
@@ -552,7 +4073,9 @@ class MiniProGUI(QMainWindow):
         write_file_layout.addWidget(self.write_file)
         
         write_browse = QPushButton("Browse...")
-        write_browse.clicked.connect(lambda: self.browse_file(self.write_file, save=False))
+        write_browse.clicked.connect(lambda: self.browse_file(
+            self.write_file, save=False,
+            filter="Images (*.bin *.rom *.hex *.srec *.jed *.gz *.xz *.zst *.bz2 *.zip);;All Files (*)"))
         write_file_layout.addWidget(write_browse)
         
         write_layout.addLayout(write_file_layout)
@@ -571,6 +4094,10 @@ class MiniProGUI(QMainWindow):
         self.no_size_error = QCheckBox("No Size Error")
         write_opts.addWidget(self.no_size_error)
         
+        self.backup_before_write = QCheckBox("Back Up First")
+        self.backup_before_write.setToolTip("Read and compress the current contents before writing")
+        write_opts.addWidget(self.backup_before_write)
+        
         write_opts.addStretch()
         write_layout.addLayout(write_opts)
         
@@ -589,6 +4116,10 @@ class MiniProGUI(QMainWindow):
         erase_btn.setStyleSheet("background-color: #f44336; color: white; font-weight: bold;")
         write_buttons.addWidget(erase_btn)
         
+        restore_btn = QPushButton("Restore Last Backup")
+        restore_btn.clicked.connect(self.restore_backup)
+        write_buttons.addWidget(restore_btn)
+        
         write_buttons.addStretch()
         write_layout.addLayout(write_buttons)
         
@@ -697,13 +4228,35 @@ class MiniProGUI(QMainWindow):
         
         # SPI settings
         spi_group = QGroupBox("SPI Settings (T48)")
+        spi_outer = QVBoxLayout()
         spi_layout = QHBoxLayout()
         spi_layout.addWidget(QLabel("SPI Clock (MHz):"))
         self.spi_clock = QComboBox()
         self.spi_clock.addItems(["Default", "4", "8", "15", "30"])
         spi_layout.addWidget(self.spi_clock)
         spi_layout.addStretch()
-        spi_group.setLayout(spi_layout)
+        spi_outer.addLayout(spi_layout)
+        
+        tune_layout = QHBoxLayout()
+        tune_layout.addWidget(QLabel("Socket/Adapter:"))
+        self.spi_adapter = QLineEdit()
+        self.spi_adapter.setPlaceholderText("e.g., ZIF, SOIC8 clip")
+        tune_layout.addWidget(self.spi_adapter)
+        
+        tune_layout.addWidget(QLabel("Passes:"))
+        self.spi_tune_passes = QSpinBox()
+        self.spi_tune_passes.setRange(1, 20)
+        self.spi_tune_passes.setValue(3)
+        tune_layout.addWidget(self.spi_tune_passes)
+        
+        tune_btn = QPushButton("Tune SPI Clock")
+        tune_btn.setToolTip("Read back and compare at each clock speed and pick the fastest error-free one")
+        tune_btn.clicked.connect(self.tune_spi_clock)
+        tune_layout.addWidget(tune_btn)
+        tune_layout.addStretch()
+        spi_outer.addLayout(tune_layout)
+        
+        spi_group.setLayout(spi_outer)
         layout.addWidget(spi_group)
         
         # Programming options
@@ -741,6 +4294,79 @@ class MiniProGUI(QMainWindow):
         icsp_group.setLayout(icsp_layout)
         layout.addWidget(icsp_group)
         
+        # Config / fuse words
+        fuse_group = QGroupBox("Config / Fuse Words")
+        fuse_layout = QVBoxLayout()
+        
+        fuse_buttons = QHBoxLayout()
+        for label, slot in (("Read From Chip", self.read_config_words), ("Load File...", self.load_config_file),
+                            ("Save File...", self.save_config_file), ("Defaults", self.default_config_words),
+                            ("Write To Chip", self.write_config_words)):
+            button = QPushButton(label)
+            button.clicked.connect(slot)
+            fuse_buttons.addWidget(button)
+        fuse_buttons.addStretch()
+        fuse_layout.addLayout(fuse_buttons)
+        
+        self.config_table = QTableWidget(0, 4)
+        self.config_table.setHorizontalHeaderLabels(["Word", "Field", "Value", "Meaning"])
+        self.config_table.verticalHeader().setVisible(False)
+        self.config_table.horizontalHeader().setStretchLastSection(True)
+        self.config_table.setMinimumHeight(180)
+        fuse_layout.addWidget(self.config_table)
+        
+        self.config_words_label = QLabel("")
+        self.config_words_label.setFont(QFont("Courier", 10))
+        fuse_layout.addWidget(self.config_words_label)
+        self.config_status = QLabel("Read the chip's config words or load a config file")
+        self.config_status.setWordWrap(True)
+        fuse_layout.addWidget(self.config_status)
+        
+        fuse_group.setLayout(fuse_layout)
+        layout.addWidget(fuse_group)
+        
+        # Device profiles
+        profile_group = QGroupBox("Device Profiles")
+        profile_layout = QVBoxLayout()
+        
+        profile_select = QHBoxLayout()
+        profile_select.addWidget(QLabel("Profile:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.setMinimumWidth(250)
+        self.profile_combo.currentTextChanged.connect(lambda text: self.update_config_status())
+        profile_select.addWidget(self.profile_combo)
+        
+        apply_profile_btn = QPushButton("Apply")
+        apply_profile_btn.clicked.connect(self.apply_profile)
+        profile_select.addWidget(apply_profile_btn)
+        
+        delete_profile_btn = QPushButton("Delete")
+        delete_profile_btn.clicked.connect(self.delete_profile)
+        profile_select.addWidget(delete_profile_btn)
+        profile_select.addStretch()
+        profile_layout.addLayout(profile_select)
+        
+        profile_save = QHBoxLayout()
+        profile_save.addWidget(QLabel("Name:"))
+        self.profile_name = QLineEdit()
+        profile_save.addWidget(self.profile_name)
+        profile_save.addWidget(QLabel("Project:"))
+        self.profile_project = QLineEdit()
+        self.profile_project.setPlaceholderText("optional")
+        profile_save.addWidget(self.profile_project)
+        
+        save_profile_btn = QPushButton("Save Current Settings")
+        save_profile_btn.clicked.connect(self.save_profile)
+        profile_save.addWidget(save_profile_btn)
+        profile_layout.addLayout(profile_save)
+        
+        self.best_settings_label = QLabel("")
+        self.best_settings_label.setStyleSheet("color: #64b5f6; font-style: italic;")
+        profile_layout.addWidget(self.best_settings_label)
+        
+        profile_group.setLayout(profile_layout)
+        layout.addWidget(profile_group)
+        
         layout.addStretch()
         widget.setLayout(layout)
         return widget
@@ -775,186 +4401,2919 @@ class MiniProGUI(QMainWindow):
         detect_info = QLabel("Auto-detect SPI 25xx series devices.")
         detect_layout.addWidget(detect_info)
         
-        detect_opts = QHBoxLayout()
-        detect_opts.addWidget(QLabel("Bus Width:"))
-        self.auto_detect_width = QComboBox()
-        self.auto_detect_width.addItems(["8-bit", "16-bit"])
-        detect_opts.addWidget(self.auto_detect_width)
+        detect_opts = QHBoxLayout()
+        detect_opts.addWidget(QLabel("Bus Width:"))
+        self.auto_detect_width = QComboBox()
+        self.auto_detect_width.addItems(["8-bit", "16-bit"])
+        detect_opts.addWidget(self.auto_detect_width)
+        
+        auto_detect_btn = QPushButton("Auto-Detect")
+        auto_detect_btn.clicked.connect(self.auto_detect)
+        detect_opts.addWidget(auto_detect_btn)
+        detect_opts.addStretch()
+        
+        detect_layout.addLayout(detect_opts)
+        detect_group.setLayout(detect_layout)
+        layout.addWidget(detect_group)
+        
+        # Custom command
+        custom_group = QGroupBox("Custom Command")
+        custom_layout = QVBoxLayout()
+        
+        custom_info = QLabel("Run custom minipro commands directly.")
+        custom_layout.addWidget(custom_info)
+        
+        custom_cmd_layout = QHBoxLayout()
+        custom_cmd_layout.addWidget(QLabel("Command:"))
+        self.custom_command = QLineEdit()
+        self.custom_command.setPlaceholderText("e.g., -p AT29C256@DIP28 -r output.bin")
+        custom_cmd_layout.addWidget(self.custom_command)
+        
+        custom_layout.addLayout(custom_cmd_layout)
+        
+        custom_buttons = QHBoxLayout()
+        custom_run_btn = QPushButton("Execute")
+        custom_run_btn.clicked.connect(self.run_custom_command)
+        custom_buttons.addWidget(custom_run_btn)
+        custom_buttons.addStretch()
+        
+        custom_layout.addLayout(custom_buttons)
+        custom_group.setLayout(custom_layout)
+        layout.addWidget(custom_group)
+        
+        # minipro backend
+        backend_group = QGroupBox("minipro Backend")
+        backend_layout = QVBoxLayout()
+        
+        binary_layout = QHBoxLayout()
+        binary_layout.addWidget(QLabel("minipro Binary:"))
+        self.binary_path = QLineEdit()
+        self.binary_path.setPlaceholderText("minipro (from PATH)")
+        self.binary_path.editingFinished.connect(self.apply_backend_settings)
+        binary_layout.addWidget(self.binary_path)
+        
+        binary_browse = QPushButton("Browse...")
+        binary_browse.clicked.connect(self.browse_binary)
+        binary_layout.addWidget(binary_browse)
+        backend_layout.addLayout(binary_layout)
+        
+        pool_layout = QHBoxLayout()
+        pool_layout.addWidget(QLabel("Pre-spawned Helpers:"))
+        self.pool_size = QSpinBox()
+        self.pool_size.setRange(0, 8)
+        self.pool_size.setToolTip("Idle helper processes kept ready to hide shell and stdbuf "
+                                  "startup (0 = start every command cold)")
+        self.pool_size.valueChanged.connect(self.backend.set_pool_size)
+        pool_layout.addWidget(self.pool_size)
+        pool_layout.addStretch()
+        backend_layout.addLayout(pool_layout)
+        
+        backend_group.setLayout(backend_layout)
+        layout.addWidget(backend_group)
+        
+        # Session recording
+        record_group = QGroupBox("Session Recording")
+        record_layout = QVBoxLayout()
+        
+        record_info = QLabel("Capture minipro output with timing so it can be replayed\n"
+                             "by minipro_replay.py without a programmer attached.")
+        record_layout.addWidget(record_info)
+        
+        self.record_sessions = QCheckBox("Record minipro output")
+        record_layout.addWidget(self.record_sessions)
+        
+        record_dir_layout = QHBoxLayout()
+        record_dir_layout.addWidget(QLabel("Recording Directory:"))
+        self.record_dir = QLineEdit()
+        record_dir_layout.addWidget(self.record_dir)
+        
+        record_browse = QPushButton("Browse...")
+        record_browse.clicked.connect(self.browse_record_dir)
+        record_dir_layout.addWidget(record_browse)
+        
+        record_layout.addLayout(record_dir_layout)
+        record_group.setLayout(record_layout)
+        layout.addWidget(record_group)
+        
+        # Image store
+        store_group = QGroupBox("Image Store")
+        store_layout = QVBoxLayout()
+        
+        self.store_images = QCheckBox("Keep a deduplicated copy of every image read or written")
+        self.store_images.setChecked(True)
+        store_layout.addWidget(self.store_images)
+        
+        store_search_layout = QHBoxLayout()
+        self.store_query = QLineEdit()
+        self.store_query.setPlaceholderText("Device name, SHA-256 prefix or date (YYYY-MM-DD)")
+        self.store_query.returnPressed.connect(self.find_stored_images)
+        store_search_layout.addWidget(self.store_query)
+        
+        store_find_btn = QPushButton("Find")
+        store_find_btn.clicked.connect(self.find_stored_images)
+        store_search_layout.addWidget(store_find_btn)
+        
+        store_check_btn = QPushButton("Check File...")
+        store_check_btn.setToolTip("Report whether a file's contents are already in the store")
+        store_check_btn.clicked.connect(self.check_stored_image)
+        store_search_layout.addWidget(store_check_btn)
+        
+        store_export_btn = QPushButton("Export...")
+        store_export_btn.setToolTip("Rebuild the image whose SHA-256 is entered above")
+        store_export_btn.clicked.connect(self.export_stored_image)
+        store_search_layout.addWidget(store_export_btn)
+        store_layout.addLayout(store_search_layout)
+        
+        store_group.setLayout(store_layout)
+        layout.addWidget(store_group)
+        
+        # Control API
+        api_group = QGroupBox("Control API")
+        api_layout = QVBoxLayout()
+        
+        api_info = QLabel("Local HTTP/JSON-RPC server so an MES or script can queue reads, writes\n"
+                          "and verifies and follow their progress (GET /events).")
+        api_layout.addWidget(api_info)
+        
+        api_bind_layout = QHBoxLayout()
+        api_bind_layout.addWidget(QLabel("Port (127.0.0.1):"))
+        self.api_port = QSpinBox()
+        self.api_port.setRange(1024, 65535)
+        self.api_port.setValue(8765)
+        api_bind_layout.addWidget(self.api_port)
+        api_bind_layout.addWidget(QLabel("or Unix Socket:"))
+        self.api_socket = QLineEdit()
+        self.api_socket.setPlaceholderText("/run/user/.../minipro-gui.sock (optional)")
+        api_bind_layout.addWidget(self.api_socket)
+        api_layout.addLayout(api_bind_layout)
+        
+        api_token_layout = QHBoxLayout()
+        api_token_layout.addWidget(QLabel("Bearer Token:"))
+        self.api_token = QLineEdit()
+        self.api_token.setPlaceholderText("Required in the Authorization header; generated when left empty")
+        self.api_token.setEchoMode(QLineEdit.EchoMode.Password)
+        api_token_layout.addWidget(self.api_token)
+        api_layout.addLayout(api_token_layout)
+        
+        api_buttons = QHBoxLayout()
+        self.api_button = QPushButton("Start Server")
+        self.api_button.setCheckable(True)
+        self.api_button.toggled.connect(self.toggle_control_api)
+        api_buttons.addWidget(self.api_button)
+        self.api_status = QLabel("Stopped")
+        api_buttons.addWidget(self.api_status)
+        api_buttons.addStretch()
+        api_layout.addLayout(api_buttons)
+        
+        api_group.setLayout(api_layout)
+        layout.addWidget(api_group)
+        
+        # Metrics export
+        metrics_group = QGroupBox("Station Metrics (Prometheus)")
+        metrics_layout = QVBoxLayout()
+        
+        textfile_layout = QHBoxLayout()
+        self.metrics_textfile_enabled = QCheckBox("Write textfile:")
+        self.metrics_textfile_enabled.setToolTip("For node_exporter's textfile collector; replaced atomically")
+        self.metrics_textfile_enabled.toggled.connect(self.update_metrics_export)
+        textfile_layout.addWidget(self.metrics_textfile_enabled)
+        self.metrics_textfile = QLineEdit()
+        self.metrics_textfile.setPlaceholderText("/var/lib/node_exporter/textfile_collector/minipro.prom")
+        textfile_layout.addWidget(self.metrics_textfile)
+        metrics_browse = QPushButton("Browse...")
+        metrics_browse.clicked.connect(lambda: self.browse_file(
+            self.metrics_textfile, save=True, filter="Prometheus Textfiles (*.prom);;All Files (*)"))
+        textfile_layout.addWidget(metrics_browse)
+        metrics_layout.addLayout(textfile_layout)
+        
+        metrics_http_layout = QHBoxLayout()
+        self.metrics_http_enabled = QCheckBox("Serve /metrics on 127.0.0.1 port:")
+        self.metrics_http_enabled.toggled.connect(self.update_metrics_export)
+        metrics_http_layout.addWidget(self.metrics_http_enabled)
+        self.metrics_port = QSpinBox()
+        self.metrics_port.setRange(1024, 65535)
+        self.metrics_port.setValue(9464)
+        metrics_http_layout.addWidget(self.metrics_port)
+        metrics_http_layout.addWidget(QLabel("Every:"))
+        self.metrics_interval = QSpinBox()
+        self.metrics_interval.setRange(1, 3600)
+        self.metrics_interval.setValue(15)
+        self.metrics_interval.setSuffix(" s")
+        self.metrics_interval.valueChanged.connect(self.update_metrics_export)
+        metrics_http_layout.addWidget(self.metrics_interval)
+        metrics_http_layout.addStretch()
+        metrics_layout.addLayout(metrics_http_layout)
+        
+        self.metrics_status = QLabel("Not exported")
+        metrics_layout.addWidget(self.metrics_status)
+        
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.export_metrics)
+        
+        metrics_group.setLayout(metrics_layout)
+        layout.addWidget(metrics_group)
+        
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+        
+    def create_production_tab(self):
+        """Production programming tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Scan station
+        scan_group = QGroupBox("Scan Station")
+        scan_layout = QVBoxLayout()
+        
+        scan_info = QLabel("Scan a work order or part barcode to arm its job (device, profile and image),\n"
+                           "then scan it again, scan the confirm code or press the foot switch key to start.")
+        scan_layout.addWidget(scan_info)
+        
+        scan_file_layout = QHBoxLayout()
+        scan_file_layout.addWidget(QLabel("Job Templates:"))
+        self.scan_templates = QLineEdit()
+        self.scan_templates.setPlaceholderText("JSON file mapping barcodes to jobs")
+        self.scan_templates.editingFinished.connect(self.load_scan_index)
+        scan_file_layout.addWidget(self.scan_templates)
+        scan_browse = QPushButton("Browse...")
+        scan_browse.clicked.connect(self.browse_scan_templates)
+        scan_file_layout.addWidget(scan_browse)
+        scan_layout.addLayout(scan_file_layout)
+        
+        scan_opts = QHBoxLayout()
+        scan_opts.addWidget(QLabel("Foot Switch Key:"))
+        self.scan_start_key = QLineEdit("F12")
+        self.scan_start_key.setMaximumWidth(80)
+        self.scan_start_key.setToolTip("Key sent by the foot switch (e.g., F12, Pause, Ctrl+Return)")
+        self.scan_start_key.editingFinished.connect(self.update_scan_shortcut)
+        scan_opts.addWidget(self.scan_start_key)
+        self.scan_keep_armed = QCheckBox("Stay armed for the next part")
+        self.scan_keep_armed.setChecked(True)
+        self.scan_keep_armed.setToolTip("After each part the same job can be started again without scanning")
+        scan_opts.addWidget(self.scan_keep_armed)
+        scan_opts.addStretch()
+        scan_layout.addLayout(scan_opts)
+        
+        scan_input_layout = QHBoxLayout()
+        self.scan_button = QPushButton("Start Scan Mode")
+        self.scan_button.setCheckable(True)
+        self.scan_button.toggled.connect(self.toggle_scan_mode)
+        scan_input_layout.addWidget(self.scan_button)
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan here")
+        self.scan_input.setEnabled(False)
+        self.scan_input.returnPressed.connect(self.handle_scan)
+        scan_input_layout.addWidget(self.scan_input)
+        scan_layout.addLayout(scan_input_layout)
+        
+        self.scan_status = QLabel("Scan mode off")
+        self.scan_status.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        scan_layout.addWidget(self.scan_status)
+        self.scan_cycle = QLabel("")
+        scan_layout.addWidget(self.scan_cycle)
+        
+        # Foot switches are HID keyboards; the key works wherever focus is
+        self.scan_shortcut = QShortcut(QKeySequence("F12"), self)
+        self.scan_shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+        self.scan_shortcut.setEnabled(False)
+        self.scan_shortcut.activated.connect(self.start_scanned_job)
+        
+        scan_group.setLayout(scan_layout)
+        layout.addWidget(scan_group)
+        
+        # Serialization
+        serial_group = QGroupBox("Per-Part Serialization")
+        serial_layout = QVBoxLayout()
+        
+        serial_info = QLabel("Patch a unique serial number / MAC address into a copy of the\n"
+                             "write image for every part. Numbers are only consumed by successful writes.")
+        serial_layout.addWidget(serial_info)
+        
+        self.serialize_enabled = QCheckBox("Serialize writes")
+        serial_layout.addWidget(self.serialize_enabled)
+        
+        sequence_layout = QHBoxLayout()
+        sequence_layout.addWidget(QLabel("Sequence:"))
+        self.serial_sequence = QLineEdit("default")
+        self.serial_sequence.setToolTip("Name of the number sequence (e.g., product or batch)")
+        sequence_layout.addWidget(self.serial_sequence)
+        sequence_layout.addWidget(QLabel("Start:"))
+        self.serial_start = QSpinBox()
+        self.serial_start.setRange(0, 2**31 - 1)
+        self.serial_start.setValue(1)
+        sequence_layout.addWidget(self.serial_start)
+        self.serial_next_label = QLabel("")
+        sequence_layout.addWidget(self.serial_next_label)
+        sequence_layout.addStretch()
+        serial_layout.addLayout(sequence_layout)
+        
+        number_layout = QHBoxLayout()
+        self.serial_field = QCheckBox("Serial at offset:")
+        self.serial_field.setChecked(True)
+        number_layout.addWidget(self.serial_field)
+        self.serial_offset = QLineEdit("0x0")
+        number_layout.addWidget(self.serial_offset)
+        number_layout.addWidget(QLabel("Bytes:"))
+        self.serial_length = QSpinBox()
+        self.serial_length.setRange(1, 16)
+        self.serial_length.setValue(4)
+        number_layout.addWidget(self.serial_length)
+        self.serial_encoding = QComboBox()
+        self.serial_encoding.addItems(["little-endian", "big-endian", "ascii"])
+        number_layout.addWidget(self.serial_encoding)
+        number_layout.addStretch()
+        serial_layout.addLayout(number_layout)
+        
+        mac_layout = QHBoxLayout()
+        self.mac_field = QCheckBox("MAC at offset:")
+        mac_layout.addWidget(self.mac_field)
+        self.mac_offset = QLineEdit("0x0")
+        mac_layout.addWidget(self.mac_offset)
+        mac_layout.addWidget(QLabel("First MAC:"))
+        self.mac_base = QLineEdit("02:00:00:00:00:00")
+        mac_layout.addWidget(self.mac_base)
+        mac_layout.addWidget(QLabel("Range size:"))
+        self.mac_count = QSpinBox()
+        self.mac_count.setRange(1, 2**31 - 1)
+        self.mac_count.setValue(256)
+        mac_layout.addWidget(self.mac_count)
+        mac_layout.addStretch()
+        serial_layout.addLayout(mac_layout)
+        
+        crc_layout = QHBoxLayout()
+        self.crc_field = QCheckBox("CRC32 of range:")
+        crc_layout.addWidget(self.crc_field)
+        self.crc_start = QLineEdit("0x0")
+        crc_layout.addWidget(self.crc_start)
+        crc_layout.addWidget(QLabel("to"))
+        self.crc_end = QLineEdit("0x0")
+        crc_layout.addWidget(self.crc_end)
+        crc_layout.addWidget(QLabel("stored at:"))
+        self.crc_offset = QLineEdit("0x0")
+        crc_layout.addWidget(self.crc_offset)
+        crc_layout.addStretch()
+        serial_layout.addLayout(crc_layout)
+        
+        serial_group.setLayout(serial_layout)
+        layout.addWidget(serial_group)
+        
+        # ROM sets
+        romset_group = QGroupBox("ROM Set (16/32-bit buses)")
+        romset_layout = QVBoxLayout()
+        
+        romset_info = QLabel("Split one image across 2 or 4 chips (e.g., 27C256 even/odd pairs),\n"
+                             "program or verify each chip in turn, or read a set back into one image.")
+        romset_layout.addWidget(romset_info)
+        
+        romset_file_layout = QHBoxLayout()
+        romset_file_layout.addWidget(QLabel("Set Image:"))
+        self.romset_file = QLineEdit()
+        romset_file_layout.addWidget(self.romset_file)
+        romset_browse = QPushButton("Browse...")
+        romset_browse.clicked.connect(lambda: self.browse_file(self.romset_file, save=False))
+        romset_file_layout.addWidget(romset_browse)
+        romset_layout.addLayout(romset_file_layout)
+        
+        romset_opts = QHBoxLayout()
+        romset_opts.addWidget(QLabel("Chips:"))
+        self.romset_ways = QComboBox()
+        self.romset_ways.addItems(["2", "4"])
+        romset_opts.addWidget(self.romset_ways)
+        romset_opts.addWidget(QLabel("Lane Width:"))
+        self.romset_width = QComboBox()
+        self.romset_width.addItems(["byte", "word (16-bit)"])
+        romset_opts.addWidget(self.romset_width)
+        romset_opts.addStretch()
+        romset_layout.addLayout(romset_opts)
+        
+        romset_buttons = QHBoxLayout()
+        for label, slot in (("Split", self.split_rom_set), ("Merge Lanes", self.merge_rom_set),
+                            ("Program Set", lambda: self.run_rom_set("write")),
+                            ("Verify Set", lambda: self.run_rom_set("verify")),
+                            ("Read Set", lambda: self.run_rom_set("read"))):
+            button = QPushButton(label)
+            button.clicked.connect(slot)
+            romset_buttons.addWidget(button)
+        romset_buttons.addStretch()
+        romset_layout.addLayout(romset_buttons)
+        
+        romset_group.setLayout(romset_layout)
+        layout.addWidget(romset_group)
+        
+        # Watch mode
+        watch_group = QGroupBox("Watch Mode")
+        watch_layout = QVBoxLayout()
+        
+        watch_info = QLabel("Program the selected device automatically whenever a build artifact\n"
+                            "(or the newest matching file in a folder) is saved.")
+        watch_layout.addWidget(watch_info)
+        
+        watch_path_layout = QHBoxLayout()
+        watch_path_layout.addWidget(QLabel("Watch:"))
+        self.watch_path = QLineEdit()
+        self.watch_path.setPlaceholderText("Artifact file or build output folder")
+        watch_path_layout.addWidget(self.watch_path)
+        watch_file_btn = QPushButton("File...")
+        watch_file_btn.clicked.connect(lambda: self.browse_file(self.watch_path, save=False))
+        watch_path_layout.addWidget(watch_file_btn)
+        watch_dir_btn = QPushButton("Folder...")
+        watch_dir_btn.clicked.connect(self.browse_watch_folder)
+        watch_path_layout.addWidget(watch_dir_btn)
+        watch_layout.addLayout(watch_path_layout)
+        
+        watch_opts = QHBoxLayout()
+        watch_opts.addWidget(QLabel("Patterns:"))
+        self.watch_patterns = QLineEdit("*.bin *.hex *.srec *.gz *.xz *.zst *.zip")
+        self.watch_patterns.setToolTip("Files considered in folder mode (space separated)")
+        watch_opts.addWidget(self.watch_patterns)
+        self.watch_skip_unchanged = QCheckBox("Skip unchanged images")
+        self.watch_skip_unchanged.setChecked(True)
+        self.watch_skip_unchanged.setToolTip("Do not reprogram when a rebuild produced identical contents")
+        watch_opts.addWidget(self.watch_skip_unchanged)
+        watch_layout.addLayout(watch_opts)
+        
+        watch_buttons = QHBoxLayout()
+        self.watch_button = QPushButton("Start Watching")
+        self.watch_button.setCheckable(True)
+        self.watch_button.toggled.connect(self.toggle_watch)
+        watch_buttons.addWidget(self.watch_button)
+        self.watch_status = QLabel("Not watching")
+        watch_buttons.addWidget(self.watch_status)
+        watch_buttons.addStretch()
+        watch_layout.addLayout(watch_buttons)
+        
+        watch_group.setLayout(watch_layout)
+        layout.addWidget(watch_group)
+        
+        # Retries
+        retry_group = QGroupBox("Retry on Failure")
+        retry_layout = QHBoxLayout()
+        
+        self.retry_enabled = QCheckBox("Classify failures and retry reads, writes and verifies")
+        self.retry_enabled.setChecked(True)
+        self.retry_enabled.setToolTip("Contact errors run a pin check first; verify errors after a write\n"
+                                      "re-verify before rewriting; overcurrent and file errors never retry")
+        retry_layout.addWidget(self.retry_enabled)
+        retry_layout.addWidget(QLabel("Max Retries:"))
+        self.retry_max = QSpinBox()
+        self.retry_max.setRange(1, 10)
+        self.retry_max.setValue(2)
+        retry_layout.addWidget(self.retry_max)
+        
+        retry_stats_btn = QPushButton("Failure Stats")
+        retry_stats_btn.clicked.connect(self.show_failure_stats)
+        retry_layout.addWidget(retry_stats_btn)
+        retry_layout.addStretch()
+        
+        retry_group.setLayout(retry_layout)
+        layout.addWidget(retry_group)
+        
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+        
+    def create_burnin_tab(self):
+        """Test pattern and burn-in tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        pattern_group = QGroupBox("Test Pattern")
+        pattern_layout = QVBoxLayout()
+        
+        pattern_info = QLabel("Write a pattern, read it back and compare, cycle after cycle.\n"
+                              "Failures are counted per address and data bit to expose stuck or shorted lines.")
+        pattern_layout.addWidget(pattern_info)
+        
+        pattern_opts = QHBoxLayout()
+        pattern_opts.addWidget(QLabel("Pattern:"))
+        self.burnin_pattern = QComboBox()
+        self.burnin_pattern.addItems(["all (rotate)"] + list(TEST_PATTERNS))
+        pattern_opts.addWidget(self.burnin_pattern)
+        pattern_opts.addWidget(QLabel("Seed:"))
+        self.burnin_seed = QSpinBox()
+        self.burnin_seed.setRange(0, 2**31 - 1)
+        pattern_opts.addWidget(self.burnin_seed)
+        pattern_opts.addWidget(QLabel("Size (bytes):"))
+        self.burnin_size = QSpinBox()
+        self.burnin_size.setRange(0, 2**31 - 1)
+        self.burnin_size.setSpecialValueText("from device")
+        self.burnin_size.setToolTip("0 = code memory size reported by minipro -d")
+        pattern_opts.addWidget(self.burnin_size)
+        pattern_opts.addStretch()
+        pattern_layout.addLayout(pattern_opts)
+        
+        save_pattern_layout = QHBoxLayout()
+        save_pattern_btn = QPushButton("Save Pattern Image...")
+        save_pattern_btn.clicked.connect(self.save_pattern_image)
+        save_pattern_layout.addWidget(save_pattern_btn)
+        save_pattern_layout.addStretch()
+        pattern_layout.addLayout(save_pattern_layout)
+        
+        pattern_group.setLayout(pattern_layout)
+        layout.addWidget(pattern_group)
+        
+        burnin_group = QGroupBox("Burn-In")
+        burnin_layout = QVBoxLayout()
+        
+        cycles_layout = QHBoxLayout()
+        cycles_layout.addWidget(QLabel("Cycles:"))
+        self.burnin_cycles = QSpinBox()
+        self.burnin_cycles.setRange(0, 1000000)
+        self.burnin_cycles.setValue(10)
+        self.burnin_cycles.setSpecialValueText("until stopped")
+        cycles_layout.addWidget(self.burnin_cycles)
+        self.burnin_stop_on_fail = QCheckBox("Stop at first mismatch")
+        cycles_layout.addWidget(self.burnin_stop_on_fail)
+        cycles_layout.addStretch()
+        burnin_layout.addLayout(cycles_layout)
+        
+        burnin_buttons = QHBoxLayout()
+        self.burnin_button = QPushButton("Start Burn-In")
+        self.burnin_button.setCheckable(True)
+        self.burnin_button.toggled.connect(self.toggle_burnin)
+        burnin_buttons.addWidget(self.burnin_button)
+        burnin_buttons.addStretch()
+        burnin_layout.addLayout(burnin_buttons)
+        
+        self.burnin_status = QLabel("Idle")
+        self.burnin_status.setWordWrap(True)
+        burnin_layout.addWidget(self.burnin_status)
+        
+        burnin_group.setLayout(burnin_layout)
+        layout.addWidget(burnin_group)
+        
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+        
+    def create_jedec_tab(self):
+        """GAL/PAL JEDEC fuse map tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        file_group = QGroupBox("JEDEC File")
+        file_layout = QVBoxLayout()
+        
+        file_row = QHBoxLayout()
+        file_row.addWidget(QLabel("File:"))
+        self.jedec_file = QLineEdit()
+        file_row.addWidget(self.jedec_file)
+        jedec_browse = QPushButton("Browse...")
+        jedec_browse.clicked.connect(lambda: self.browse_file(
+            self.jedec_file, save=False, filter="JEDEC Files (*.jed);;All Files (*)"))
+        file_row.addWidget(jedec_browse)
+        jedec_load = QPushButton("Load")
+        jedec_load.clicked.connect(self.load_jedec)
+        file_row.addWidget(jedec_load)
+        file_layout.addLayout(file_row)
+        
+        self.jedec_info = QLabel("Fuse and transmission checksums of .jed files are also checked before every write.")
+        self.jedec_info.setWordWrap(True)
+        file_layout.addWidget(self.jedec_info)
+        
+        file_group.setLayout(file_layout)
+        layout.addWidget(file_group)
+        
+        map_group = QGroupBox("Fuse Map")
+        map_layout = QVBoxLayout()
+        
+        self.fuse_map = FuseMapView()
+        self.fuse_map.setMinimumHeight(200)
+        map_layout.addWidget(self.fuse_map)
+        
+        compare_row = QHBoxLayout()
+        compare_row.addWidget(QLabel("Compare with:"))
+        self.jedec_compare_file = QLineEdit()
+        compare_row.addWidget(self.jedec_compare_file)
+        compare_browse = QPushButton("Browse...")
+        compare_browse.clicked.connect(lambda: self.browse_file(
+            self.jedec_compare_file, save=False, filter="JEDEC Files (*.jed);;All Files (*)"))
+        compare_row.addWidget(compare_browse)
+        compare_file_btn = QPushButton("Compare File")
+        compare_file_btn.clicked.connect(self.compare_jedec_file)
+        compare_row.addWidget(compare_file_btn)
+        compare_chip_btn = QPushButton("Compare with Chip")
+        compare_chip_btn.setToolTip("Read the fuses back from the selected device and mark the differences")
+        compare_chip_btn.clicked.connect(self.compare_jedec_chip)
+        compare_row.addWidget(compare_chip_btn)
+        map_layout.addLayout(compare_row)
+        
+        self.jedec_diff = QLabel("")
+        map_layout.addWidget(self.jedec_diff)
+        
+        map_group.setLayout(map_layout)
+        layout.addWidget(map_group)
+        
+        widget.setLayout(layout)
+        return widget
+        
+    def create_logic_tab(self):
+        """Logic IC batch testing tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        batch_group = QGroupBox("Batch Logic Test")
+        batch_layout = QVBoxLayout()
+        
+        batch_info = QLabel("Test a tray of parts of the selected type: reload the socket and press Space\n"
+                            "(or Test Next Part). Each part is binned as good, stuck pin or dead.")
+        batch_layout.addWidget(batch_info)
+        
+        batch_buttons = QHBoxLayout()
+        self.logic_batch_button = QPushButton("Start Batch")
+        self.logic_batch_button.setCheckable(True)
+        self.logic_batch_button.toggled.connect(self.toggle_logic_batch)
+        batch_buttons.addWidget(self.logic_batch_button)
+        self.logic_next_button = QPushButton("Test Next Part (Space)")
+        self.logic_next_button.setEnabled(False)
+        self.logic_next_button.clicked.connect(self.logic_batch_next)
+        batch_buttons.addWidget(self.logic_next_button)
+        batch_buttons.addStretch()
+        batch_layout.addLayout(batch_buttons)
+        
+        # Space only reaches the shortcut when no text field has focus
+        self.logic_next_shortcut = QShortcut(QKeySequence(Qt.Key.Key_Space), self)
+        self.logic_next_shortcut.setEnabled(False)
+        self.logic_next_shortcut.activated.connect(self.logic_batch_next)
+        
+        self.logic_yield = QLabel("No batch running")
+        self.logic_yield.setStyleSheet("font-weight: bold;")
+        batch_layout.addWidget(self.logic_yield)
+        self.logic_last = QLabel("")
+        batch_layout.addWidget(self.logic_last)
+        
+        # Per-vector, per-pin result of the last part; failing pins in red
+        self.logic_matrix = QTableWidget()
+        self.logic_matrix.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.logic_matrix.setFont(QFont("Courier", 9))
+        batch_layout.addWidget(self.logic_matrix)
+        
+        batch_group.setLayout(batch_layout)
+        layout.addWidget(batch_group)
+        
+        identify_group = QGroupBox("Identify Unknown IC")
+        identify_layout = QVBoxLayout()
+        
+        identify_info = QLabel("Test an unmarked part against every logic IC with its pin count, most\n"
+                               "used first, until one passes. Parts with identical vectors are tested once.")
+        identify_layout.addWidget(identify_info)
+        
+        identify_opts = QHBoxLayout()
+        identify_opts.addWidget(QLabel("Package:"))
+        self.identify_package = QComboBox()
+        self.identify_package.addItems(["DIP14", "DIP16", "DIP18", "DIP20", "DIP24", "DIP28"])
+        identify_opts.addWidget(self.identify_package)
+        self.identify_button = QPushButton("Identify")
+        self.identify_button.setCheckable(True)
+        self.identify_button.toggled.connect(self.toggle_identify)
+        identify_opts.addWidget(self.identify_button)
+        identify_opts.addStretch()
+        identify_layout.addLayout(identify_opts)
+        
+        self.identify_status = QLabel("")
+        self.identify_status.setWordWrap(True)
+        identify_layout.addWidget(self.identify_status)
+        
+        identify_group.setLayout(identify_layout)
+        layout.addWidget(identify_group)
+        
+        widget.setLayout(layout)
+        return widget
+        
+    # Helper methods
+    
+    def browse_file(self, line_edit, save=False, filter="All Files (*)"):
+        """Open file browser dialog"""
+        # Get last used directory from settings
+        last_dir = self.settings.value("last_directory", os.path.expanduser("~"))
+        
+        if save:
+            filename, _ = QFileDialog.getSaveFileName(self, "Save File", last_dir, filter)
+        else:
+            filename, _ = QFileDialog.getOpenFileName(self, "Open File", last_dir, filter)
+            
+        if filename:
+            line_edit.setText(filename)
+            # Save the directory for next time
+            self.settings.setValue("last_directory", os.path.dirname(filename))
+            
+    def browse_watch_folder(self):
+        """Choose a build output folder for watch mode"""
+        folder = QFileDialog.getExistingDirectory(self, "Watch Folder", self.watch_path.text())
+        if folder:
+            self.watch_path.setText(folder)
+            
+    def browse_binary(self):
+        """Choose the minipro executable"""
+        filename, _ = QFileDialog.getOpenFileName(self, "minipro Binary", os.path.dirname(self.backend.binary))
+        if filename:
+            self.binary_path.setText(filename)
+            self.apply_backend_settings()
+            
+    def apply_backend_settings(self):
+        """Point the backend at the binary entered on the Advanced tab"""
+        self.backend.binary = self.binary_path.text().strip() or "minipro"
+        
+    def browse_record_dir(self):
+        """Choose where session recordings are stored"""
+        directory = QFileDialog.getExistingDirectory(self, "Recording Directory", self.record_dir.text())
+        if directory:
+            self.record_dir.setText(directory)
+            
+    def build_command(self, command):
+        """Build the shell command line for a set of minipro arguments"""
+        full_command = self.backend.command_line(command)
+        
+        # Route through the recorder, which mirrors output unchanged while saving it
+        if self.record_sessions.isChecked():
+            record_dir = self.record_dir.text().strip() or os.path.expanduser("~/minipro-recordings")
+            full_command = (f"{shlex.quote(sys.executable)} {shlex.quote(REPLAY_SCRIPT)} record "
+                            f"--out {shlex.quote(record_dir)} -- {full_command}")
+        return full_command
+        
+    def run_command(self, command, on_finished=None):
+        """Execute a minipro command in a separate thread
+        
+        on_finished, if given, is called with the return code after the
+        usual completion handling, which lets multi-step jobs chain commands.
+        Returns False if another command is still running.
+        """
+        if not self.command_done:
+            QMessageBox.warning(self, "Command Running", 
+                              "A command is already running. Please wait for it to complete.")
+            return False
+            
+        if self.programmer_monitor and self.programmer_monitor.process:
+            # The programmer serves one client: let the background -k probe finish first
+            self.statusBar().showMessage("Waiting for the programmer probe...")
+            self.programmer_monitor.finish_probe()
+            
+        if not self.programmer_ready(command):
+            return False
+            
+        self.command_done = False
+        self.on_finished = on_finished
+
+        self.log_operation = operation_name(command)
+        if self.console_operation.findText(self.log_operation) < 0:
+            self.console_operation.addItem(self.log_operation)
+        self.log_console(f"$ minipro {command}\n", color="#4fc3f7")
+        self.statusBar().showMessage("Running command...")
+        
+        # Show and reset progress bar
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("Starting...")
+        
+        self.current_command = command
+        self.command_started = time.perf_counter()
+        self.command_output.clear()
+        
+        full_command = self.build_command(command)
+        if not self.command_worker:
+            self.command_worker = self.create_command_worker()
+        self.command_worker.submit(full_command, self.debug_mode.isChecked(), operation_name(command))
+        if self.control_server:
+            self.control_server.set_busy(True)
+            self.control_server.publish("command", {"command": command, "state": "running"})
+        return True
+        
+    def create_command_worker(self):
+        """The worker that runs every command of the session, connected once"""
+        worker = CommandThread(self.backend)
+        worker.output_received.connect(self.log_console)
+        worker.error_received.connect(lambda msg: self.log_console(msg, color="#f44336"))
+        # Kept for the failure classifier
+        worker.output_received.connect(self.command_output.append)
+        worker.error_received.connect(self.command_output.append)
+        worker.progress_update.connect(self.update_progress)
+        worker.debug_output.connect(lambda msg: self.log_console(msg, color="#9c27b0"))
+        worker.finished_signal.connect(self.command_finished)
+        return worker
+        
+    def command_finished(self, returncode):
+        """Handle command completion"""
+        self.command_done = True
+        if self.control_server:
+            self.control_server.set_busy(False)
+            self.control_server.publish("command", {"command": self.current_command, "state": "finished",
+                                                    "returncode": returncode})
+        
+        self.record_command_metrics(returncode)
+        
+        # Hide progress bar after a short delay
+        QTimer.singleShot(2000, lambda: self.progress_bar.setVisible(False))
+        
+        if returncode == 0:
+            self.statusBar().showMessage("Command completed successfully", 3000)
+            self.log_console("\n✓ Command completed successfully\n", color="#4caf50")
+            self.progress_bar.setValue(100)
+            self.progress_label.setText("Complete!")
+            self.record_throughput()
+            self.store_command_image()
+            if self.programmer_monitor and operation_name(self.current_command) == "detect":
+                self.programmer_monitor.record_probe("".join(self.command_output))
+        else:
+            self.statusBar().showMessage(f"Command failed with code {returncode}", 5000)
+            self.log_console(f"\n✗ Command failed with exit code {returncode}\n", color="#f44336")
+            self.progress_label.setText("Failed")
+            
+        if self.debug_mode.isChecked() and self.command_worker:
+            operation = self.command_worker.operation
+            average, count = self.backend.spawn_summary(operation)
+            self.log_console(f"[SPAWN] {operation}: average {average:.2f} ms over {count} run(s)",
+                             color="#9c27b0")
+        self.log_operation = "gui"
+            
+        if self.programmer_monitor:
+            # Probe a programmer attached while minipro was busy, once the next step has started
+            QTimer.singleShot(0, self.programmer_monitor.probe_next)
+            
+        callback, self.on_finished = self.on_finished, None
+        if returncode != 0 and self.retry_after_failure(callback):
+            return
+        if returncode == 0 and self.retry_state and not self.retry_state.get("checking"):
+            state, self.retry_state = self.retry_state, None
+            self.failure_stats.record(state["device"], state["category"], recovered=True)
+            self.log_console(f"✓ Recovered from {state['category']} after {state['attempt']} "
+                             f"retr{'y' if state['attempt'] == 1 else 'ies'}\n", color="#4caf50")
+        if callback:
+            callback(returncode)
+            
+    def record_command_metrics(self, returncode):
+        """Count a finished command (once per command, never per output line)"""
+        command = self.current_command or ""
+        operation = operation_name(command)
+        self.metrics.end_phase()
+        self.metrics.inc("minipro_operations_total",
+                         (("operation", operation), ("result", "ok" if returncode == 0 else "failed")))
+        self.metrics.observe("minipro_operation_duration_seconds", time.perf_counter() - self.command_started,
+                             (("operation", operation),))
+        if returncode == 0 and operation == "write":
+            image = option_value(command, "-w")
+            if image and os.path.isfile(image):
+                self.metrics.inc("minipro_bytes_programmed_total", value=os.path.getsize(image))
+                
+    def record_throughput(self):
+        """Remember the SPI clock and pulse delay of the fastest run per device
+        
+        The settings come from the command that ran, not the current widgets,
+        which may have changed since (or never applied to a job or RPC run).
+        Runs that set neither option are not recorded; a missing one is
+        minipro's default.
+        """
+        command = self.current_command or ""
+        operation = operation_name(command)
+        flag = {"read": "-r", "write": "-w", "verify": "-m"}.get(operation)
+        device = option_value(command, "-p")
+        image = option_value(command, flag) if flag else None
+        if not device or not image or not os.path.isfile(image):
+            return
+        spi_clock = option_value(command, "--spi_clock")
+        pulse = option_value(command, "--pulse")
+        if spi_clock is None and pulse is None:
+            return
+        try:
+            pulse_delay = int(pulse or 0)
+        except ValueError:
+            return
+            
+        elapsed = time.perf_counter() - self.command_started
+        if elapsed <= 0:
+            return
+        bytes_per_sec = os.path.getsize(image) / elapsed
+        if self.profile_store.record_throughput(device, operation, bytes_per_sec,
+                                                spi_clock or "Default", pulse_delay):
+            self.log_console(f"New best {operation} throughput for {device}: "
+                             f"{bytes_per_sec / 1024:.1f} KiB/s", color="#4caf50")
+            self.update_best_settings_label(device)
+            
+    def get_image_store(self):
+        """Open the image store and its registration thread on first use"""
+        if self.image_store is None:
+            self.image_store = ImageStore()
+            self.image_register_thread = ImageRegisterThread(self.image_store)
+            self.image_register_thread.registered.connect(self.image_registered)
+            self.image_register_thread.failed.connect(
+                lambda path, error: self.log_console(f"✗ Image store: {path}: {error}", color="#f44336"))
+            self.image_register_thread.start()
+        return self.image_store
+        
+    def store_command_image(self):
+        """Queue the image of a successful read or write for the image store"""
+        command = self.current_command or ""
+        operation = operation_name(command)
+        flag = {"read": "-r", "write": "-w"}.get(operation)
+        image = option_value(command, flag) if flag else None
+        if not self.store_images.isChecked() or self.burnin_job or not image or not os.path.isfile(image):
+            return
+        # Snapshot the contents now: callbacks may delete or re-patch the file
+        try:
+            with open(image, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        self.get_image_store()
+        self.image_register_thread.submit(image, option_value(command, "-p") or "", operation, data)
+        
+    def image_registered(self, path, operation, digest, earlier):
+        """Report whether a stored image has been seen before"""
+        if earlier:
+            created, device, first_operation, first_path = earlier[0]
+            self.log_console(f"[STORE] {os.path.basename(path)} ({digest[:12]}) seen {len(earlier)} time(s) "
+                             f"before, first as {device or '?'} {first_operation} on {created}",
+                             color="#4fc3f7")
+        elif self.debug_mode.isChecked():
+            self.log_console(f"[STORE] {os.path.basename(path)} stored as {digest[:12]}", color="#9c27b0")
+            
+    def find_stored_images(self):
+        """List stored images matching the search field"""
+        query = self.store_query.text().strip()
+        if not query:
+            QMessageBox.warning(self, "Image Store", "Enter a device name, hash prefix or date.")
+            return
+        store = self.get_image_store()
+        rows = store.lookup(query)
+        images, logical, stored = store.stats()
+        self.log_console(f"Image store: {len(rows)} match(es) for '{query}' "
+                         f"({images} images, {logical / 1048576:.1f} MiB in "
+                         f"{stored / 1048576:.1f} MiB of chunks)", color="#4fc3f7")
+        for created, device, operation, digest, size, path in rows:
+            self.log_console(f"  {created}  {digest[:16]}  {size:>9}  {device or '-'} {operation}  {path}")
+            
+    def check_stored_image(self):
+        """Tell whether a file's contents are already in the store"""
+        path, _ = QFileDialog.getOpenFileName(self, "Check File", "", "All Files (*)")
+        if not path:
+            return
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            QMessageBox.warning(self, "Image Store", f"Could not read file: {e}")
+            return
+        count, created, device, operation = self.get_image_store().history(digest)
+        if count:
+            self.log_console(f"✓ {os.path.basename(path)} is in the store ({digest[:12]}): "
+                             f"{count} registration(s), first as {device or '?'} {operation} on {created}",
+                             color="#4caf50")
+        else:
+            self.log_console(f"{os.path.basename(path)} ({digest[:12]}) has not been seen before",
+                             color="#ff9800")
+        self.store_query.setText(digest)
+        
+    def export_stored_image(self):
+        """Rebuild the image whose hash is in the search field"""
+        query = self.store_query.text().strip().lower()
+        rows = self.get_image_store().lookup(query) if re.fullmatch(r"[0-9a-f]{8,64}", query) else []
+        digests = {row[3] for row in rows}
+        if len(digests) != 1:
+            QMessageBox.warning(self, "Image Store", "Enter a SHA-256 (or unique prefix) of a stored image.")
+            return
+        digest = digests.pop()
+        path, _ = QFileDialog.getSaveFileName(self, "Export Image", f"{digest[:12]}.bin", "All Files (*)")
+        if not path:
+            return
+        try:
+            self.image_store.export(digest, path)
+        except (OSError, KeyError, zlib.error) as e:
+            QMessageBox.warning(self, "Image Store", f"Could not export image: {e}")
+            return
+        self.log_console(f"✓ Exported {digest[:12]} to {path}", color="#4caf50")
+        
+    def update_progress(self, percentage, status):
+        """Update progress bar and label"""
+        self.progress_bar.setValue(percentage)
+        self.progress_label.setText(status)
+        self.statusBar().showMessage(status)
+        self.metrics.progress(status)
+        # Only whole-percent changes go to API subscribers
+        if self.control_server and (percentage, status) != self.api_progress:
+            self.api_progress = (percentage, status)
+            self.control_server.publish("progress", {"job": self.api_job, "percent": percentage,
+                                                     "status": status})
+            if self.api_job:
+                with self.control_server.lock:
+                    self.control_server.jobs[self.api_job]["progress"] = percentage
+            
+    def log_console(self, message, color=None):
+        """Append message to console with optional color"""
+        text = message.rstrip()
+        severity = COLOR_SEVERITY.get(color, "output")
+        number = self.console_log.add(text, severity, self.log_operation)
+        if self.log_sink:
+            self.log_sink.write(text, severity, self.log_operation)
+        if not self.console_matches.isHidden():
+            query, severities, operation = self.console_filter()
+            if self.console_log.matches_line(number, query, severities, operation):
+                self.console_matches.append(self.console_match_html(number))
+                
+        cursor = self.console.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        
+        if color:
+            self.console.setTextColor(QColor(color))
+        else:
+            self.console.setTextColor(QColor("#d4d4d4"))
+            
+        self.console.append(message.rstrip())
+        self.console.setTextCursor(cursor)
+        self.console.ensureCursorVisible()
         
-        auto_detect_btn = QPushButton("Auto-Detect")
-        auto_detect_btn.clicked.connect(self.auto_detect)
-        detect_opts.addWidget(auto_detect_btn)
-        detect_opts.addStretch()
+    def clear_console(self):
+        """Clear the console and its line index (the log files are kept)"""
+        self.console.clear()
+        self.console_log = ConsoleLog(self.console_log.limit)
+        self.apply_console_filter()
+        
+    def toggle_log_sink(self, enabled):
+        """Start or stop writing the console to rotating log files"""
+        if enabled and not self.log_sink:
+            self.log_sink = LogSink(data_dir("logs"))
+        elif not enabled and self.log_sink:
+            sink, self.log_sink = self.log_sink, None
+            sink.close()
+            
+    def console_filter(self):
+        """(lowercased query, severities, operation) selected in the filter bar"""
+        operation = self.console_operation.currentText() if self.console_operation.currentIndex() > 0 else None
+        return (self.console_search.text().strip().lower(),
+                CONSOLE_SEVERITY_FILTERS[self.console_severity.currentText()], operation)
+        
+    def console_match_html(self, number):
+        color = SEVERITY_COLOR.get(self.console_log.severity(number), "#d4d4d4")
+        return (f'<span style="color: {color}; white-space: pre;">'
+                f'{html.escape(self.console_log.line(number))}</span>')
+        
+    def apply_console_filter(self):
+        """Show only the console lines matching the filter bar, or the full console"""
+        query, severities, operation = self.console_filter()
+        if not (query or severities or operation):
+            self.console_matches.setVisible(False)
+            self.console.setVisible(True)
+            self.console_match_count.setText("")
+            return
+        started = time.perf_counter()
+        hits = self.console_log.search(query, severities, operation)
+        shown = hits[-CONSOLE_FILTER_SHOWN:]
+        self.console_matches.setHtml("<br>".join(self.console_match_html(number) for number in shown))
+        self.console_matches.moveCursor(QTextCursor.MoveOperation.End)
+        self.console.setVisible(False)
+        self.console_matches.setVisible(True)
+        count = f"{len(hits)} of {len(self.console_log)} lines"
+        if len(shown) < len(hits):
+            count += f" (newest {len(shown)} shown)"
+        self.console_match_count.setText(count)
+        if self.debug_mode.isChecked():
+            self.console_match_count.setToolTip(f"Search took {(time.perf_counter() - started) * 1000:.1f} ms")
+            
+    def get_device_arg(self):
+        """Get the device argument if specified"""
+        device = self.device_combo.currentText().strip()
+        if device:
+            return f"-p {shlex.quote(device)}"
+        return ""
         
-        detect_layout.addLayout(detect_opts)
-        detect_group.setLayout(detect_layout)
-        layout.addWidget(detect_group)
+    def get_memory_arg(self):
+        """Get memory type argument"""
+        mem_type = self.memory_type.currentText()
+        if mem_type and mem_type != "code":
+            return f"-c {mem_type}"
+        return ""
         
-        # Custom command
-        custom_group = QGroupBox("Custom Command")
-        custom_layout = QVBoxLayout()
+    def get_format_arg(self):
+        """Get file format argument"""
+        format_text = self.file_format.currentText()
+        if "ihex" in format_text:
+            return "-f ihex"
+        elif "srec" in format_text:
+            return "-f srec"
+        return ""
         
-        custom_info = QLabel("Run custom minipro commands directly.")
-        custom_layout.addWidget(custom_info)
+    def get_voltage_args(self):
+        """Get voltage configuration arguments"""
+        args = []
         
-        custom_cmd_layout = QHBoxLayout()
-        custom_cmd_layout.addWidget(QLabel("Command:"))
-        self.custom_command = QLineEdit()
-        self.custom_command.setPlaceholderText("e.g., -p AT29C256@DIP28 -r output.bin")
-        custom_cmd_layout.addWidget(self.custom_command)
+        if self.vpp_voltage.currentText() != "Default":
+            args.append(f"--vpp {self.vpp_voltage.currentText()}")
+            
+        if self.vdd_voltage.currentText() != "Default":
+            args.append(f"--vdd {self.vdd_voltage.currentText()}")
+            
+        if self.vcc_voltage.currentText() != "Default":
+            args.append(f"--vcc {self.vcc_voltage.currentText()}")
+            
+        if self.spi_clock.currentText() != "Default":
+            args.append(f"--spi_clock {self.spi_clock.currentText()}")
+            
+        if self.pulse_delay.value() > 0:
+            args.append(f"--pulse {self.pulse_delay.value()}")
+            
+        return " ".join(args)
         
-        custom_layout.addLayout(custom_cmd_layout)
+    def get_protection_args(self):
+        """Get protection arguments"""
+        args = []
+        if self.unprotect.isChecked():
+            args.append("-u")
+        if self.protect.isChecked():
+            args.append("-P")
+        return " ".join(args)
         
-        custom_buttons = QHBoxLayout()
-        custom_run_btn = QPushButton("Execute")
-        custom_run_btn.clicked.connect(self.run_custom_command)
-        custom_buttons.addWidget(custom_run_btn)
-        custom_buttons.addStretch()
+    def get_icsp_args(self):
+        """Get ICSP arguments"""
+        if self.icsp_vcc.isChecked():
+            return "-i"
+        elif self.icsp_no_vcc.isChecked():
+            return "-I"
+        return ""
         
-        custom_layout.addLayout(custom_buttons)
-        custom_group.setLayout(custom_layout)
-        layout.addWidget(custom_group)
+    # Device profiles
+    
+    def current_profile_values(self):
+        """Collect the per-device settings a profile stores"""
+        values = {
+            "memory_type": self.memory_type.currentText(),
+            "file_format": self.file_format.currentText(),
+            "vpp": self.vpp_voltage.currentText(),
+            "vdd": self.vdd_voltage.currentText(),
+            "vcc": self.vcc_voltage.currentText(),
+            "spi_clock": self.spi_clock.currentText(),
+            "pulse_delay": self.pulse_delay.value(),
+            "unprotect": self.unprotect.isChecked(),
+            "protect": self.protect.isChecked(),
+            "icsp_vcc": self.icsp_vcc.isChecked(),
+            "icsp_no_vcc": self.icsp_no_vcc.isChecked(),
+        }
+        if self.config_words and self.config_device == self.device_combo.currentText().strip():
+            values["config"] = dict(self.config_words)
+        return values
+        
+    def apply_profile_values(self, values):
+        """Restore settings collected by current_profile_values"""
+        combos = {
+            "memory_type": self.memory_type, "file_format": self.file_format,
+            "vpp": self.vpp_voltage, "vdd": self.vdd_voltage, "vcc": self.vcc_voltage,
+            "spi_clock": self.spi_clock,
+        }
+        for key, combo in combos.items():
+            index = combo.findText(str(values.get(key, "")))
+            if index >= 0:
+                combo.setCurrentIndex(index)
+                
+        if "pulse_delay" in values:
+            self.pulse_delay.setValue(int(values["pulse_delay"]))
+            
+        checks = {
+            "unprotect": self.unprotect, "protect": self.protect,
+            "icsp_vcc": self.icsp_vcc, "icsp_no_vcc": self.icsp_no_vcc,
+        }
+        for key, check in checks.items():
+            if key in values:
+                check.setChecked(bool(values[key]))
+                
+        if values.get("config"):
+            self.show_config_words(self.device_combo.currentText().strip(), values["config"])
+            
+    def device_changed(self, device):
+        """Refresh profiles and apply the best measured settings for a device"""
+        device = device.strip()
+        self.refresh_profile_list(device)
+        self.update_best_settings_label(device)
+        
+        best = self.profile_store.best_settings(device)
+        if best:
+            self.apply_profile_values({"spi_clock": best["spi_clock"],
+                                       "pulse_delay": best["pulse_delay"]})
+            
+    def refresh_profile_list(self, device=None):
+        """List the profiles stored for the selected device"""
+        if device is None:
+            device = self.device_combo.currentText().strip()
+        self.profile_combo.clear()
+        self.profile_combo.addItems(self.profile_store.names(device))
+        
+    def update_best_settings_label(self, device):
+        """Show the settings of the fastest recorded run"""
+        best = self.profile_store.best_settings(device)
+        if best:
+            self.best_settings_label.setText(
+                f"Fastest recorded: SPI clock {best['spi_clock']}, pulse {best['pulse_delay']} μs "
+                f"({best['bytes_per_sec'] / 1024:.1f} KiB/s) — used by default")
+        else:
+            self.best_settings_label.setText("")
+            
+    def save_profile(self):
+        """Save the current settings as a named profile for the device"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please select or enter a device name.")
+            return
+            
+        name = self.profile_name.text().strip()
+        if not name:
+            QMessageBox.warning(self, "Name Required", "Please enter a profile name.")
+            return
+            
+        label = self.profile_store.save(device, name, self.current_profile_values(),
+                                        self.profile_project.text().strip())
+        self.refresh_profile_list(device)
+        self.profile_combo.setCurrentText(label)
+        self.log_console(f"✓ Saved profile '{label}' for {device}\n", color="#4caf50")
+        
+    def apply_profile(self):
+        """Restore the selected profile in one step"""
+        device = self.device_combo.currentText().strip()
+        profile = self.profile_store.get(device, self.profile_combo.currentText())
+        if not profile:
+            return
+        self.apply_profile_values(profile["settings"])
+        self.profile_name.setText(profile["name"])
+        self.profile_project.setText(profile["project"])
+        self.statusBar().showMessage(f"Applied profile {self.profile_combo.currentText()}", 3000)
         
-        layout.addStretch()
-        widget.setLayout(layout)
-        return widget
+    def delete_profile(self):
+        """Delete the selected profile"""
+        device = self.device_combo.currentText().strip()
+        label = self.profile_combo.currentText()
+        if not label:
+            return
+        reply = QMessageBox.question(self, "Delete Profile",
+                                     f"Delete profile '{label}' for {device}?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.profile_store.delete(device, label)
+            self.refresh_profile_list(device)
+            
+    # Per-part serialization
+    
+    def serialization_settings(self):
+        """Collect the Production tab serialization settings"""
+        return {
+            "enabled": self.serialize_enabled.isChecked(),
+            "sequence": self.serial_sequence.text(),
+            "start": self.serial_start.value(),
+            "serial": self.serial_field.isChecked(),
+            "serial_offset": self.serial_offset.text(),
+            "serial_length": self.serial_length.value(),
+            "serial_encoding": self.serial_encoding.currentText(),
+            "mac": self.mac_field.isChecked(),
+            "mac_offset": self.mac_offset.text(),
+            "mac_base": self.mac_base.text(),
+            "mac_count": self.mac_count.value(),
+            "crc": self.crc_field.isChecked(),
+            "crc_start": self.crc_start.text(),
+            "crc_end": self.crc_end.text(),
+            "crc_offset": self.crc_offset.text(),
+        }
+        
+    def apply_serialization_settings(self, text):
+        """Restore settings collected by serialization_settings"""
+        try:
+            values = json.loads(text)
+        except (TypeError, ValueError):
+            return
+        checks = {"enabled": self.serialize_enabled, "serial": self.serial_field,
+                  "mac": self.mac_field, "crc": self.crc_field}
+        edits = {"sequence": self.serial_sequence, "serial_offset": self.serial_offset,
+                 "mac_offset": self.mac_offset, "mac_base": self.mac_base,
+                 "crc_start": self.crc_start, "crc_end": self.crc_end, "crc_offset": self.crc_offset}
+        spins = {"start": self.serial_start, "serial_length": self.serial_length,
+                 "mac_count": self.mac_count}
+        for key, check in checks.items():
+            if key in values:
+                check.setChecked(bool(values[key]))
+        for key, edit in edits.items():
+            if key in values:
+                edit.setText(values[key])
+        for key, spin in spins.items():
+            if key in values:
+                spin.setValue(int(values[key]))
+        index = self.serial_encoding.findText(values.get("serial_encoding", ""))
+        if index >= 0:
+            self.serial_encoding.setCurrentIndex(index)
+            
+    def serial_allocator(self):
+        """Allocator for the configured sequence"""
+        name = re.sub(r"[^\w.-]", "_", self.serial_sequence.text().strip() or "default")
+        return SerialAllocator(name, self.serial_start.value())
+        
+    def serial_patches(self, number):
+        """Patches and CRC fix-up for one part"""
+        patches = []
+        if self.serial_field.isChecked():
+            patches.append((int(self.serial_offset.text(), 0),
+                            encode_serial(number, self.serial_length.value(),
+                                          self.serial_encoding.currentText())))
+        if self.mac_field.isChecked():
+            index = number - self.serial_start.value()
+            if not 0 <= index < self.mac_count.value():
+                raise ValueError(f"serial {number} is outside the MAC range")
+            mac = parse_mac(self.mac_base.text()) + index
+            if mac >= 1 << 48:
+                raise ValueError("MAC range overflows 48 bits")
+            patches.append((int(self.mac_offset.text(), 0), mac.to_bytes(6, "big")))
+        crc = None
+        if self.crc_field.isChecked():
+            crc = (int(self.crc_start.text(), 0), int(self.crc_end.text(), 0), int(self.crc_offset.text(), 0))
+        return patches, crc
+        
+    def serialize_image(self, input_file):
+        """Patch the next serial into the image
+        
+        Returns (image path, completion callback) for the write, or None.
+        """
+        if image_format(input_file) != "binary":
+            QMessageBox.warning(self, "Serialization", "Serialization needs a binary base image.")
+            return None
+            
+        allocator = self.serial_allocator()
+        number = allocator.reserve()
+        try:
+            patches, crc = self.serial_patches(number)
+            patcher = self.image_patchers.get(input_file)
+            if patcher is None:
+                patcher = self.image_patchers[input_file] = ImagePatcher(input_file)
+            image = patcher.apply(patches, crc)
+        except (OSError, ValueError) as e:
+            allocator.release(number)
+            QMessageBox.warning(self, "Serialization", f"Could not serialize image: {e}")
+            return None
+            
+        label = f"serial {number}"
+        if self.mac_field.isChecked():
+            label += f", MAC {format_mac(int.from_bytes(patches[-1][1], 'big'))}"
+        self.log_console(f"Serializing part: {label}", color="#4fc3f7")
+        
+        def finished(returncode):
+            if returncode == 0:
+                allocator.commit(number, self.device_combo.currentText().strip())
+                self.log_console(f"✓ Issued {label}\n", color="#4caf50")
+            else:
+                allocator.release(number)
+                self.log_console(f"✗ Write failed; {label} will be reused\n", color="#f44336")
+            self.serial_next_label.setText(f"Next: {allocator.next_number}")
+            
+        return image, finished
         
-    # Helper methods
+    # Pre-write backups
     
-    def browse_file(self, line_edit, save=False, filter="All Files (*)"):
-        """Open file browser dialog"""
-        # Get last used directory from settings
-        last_dir = self.settings.value("last_directory", os.path.expanduser("~"))
+    def start_backup(self, on_done):
+        """Read the device into the backup store, compressing as data arrives
+        
+        minipro reads into a named pipe drained by a compressor thread, so
+        the backup is compressed while it streams in. on_done(ok) is called
+        when the backup is stored. Returns False, without calling on_done, if
+        it could not start.
+        """
+        device = self.device_combo.currentText().strip()
+        memory = self.memory_type.currentText()
+        path = self.backup_store.new_path(device)
+        workdir = tempfile.mkdtemp(prefix="minipro-backup-")
+        source = os.path.join(workdir, "backup.bin")
+        streaming = hasattr(os, "mkfifo")
+        if streaming:
+            os.mkfifo(source)
+        state = {"bytes": 0, "sha256": None, "error": None}
+        
+        def compress():
+            try:
+                digest = hashlib.sha256()
+                with open(source, "rb") as src, open_compressed(path, "wb") as dst:
+                    while True:
+                        chunk = src.read(1 << 16)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        dst.write(chunk)
+                        state["bytes"] += len(chunk)
+                state["sha256"] = digest.hexdigest()
+            except Exception as e:
+                state["error"] = str(e)
+                
+        compressor = threading.Thread(target=compress, daemon=True)
+        if streaming:
+            compressor.start()
+            
+        def release(returncode):
+            if streaming and compressor.is_alive() and returncode != 0:
+                # minipro may have failed before opening the pipe; release the reader
+                try:
+                    os.close(os.open(source, os.O_WRONLY | os.O_NONBLOCK))
+                except OSError:
+                    pass
+            if not streaming and returncode == 0:
+                compressor.start()
+            if compressor.ident is not None:
+                compressor.join()
+            shutil.rmtree(workdir, ignore_errors=True)
+            
+        def finished(returncode):
+            self.backup_reading = False
+            release(returncode)
+            ok = returncode == 0 and not state["error"] and state["bytes"] > 0
+            if ok:
+                compressed = os.path.getsize(path)
+                self.backup_store.add({"device": device, "memory": memory, "file": path,
+                                       "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                       "size": state["bytes"], "compressed": compressed,
+                                       "sha256": state["sha256"]})
+                self.log_console(f"✓ Backup saved: {path} ({state['bytes']} → {compressed} bytes)",
+                                 color="#4caf50")
+            else:
+                if os.path.exists(path):
+                    os.remove(path)
+                if state["error"]:
+                    self.log_console(f"✗ Backup error: {state['error']}", color="#f44336")
+            on_done(ok)
+            
+        self.log_console(f"Backing up {device} ({memory}) before writing...", color="#4fc3f7")
+        command = f'{self.get_device_arg()} -r "{source}" {self.get_memory_arg()}'.strip()
+        self.backup_reading = True
+        if not self.run_command(command, on_finished=finished):
+            self.backup_reading = False
+            # Nobody will write to the pipe; release the compressor thread
+            release(-1)
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        return True
+        
+    def restore_backup(self):
+        """Write the newest backup of the selected device back to it"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        entry = self.backup_store.latest(device)
+        if not entry:
+            QMessageBox.information(self, "Restore Backup", f"No backup found for {device}.")
+            return
+            
+        reply = QMessageBox.warning(self, "Restore Backup",
+                                    f"Write the backup from {entry['created']} "
+                                    f"({entry['memory']} memory, {entry['size']} bytes) to {device}?\n\n"
+                                    "This will modify the device contents.",
+                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                    QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+            
+        workdir = tempfile.mkdtemp(prefix="minipro-restore-")
+        image = os.path.join(workdir, "restore.bin")
+        try:
+            with open_compressed(entry["file"], "rb") as src, open(image, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 16)
+        except OSError as e:
+            shutil.rmtree(workdir, ignore_errors=True)
+            QMessageBox.warning(self, "Restore Backup", f"Could not read backup: {e}")
+            return
+            
+        mem_arg = f"-c {entry['memory']}" if entry["memory"] != "code" else ""
+        command = f'{self.get_device_arg()} -w "{image}" {mem_arg} {self.get_voltage_args()} {self.get_icsp_args()}'
+        if not self.run_command(" ".join(command.split()),
+                                on_finished=lambda code: shutil.rmtree(workdir, ignore_errors=True)):
+            shutil.rmtree(workdir, ignore_errors=True)
+            
+    # Full-device snapshots
+    
+    def start_snapshot(self, mode):
+        """Read, verify or restore every memory region in one job"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        archive = self.snapshot_file.text().strip()
+        if not archive:
+            QMessageBox.warning(self, "File Required", "Please specify a snapshot archive.")
+            return
+            
+        if self.snapshot_job:
+            return
+        workdir = tempfile.mkdtemp(prefix="minipro-snapshot-")
+        if mode == "read":
+            # Regions come from `minipro -d`, which is looked up in the background
+            steps = None
+            manifest = None
+        else:
+            try:
+                manifest = self.open_snapshot(archive, workdir)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                QMessageBox.warning(self, "Snapshot", f"Cannot use {archive}: {e}")
+                shutil.rmtree(workdir, ignore_errors=True)
+                return
+            if manifest["device"] != device:
+                reply = QMessageBox.question(self, "Snapshot",
+                                             f"The snapshot was taken from {manifest['device']}, "
+                                             f"not {device}.\n\nContinue anyway?",
+                                             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                             QMessageBox.StandardButton.No)
+                if reply != QMessageBox.StandardButton.Yes:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    return
+            # Configuration/fuses last, so locks cannot block the other regions
+            steps = sorted(((name, entry["size"], False) for name, entry in manifest["regions"].items()),
+                           key=lambda step: step[0] == "config")
+            if mode == "write":
+                reply = QMessageBox.warning(self, "Restore Snapshot",
+                                            f"Write {len(steps)} region(s) from {os.path.basename(archive)} "
+                                            "to the device?\n\nThis will modify the device contents.",
+                                            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                            QMessageBox.StandardButton.No)
+                if reply != QMessageBox.StandardButton.Yes:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    return
+                    
+        self.snapshot_job = {"mode": mode, "device": device, "archive": archive, "workdir": workdir,
+                             "steps": steps, "manifest": manifest, "done": {}, "failed": [],
+                             "skipped": [], "id_checked": False, "started": time.perf_counter()}
+        if steps is None:
+            self.start_device_info([device], self.snapshot_regions_ready)
+        else:
+            self.snapshot_started()
+            
+    def snapshot_regions_ready(self, infos):
+        """Plan a snapshot read once the device information is known"""
+        job = self.snapshot_job
+        job["steps"] = self.device_db.regions(job["device"])
+        self.snapshot_started()
+        
+    def snapshot_started(self):
+        """Announce the planned regions and run the first one"""
+        job = self.snapshot_job
+        names = ", ".join(name for name, _, _ in job["steps"])
+        self.log_console(f"Snapshot {job['mode']} of {job['device']}: {names}\n", color="#4fc3f7")
+        self.snapshot_step()
+        
+    def snapshot_step(self):
+        """Run the next region of the snapshot job"""
+        job = self.snapshot_job
+        if not job["steps"]:
+            self.snapshot_finished()
+            return
+            
+        region, _, _ = job["steps"][0]
+        path = os.path.join(job["workdir"], f"{region}.bin")
+        flag = {"read": "-r", "verify": "-m", "write": "-w"}[job["mode"]]
+        mem_arg = f"-c {region}" if region != "code" else ""
+        # The chip ID was checked on the first region; the same chip is still in the socket
+        skip_id = "-x" if job["id_checked"] else ""
+        extra = self.get_icsp_args()
+        if job["mode"] == "write":
+            extra = f"{self.get_voltage_args()} {extra}"
+        command = f'{self.get_device_arg()} {flag} "{path}" {mem_arg} {extra} {skip_id}'
+        if not self.run_command(" ".join(command.split()), on_finished=self.snapshot_region_done):
+            # Refused (programmer busy or missing): end the job so its workdir is removed
+            job["failed"].append(f"{region} (not started)")
+            job["steps"] = []
+            self.snapshot_finished()
+        
+    def snapshot_region_done(self, returncode):
+        """Record one region's result and continue"""
+        job = self.snapshot_job
+        region, _, optional = job["steps"].pop(0)
+        path = os.path.join(job["workdir"], f"{region}.bin")
         
-        if save:
-            filename, _ = QFileDialog.getSaveFileName(self, "Save File", last_dir, filter)
+        if returncode == 0:
+            job["id_checked"] = True
+            if job["mode"] == "read":
+                with open(path, "rb") as f:
+                    data = f.read()
+                job["done"][region] = {"file": f"{region}.bin", "size": len(data),
+                                       "sha256": hashlib.sha256(data).hexdigest()}
+            else:
+                job["done"][region] = job["manifest"]["regions"][region]
+        elif optional:
+            job["skipped"].append(region)
+            self.log_console(f"Region '{region}' not supported by this part, skipped", color="#ff9800")
         else:
-            filename, _ = QFileDialog.getOpenFileName(self, "Open File", last_dir, filter)
+            job["failed"].append(region)
+            if region == "code":
+                # Nothing else is worth trying if the main memory fails
+                job["steps"] = []
+        self.snapshot_step()
+        
+    def snapshot_finished(self):
+        """Bundle the regions into the archive, or report the verify/restore result"""
+        job, self.snapshot_job = self.snapshot_job, None
+        elapsed = time.perf_counter() - job["started"]
+        try:
+            if job["failed"]:
+                self.log_console(f"✗ Snapshot {job['mode']} failed for: {', '.join(job['failed'])}\n",
+                                 color="#f44336")
+                return
+            if job["mode"] == "read":
+                manifest = {
+                    "device": job["device"],
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "minipro": self.backend.binary,
+                    "regions": job["done"],
+                    "unsupported": job["skipped"],
+                }
+                with zipfile.ZipFile(job["archive"], "w", zipfile.ZIP_DEFLATED) as archive:
+                    archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+                    for entry in job["done"].values():
+                        archive.write(os.path.join(job["workdir"], entry["file"]), entry["file"])
+                self.log_console(f"✓ Snapshot of {len(job['done'])} region(s) saved to {job['archive']} "
+                                 f"in {elapsed:.1f} s\n", color="#4caf50")
+            else:
+                action = "verified" if job["mode"] == "verify" else "restored"
+                self.log_console(f"✓ {len(job['done'])} region(s) {action} from {job['archive']} "
+                                 f"in {elapsed:.1f} s\n", color="#4caf50")
+        finally:
+            shutil.rmtree(job["workdir"], ignore_errors=True)
+            
+    def open_snapshot(self, archive, workdir):
+        """Extract a snapshot archive, checking every region against its hash"""
+        with zipfile.ZipFile(archive) as bundle:
+            manifest = json.loads(bundle.read("manifest.json"))
+            if not isinstance(manifest.get("regions"), dict):
+                raise ValueError("the manifest lists no regions")
+            known = {name for name, _ in MEMORY_REGIONS}
+            for region, entry in manifest["regions"].items():
+                # Region names end up in the command line and in file names
+                if region not in known:
+                    raise ValueError(f"unknown region {region!r}")
+                data = bundle.read(entry["file"])
+                if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                    raise ValueError(f"region '{region}' is corrupt (hash mismatch)")
+                with open(os.path.join(workdir, f"{region}.bin"), "wb") as f:
+                    f.write(data)
+        return manifest
+        
+    # ROM sets
+    
+    def rom_set_geometry(self):
+        """Number of chips and lane width in bytes"""
+        return int(self.romset_ways.currentText()), 2 if "word" in self.romset_width.currentText() else 1
+        
+    def split_rom_set(self):
+        """Split the set image into one file per chip"""
+        path = self.romset_file.text().strip()
+        if not os.path.isfile(path):
+            QMessageBox.warning(self, "File Not Found", f"File not found: {path}")
+            return
+        ways, width = self.rom_set_geometry()
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            lanes = split_rom_set(f.read(), ways, width)
+        for lane, data in enumerate(lanes):
+            with open(rom_set_lane_path(path, lane), "wb") as f:
+                f.write(data)
+        self.log_console(f"✓ Split {os.path.basename(path)} into {ways} lane(s) of {len(lanes[0])} bytes "
+                         f"in {(time.perf_counter() - started) * 1000:.1f} ms\n", color="#4caf50")
+        
+    def merge_rom_set(self):
+        """Interleave lane files back into the set image"""
+        path = self.romset_file.text().strip()
+        if not path:
+            QMessageBox.warning(self, "File Required", "Please specify the set image file.")
+            return
+        ways, width = self.rom_set_geometry()
+        lanes = []
+        for lane in range(ways):
+            lane_path = rom_set_lane_path(path, lane)
+            if not os.path.isfile(lane_path):
+                QMessageBox.warning(self, "File Not Found", f"File not found: {lane_path}")
+                return
+            with open(lane_path, "rb") as f:
+                lanes.append(f.read())
+        started = time.perf_counter()
+        merged = merge_rom_set(lanes, width)
+        with open(path, "wb") as f:
+            f.write(merged)
+        self.log_console(f"✓ Merged {ways} lane(s) into {os.path.basename(path)} ({len(merged)} bytes) "
+                         f"in {(time.perf_counter() - started) * 1000:.1f} ms\n", color="#4caf50")
+        
+    def run_rom_set(self, operation):
+        """Program, verify or read every chip of the set in sequence"""
+        device_arg = self.get_device_arg()
+        if not device_arg:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        path = self.romset_file.text().strip()
+        if not path:
+            QMessageBox.warning(self, "File Required", "Please specify the set image file.")
+            return
+        ways, width = self.rom_set_geometry()
+        
+        if operation != "read":
+            if not os.path.isfile(path):
+                QMessageBox.warning(self, "File Not Found", f"File not found: {path}")
+                return
+            # Always program from lanes that match the current set image
+            self.split_rom_set()
+            
+        self.rom_set_job = {"operation": operation, "path": path, "ways": ways,
+                            "width": width, "lane": 0, "failed": []}
+        self.rom_set_next_chip()
+        
+    def rom_set_next_chip(self):
+        """Ask for the next chip of the set and run the operation on it"""
+        job = self.rom_set_job
+        lane = job["lane"]
+        lane_path = rom_set_lane_path(job["path"], lane)
+        reply = QMessageBox.information(self, "ROM Set",
+                                        f"Insert the chip for lane {lane} of {job['ways']} and press OK.",
+                                        QMessageBox.StandardButton.Ok | QMessageBox.StandardButton.Cancel)
+        if reply != QMessageBox.StandardButton.Ok:
+            self.log_console("ROM set operation cancelled\n", color="#ff9800")
+            self.rom_set_job = None
+            return
             
+        if job["operation"] == "write":
+            command = self.get_write_command(lane_path)
+        elif job["operation"] == "verify":
+            command = f'{self.get_device_arg()} -m "{lane_path}" {self.get_memory_arg()}'.strip()
+        else:
+            command = f'{self.get_device_arg()} -r "{lane_path}" {self.get_memory_arg()}'.strip()
+        if not self.run_command(command, on_finished=self.rom_set_chip_done):
+            self.log_console(f"✗ ROM set {job['operation']} stopped: lane {lane} not started\n", color="#f44336")
+            self.rom_set_job = None
+        
+    def rom_set_chip_done(self, returncode):
+        """Move on to the next chip, or finish the set"""
+        job = self.rom_set_job
+        if returncode != 0:
+            job["failed"].append(job["lane"])
+        job["lane"] += 1
+        if job["lane"] < job["ways"]:
+            self.rom_set_next_chip()
+            return
+            
+        self.rom_set_job = None
+        if job["failed"]:
+            lanes = ", ".join(str(lane) for lane in job["failed"])
+            self.log_console(f"✗ ROM set {job['operation']} failed on lane(s) {lanes}\n", color="#f44336")
+        elif job["operation"] == "read":
+            self.merge_rom_set()
+        else:
+            self.log_console(f"✓ ROM set {job['operation']} complete for all {job['ways']} chips\n",
+                             color="#4caf50")
+            
+    # Failure classification and retries
+    
+    def retry_after_failure(self, callback):
+        """Classify a failed command and schedule a retry if the policy allows
+        
+        Returns True when a retry (or the pin check before it) was scheduled;
+        the callback then only runs once the retries succeed or give up.
+        """
+        command = self.current_command or ""
+        state = self.retry_state
+        operation = operation_name(command)
+        # Pin checks are handled by retry_after_pin_check; tuning passes, blank checks
+        # and logic tests fail by design and are judged by their own callers. A backup
+        # read streams into a pipe whose reader is gone once it fails, so it is not retried
+        if state and state.get("checking") or self.spi_tuning or self.backup_reading \
+                or operation in ("blank", "pin_check", "logic"):
+            return False
+            
+        output = "".join(self.command_output)
+        category, detail = classify_failure(output)
+        device = option_value(command, "-p") or "?"
+        self.failure_stats.record(device, category)
+        self.metrics.inc("minipro_failures_total", (("class", category),))
+        self.log_console(f"Failure class: {category}" + (f" ({detail})" if detail else ""), color="#ff9800")
+        
+        if state is None:
+            if not self.retry_enabled.isChecked() or operation not in ("read", "write", "verify"):
+                return False
+            state = {"original": command, "callback": callback, "attempt": 0, "device": device}
+        state["category"] = category
+        retry, pin_check = RETRY_POLICY[category]
+        if not retry or state["attempt"] >= self.retry_max.value():
+            self.retry_state = None
+            if state["attempt"]:
+                self.failure_stats.record(device, category, recovered=False)
+            if retry:
+                self.log_console(f"✗ Giving up after {state['attempt']} retries\n", color="#f44336")
+            return False
+            
+        # Retry from the failed phase: a write that only failed verification is re-verified
+        # first, and rewritten if that fails too
+        original = state["original"]
+        retry_command = original
+        if (category == "verify_error" and operation_name(original) == "write"
+                and failed_phase(output) == "verify" and operation_name(command) == "write"):
+            memory = option_value(original, "-c")
+            retry_command = (f'-p {shlex.quote(device)} -m {shlex.quote(option_value(original, "-w"))}'
+                             + (f" -c {shlex.quote(memory)}" if memory else ""))
+        state["attempt"] += 1
+        state["command"] = retry_command
+        self.retry_state = state
+        self.metrics.inc("minipro_retries_total", (("class", category),))
+        
+        delay = (2.0 if category == "usb" else 0.5) * 2 ** (state["attempt"] - 1)
+        step = "pin check, then retry" if pin_check else "retry"
+        self.log_console(f"↻ {step.capitalize()} {state['attempt']}/{self.retry_max.value()} "
+                         f"in {delay:.1f}s", color="#ff9800")
+        QTimer.singleShot(int(delay * 1000), self.run_pin_check if pin_check else self.run_retry)
+        return True
+        
+    def run_pin_check(self):
+        """Check pin contacts before retrying a contact-class failure"""
+        state = self.retry_state
+        if not state:
+            return
+        state["checking"] = True
+        if not self.run_command(f'-p {shlex.quote(state["device"])} -z', on_finished=self.retry_after_pin_check):
+            self.abandon_retry(-1)
+            
+    def retry_after_pin_check(self, returncode):
+        """Retry if the contacts are good, otherwise let the operator reseat the chip"""
+        state = self.retry_state
+        if not state:
+            return
+        state["checking"] = False
+        output = "".join(self.command_output)
+        if returncode != 0 or "bad contact" in output.lower():
+            bad_pins = [line.strip() for line in output.splitlines() if "bad contact" in line.lower()]
+            detail = "\n".join(bad_pins) or classify_failure(output)[1]
+            reply = QMessageBox.question(self, "Bad Contact",
+                                         f"The pin check failed:\n{detail}\n\n"
+                                         "Reseat the chip, then press Yes to retry.",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                self.failure_stats.record(state["device"], state["category"], recovered=False)
+                self.abandon_retry(returncode or -1)
+                return
+        self.run_retry()
+        
+    def run_retry(self):
+        """Run the scheduled retry, keeping the original completion callback"""
+        state = self.retry_state
+        if state and not self.run_command(state["command"], on_finished=state["callback"]):
+            self.abandon_retry(-1)
+            
+    def abandon_retry(self, returncode):
+        """Stop retrying and report the failure to whoever started the command"""
+        state, self.retry_state = self.retry_state, None
+        self.log_console("✗ Retry abandoned\n", color="#f44336")
+        if state and state["callback"]:
+            state["callback"](returncode)
+            
+    def show_failure_stats(self):
+        """Log failure counts per device and class"""
+        rows = self.failure_stats.summary()
+        if not rows:
+            self.log_console("No failures recorded yet", color="#4fc3f7")
+            return
+        self.log_console("Failure stats (device, class, failures, recovered by retry, not recovered, last):",
+                         color="#4fc3f7")
+        for device, category, entry in rows:
+            self.log_console(f"  {device:<20} {category:<13} {entry['count']:>5} {entry['recovered']:>5} "
+                             f"{entry['unrecovered']:>5}  {entry['last']}")
+            
+    # Metrics export
+    
+    def update_metrics_export(self, *args):
+        """Start or stop the /metrics server and export timer to match the options"""
+        if self.metrics_http_enabled.isChecked() and not self.metrics_server:
+            server = MetricsServer(self.metrics_port.value())
+            try:
+                server.start()
+            except OSError as e:
+                QMessageBox.warning(self, "Metrics", f"Could not serve /metrics: {e}")
+                self.metrics_http_enabled.setChecked(False)
+                return
+            self.metrics_server = server
+        elif not self.metrics_http_enabled.isChecked() and self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+            
+        if self.metrics_http_enabled.isChecked() or self.metrics_textfile_enabled.isChecked():
+            self.metrics_timer.start(self.metrics_interval.value() * 1000)
+            self.export_metrics()
+        else:
+            self.metrics_timer.stop()
+            self.metrics_status.setText("Not exported")
+            
+    def export_metrics(self):
+        """Render the metrics and publish them to the textfile and/or endpoint"""
+        connected = self.programmer_state or {}
+        gauges = {
+            "minipro_queue_depth": len(self.api_queue),
+            "minipro_busy": int(self.job_running()),
+            "minipro_programmer_connected": int(connected["connected"]) if connected.get("known") else -1,
+        }
+        text = self.metrics.render(gauges)
+        targets = []
+        if self.metrics_server:
+            self.metrics_server.text = text
+            targets.append(f"http://127.0.0.1:{self.metrics_server.port}/metrics")
+        path = self.metrics_textfile.text().strip()
+        if self.metrics_textfile_enabled.isChecked() and path:
+            if self.metrics_write and self.metrics_write.done() and self.metrics_write.exception():
+                self.log_console(f"✗ Metrics textfile: {self.metrics_write.exception()}", color="#f44336")
+            # The file is written off the GUI thread; a slow disk just skips an interval
+            if not self.metrics_write or self.metrics_write.done():
+                if self.metrics_writer is None:
+                    self.metrics_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+                self.metrics_write = self.metrics_writer.submit(atomic_write, path, text.encode())
+            targets.append(path)
+        self.metrics_status.setText(f"Exported to {', '.join(targets)} at {time.strftime('%H:%M:%S')}"
+                                    if targets else "Not exported")
+        
+    # Scan station
+    
+    def browse_scan_templates(self):
+        """Choose the job template file"""
+        filename, _ = QFileDialog.getOpenFileName(self, "Job Templates", self.scan_templates.text(),
+                                                  "Job templates (*.json);;All Files (*)")
         if filename:
-            line_edit.setText(filename)
-            # Save the directory for next time
-            self.settings.setValue("last_directory", os.path.dirname(filename))
+            self.scan_templates.setText(filename)
+            self.load_scan_index()
+            
+    def load_scan_index(self):
+        """Build the barcode index from the template file; returns True if usable"""
+        path = self.scan_templates.text().strip()
+        if path != self.scan_index.path:
+            self.scan_index = ScanIndex(path)
+        if self.scan_index.refresh():
+            self.report_scan_index()
+        return bool(self.scan_index.jobs)
+        
+    def report_scan_index(self):
+        """Log the jobs indexed and any template problems"""
+        index = self.scan_index
+        for problem in index.problems:
+            self.log_console(f"✗ Job templates: {problem}", color="#f44336")
+        for template in index.templates:
+            if template["profile"] and not self.profile_store.get(template["device"], template["profile"]):
+                self.log_console(f"⚠ Job '{template['name']}': no profile '{template['profile']}' "
+                                 f"for {template['device']}", color="#ff9800")
+        if index.templates:
+            self.log_console(f"✓ Indexed {len(index.templates)} job(s) under {len(index.jobs)} barcode(s)",
+                             color="#4caf50")
+            
+    def update_scan_shortcut(self):
+        """Bind the foot switch key"""
+        sequence = QKeySequence(self.scan_start_key.text().strip())
+        if sequence.isEmpty():
+            self.scan_start_key.setText(self.scan_shortcut.key().toString())
+            return
+        self.scan_shortcut.setKey(sequence)
+        
+    def toggle_scan_mode(self, checked):
+        """Start or stop accepting scans"""
+        if checked and not self.load_scan_index():
+            QMessageBox.warning(self, "Job Templates Required",
+                                "Please choose a job template file with at least one valid job.")
+            self.scan_button.blockSignals(True)
+            self.scan_button.setChecked(False)
+            self.scan_button.blockSignals(False)
+            return
+        self.scan_button.setText("Stop Scan Mode" if checked else "Start Scan Mode")
+        self.scan_input.setEnabled(checked)
+        self.scan_shortcut.setEnabled(checked)
+        if checked:
+            self.scan_stats = {"parts": 0, "failed": 0, "last_end": None}
+            self.scan_cycle.setText("")
+            self.set_scan_status("Scan a work order or part barcode", "#4fc3f7")
+            self.scan_input.setFocus()
+        else:
+            self.scan_armed = None
+            self.set_scan_status("Scan mode off", None)
+            
+    def set_scan_status(self, text, color):
+        self.scan_status.setText(text)
+        self.scan_status.setStyleSheet(f"color: {color};" if color else "")
+        
+    def handle_scan(self):
+        """Arm, start or cancel a job from one scanned code"""
+        code = normalize_scan(self.scan_input.text())
+        self.scan_input.clear()
+        if not code:
+            return
+        self.load_scan_index()
+        index = self.scan_index
+        if code == index.cancel:
+            self.scan_armed = None
+            self.set_scan_status("Disarmed: scan a work order or part barcode", "#4fc3f7")
+            self.log_console("Scan: job disarmed", color="#4fc3f7")
+        elif self.scan_job or self.job_running():
+            self.set_scan_status("Busy: wait for the current part to finish", "#ff9800")
+        elif code == index.confirm or (self.scan_armed and code in self.scan_armed["codes"]):
+            self.start_scanned_job()
+        else:
+            template = index.lookup(code)
+            if template is None:
+                self.set_scan_status(f"✗ Unknown barcode {code}", "#f44336")
+                self.log_console(f"✗ Scan: no job for {code}", color="#f44336")
+            else:
+                self.arm_scanned_job(template)
+                
+    def arm_scanned_job(self, template):
+        """Select a template's device, profile and image, ready to start"""
+        profile = None
+        if template["profile"]:
+            profile = self.profile_store.get(template["device"], template["profile"])
+            if not profile:
+                self.scan_armed = None
+                self.set_scan_status(f"✗ {template['name']}: profile '{template['profile']}' missing",
+                                     "#f44336")
+                return
+        if template["operation"] in ("write", "verify") and not os.path.exists(template["file"]):
+            self.scan_armed = None
+            self.set_scan_status(f"✗ {template['name']}: image not found", "#f44336")
+            self.log_console(f"✗ Scan: {template['file']} not found", color="#f44336")
+            return
+            
+        self.device_combo.setCurrentText(template["device"])
+        if profile:
+            self.apply_profile_values(profile["settings"])
+        if template["operation"] in ("write", "verify"):
+            self.write_file.setText(template["file"])
+        self.scan_armed = template
+        target = f" {os.path.basename(template['file'])}" if template["file"] else ""
+        self.set_scan_status(f"ARMED: {template['name']} ({template['operation']}{target} → "
+                             f"{template['device']}); scan again or press {self.scan_start_key.text()}",
+                             "#4caf50")
+        self.log_console(f"Scan: armed {template['name']}", color="#4fc3f7")
+        
+    def start_scanned_job(self):
+        """Start the armed job (second scan, confirm code or foot switch)"""
+        template = self.scan_armed
+        if not template or self.scan_job or self.job_running():
+            return
+        now = time.perf_counter()
+        last_end = self.scan_stats["last_end"]
+        self.scan_job = {"template": template, "started": now,
+                         "handling": now - last_end if last_end is not None else None}
+        self.set_scan_status(f"RUNNING: {template['name']}", "#ff9800")
+        params = {"device": template["device"], "file": template["file"], "memory": template["memory"]}
+        self.run_job(template["operation"], params, self.scanned_job_done)
+        
+    def scanned_job_done(self, returncode):
+        """Report a part's result and keep or drop the armed job"""
+        job, self.scan_job = self.scan_job, None
+        if job is None:
+            return
+        now = time.perf_counter()
+        stats = self.scan_stats
+        stats["parts"] += 1
+        stats["failed"] += returncode != 0
+        stats["last_end"] = now
+        template = job["template"]
+        if returncode == 0:
+            self.set_scan_status(f"✓ PASS: {template['name']}", "#4caf50")
+        else:
+            self.set_scan_status(f"✗ FAIL: {template['name']} (exit code {returncode})", "#f44336")
+        handling = f", {job['handling']:.1f}s handling" if job["handling"] is not None else ""
+        self.scan_cycle.setText(f"Part {stats['parts']} ({stats['failed']} failed): "
+                                f"{now - job['started']:.1f}s programming{handling}")
+        if not self.scan_keep_armed.isChecked():
+            self.scan_armed = None
+        elif self.scan_armed is template:
+            self.scan_status.setText(self.scan_status.text() + f" — next part: press "
+                                     f"{self.scan_start_key.text()} or scan again")
+        if self.scan_button.isChecked():
+            self.scan_input.setFocus()
+            
+    # Control API
+    
+    def toggle_control_api(self, checked):
+        """Start or stop the local control server"""
+        if not checked:
+            if self.control_server:
+                self.control_server.stop()
+                self.control_server = None
+            self.api_button.setText("Start Server")
+            self.api_status.setText("Stopped")
+            return
+            
+        server = ControlServer(port=self.api_port.value(), unix_path=self.api_socket.text().strip() or None,
+                               token=self.api_token.text().strip())
+        try:
+            server.start()
+        except OSError as e:
+            QMessageBox.warning(self, "Control API", f"Could not start the server: {e}")
+            self.api_button.blockSignals(True)
+            self.api_button.setChecked(False)
+            self.api_button.blockSignals(False)
+            return
+        server.job_submitted.connect(self.api_job_submitted)
+        self.control_server = server
+        if not self.api_token.text().strip():
+            # Clients read a generated token from a file only this user can open
+            self.api_token.setText(server.token)
+            token_path = os.path.join(data_dir(), "control-api.token")
+            try:
+                fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                os.fchmod(fd, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(server.token + "\n")
+                self.log_console(f"Control API token generated; saved to {token_path}", color="#4fc3f7")
+            except OSError as e:
+                self.log_console(f"Could not save the control API token: {e}", color="#f44336")
+        self.api_button.setText("Stop Server")
+        self.api_status.setText(f"Listening on {server.address()}")
+        self.log_console(f"Control API listening on {server.address()}", color="#4fc3f7")
+        
+    def api_job_submitted(self, job):
+        """Queue a job received through the control API"""
+        self.log_console(f"[API] Job {job['id']}: {job['method']} {job['params'].get('device')}",
+                         color="#4fc3f7")
+        self.api_queue.append(job)
+        self.api_run_next()
+        
+    def api_run_next(self):
+        """Start the next API job once the programmer is free"""
+        if self.api_job or not self.api_queue or not self.control_server:
+            return
+        if self.job_running():
+            QTimer.singleShot(100, self.api_run_next)
+            return
+        job = self.api_queue.pop(0)
+        self.api_job = job["id"]
+        self.control_server.update_job(job["id"], state="running", started=time.time())
+        self.run_job(job["method"], job["params"], lambda returncode: self.api_job_done(job["id"], returncode))
+        
+    def run_job(self, method, params, done):
+        """Run a read, write, verify, erase or blank_check job on params["device"]
+        
+        Used by the control API and the scan station; done is always called
+        with the return code (-1 if the job could not start).
+        """
+        error = job_params_error(method, params)
+        if error:
+            self.log_console(f"✗ Job rejected: {error}", color="#f44336")
+            done(-1)
+            return
+        # Jobs run exactly as if the operator had picked the device and pressed the button
+        self.device_combo.setCurrentText(params["device"])
+        if params.get("memory") is not None:
+            self.memory_type.setCurrentText(params["memory"])
+        device_arg = self.get_device_arg()
+        mem_arg = self.get_memory_arg()
+        
+        if method == "write":
+            self.write_image(params["file"], on_done=done)
+            return
+        if method == "read":
+            command = f'{device_arg} -r {shlex.quote(params["file"])} {mem_arg} {self.get_format_arg()}'
+        elif method == "verify":
+            image = self.expand_input(params["file"])
+            if not image:
+                done(-1)
+                return
+            command = f'{device_arg} -m {shlex.quote(image)} {mem_arg}'
+        elif method == "erase":
+            command = f"{device_arg} -E"
+        else:
+            command = f"{device_arg} -b {mem_arg}"
+        if not self.run_command(command.strip(), on_finished=done):
+            done(-1)
+            
+    def api_job_done(self, job_id, returncode):
+        """Record an API job's result and move on to the next one"""
+        if self.control_server:
+            fields = {"state": "done", "progress": 100} if returncode == 0 else {"state": "failed"}
+            self.control_server.update_job(job_id, returncode=returncode, finished=time.time(), **fields)
+        self.api_job = None
+        QTimer.singleShot(0, self.api_run_next)
+        
+    # Test patterns and burn-in
+    
+    def burnin_size_for(self, device):
+        """Pattern size: the override, or the code memory size from the device database"""
+        if self.burnin_size.value():
+            return self.burnin_size.value()
+        return self.device_db.regions(device)[0][1]
+        
+    def save_pattern_image(self):
+        """Write the selected pattern (first cycle) to a file"""
+        device = self.device_combo.currentText().strip()
+        size = self.burnin_size_for(device) if device or self.burnin_size.value() else None
+        if not size:
+            QMessageBox.warning(self, "Size Required",
+                                "Select a device minipro knows, or enter the pattern size.")
+            return
+        name = self.burnin_pattern.currentText()
+        if name not in TEST_PATTERNS:
+            name = TEST_PATTERNS[0]
+        path, _ = QFileDialog.getSaveFileName(self, "Save Pattern Image",
+                                              f"{name.replace(' ', '_')}_{size}.bin", "Binary Files (*.bin)")
+        if not path:
+            return
+        atomic_write(path, generate_pattern(name, size, 0, self.burnin_seed.value()))
+        self.log_console(f"✓ Saved {name} pattern ({size} bytes) to {path}", color="#4caf50")
+        
+    def toggle_burnin(self, checked):
+        """Start burn-in, or stop it after the current cycle"""
+        if not checked:
+            if self.burnin_job:
+                self.burnin_job["stop"] = True
+                self.burnin_status.setText("Stopping after this cycle...")
+            return
+        if not self.start_burnin():
+            self.burnin_button.blockSignals(True)
+            self.burnin_button.setChecked(False)
+            self.burnin_button.blockSignals(False)
+            
+    def start_burnin(self):
+        """Set up a burn-in run; returns False if it could not start"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return False
+        if self.job_running():
+            QMessageBox.warning(self, "Command Running",
+                                "A command is already running. Please wait for it to complete.")
+            return False
+        size = self.burnin_size_for(device)
+        if not size:
+            QMessageBox.warning(self, "Size Required",
+                                "minipro did not report a memory size for this device; enter the pattern size.")
+            return False
+        reply = QMessageBox.warning(self, "Burn-In",
+                                    f"Repeatedly overwrite all {size} bytes of {device} with test patterns?",
+                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                    QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return False
             
-    def run_command(self, command):
-        """Execute a minipro command in a separate thread"""
-        if self.current_thread and self.current_thread.isRunning():
-            QMessageBox.warning(self, "Command Running", 
-                              "A command is already running. Please wait for it to complete.")
+        name = self.burnin_pattern.currentText()
+        patterns = [name] if name in TEST_PATTERNS else list(TEST_PATTERNS)
+        workdir = tempfile.mkdtemp(prefix="minipro-burnin-")
+        safe_name = re.sub(r"[^\w@.-]", "_", device)
+        log_path = os.path.join(data_dir("burnin"), f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+        with open(log_path, "w") as f:
+            f.write("cycle,time,pattern,write_rc,read_rc,mismatches,first_failure\n")
+        self.burnin_job = {"device": device, "size": size, "patterns": patterns, "seed": self.burnin_seed.value(),
+                           "cycles": self.burnin_cycles.value(), "cycle": 0, "stats": PatternStats(size),
+                           "workdir": workdir, "log": log_path, "stop": False, "command_errors": 0,
+                           "started": time.perf_counter()}
+        # Hours of minipro output must not grow the console (or its line index) without bound
+        self.console.document().setMaximumBlockCount(BURNIN_CONSOLE_LINES)
+        self.console_log.limit = BURNIN_CONSOLE_LINES
+        self.log_console(f"Burn-in of {device}: {', '.join(patterns)}, {size} bytes, "
+                         f"{self.burnin_cycles.value() or 'unlimited'} cycle(s); log {log_path}\n",
+                         color="#4fc3f7")
+        self.burnin_button.setText("Stop Burn-In")
+        self.burnin_cycle()
+        return True
+        
+    def burnin_cycle(self):
+        """Generate this cycle's pattern and write it"""
+        job = self.burnin_job
+        if job["stop"] or (job["cycles"] and job["cycle"] >= job["cycles"]):
+            self.burnin_finished()
             return
+        pattern = job["patterns"][job["cycle"] % len(job["patterns"])]
+        # Only the current pattern is held: memory stays flat however long the run
+        job["pattern"] = pattern
+        job["expected"] = generate_pattern(pattern, job["size"], job["cycle"] // len(job["patterns"]),
+                                           job["seed"])
+        with open(os.path.join(job["workdir"], "pattern.bin"), "wb") as f:
+            f.write(job["expected"])
+        self.burnin_status.setText(f"Cycle {job['cycle'] + 1}: writing {pattern}")
+        # Verification is our own read-back below
+        command = (f'{self.get_device_arg()} -w "{os.path.join(job["workdir"], "pattern.bin")}" '
+                   f'{self.get_voltage_args()} {self.get_icsp_args()} -v')
+        if not self.run_command(" ".join(command.split()), on_finished=self.burnin_written):
+            self.burnin_finished()
             
-        self.log_console(f"$ minipro {command}\n", color="#4fc3f7")
-        self.statusBar().showMessage("Running command...")
-        
-        # Show and reset progress bar
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.progress_label.setText("Starting...")
-        
-        full_command = f"minipro {command}"
-        self.current_thread = CommandThread(full_command, self.debug_mode.isChecked())
-        self.current_thread.output_received.connect(self.log_console)
-        self.current_thread.error_received.connect(lambda msg: self.log_console(msg, color="#f44336"))
-        self.current_thread.progress_update.connect(self.update_progress)
-        self.current_thread.debug_output.connect(lambda msg: self.log_console(msg, color="#9c27b0"))
-        self.current_thread.finished_signal.connect(self.command_finished)
-        self.current_thread.start()
-        
-    def command_finished(self, returncode):
-        """Handle command completion"""
-        # Hide progress bar after a short delay
-        QTimer.singleShot(2000, lambda: self.progress_bar.setVisible(False))
-        
+    def burnin_written(self, returncode):
+        """Read the pattern back"""
+        job = self.burnin_job
+        job["write_rc"] = returncode
+        if returncode != 0:
+            self.burnin_compared(None)
+            return
+        self.burnin_status.setText(f"Cycle {job['cycle'] + 1}: reading back {job['pattern']}")
+        command = f'{self.get_device_arg()} -r "{os.path.join(job["workdir"], "readback.bin")}" {self.get_icsp_args()}'
+        if not self.run_command(" ".join(command.split()), on_finished=self.burnin_compared):
+            self.burnin_finished()
+            
+    def burnin_compared(self, returncode):
+        """Compare the read-back, log the cycle and start the next one"""
+        job = self.burnin_job
+        stats = job["stats"]
+        mismatches = None
         if returncode == 0:
-            self.statusBar().showMessage("Command completed successfully", 3000)
-            self.log_console("\n✓ Command completed successfully\n", color="#4caf50")
-            self.progress_bar.setValue(100)
-            self.progress_label.setText("Complete!")
+            with open(os.path.join(job["workdir"], "readback.bin"), "rb") as f:
+                mismatches = stats.compare(job["expected"], f.read())
+            job["command_errors"] = 0
         else:
-            self.statusBar().showMessage(f"Command failed with code {returncode}", 5000)
-            self.log_console(f"\n✗ Command failed with exit code {returncode}\n", color="#f44336")
-            self.progress_label.setText("Failed")
+            job["command_errors"] += 1
+        job["cycle"] += 1
+        first = f"0x{stats.cycle_first_failure:X}" if mismatches else ""
+        with open(job["log"], "a") as f:
+            f.write(f"{job['cycle']},{time.strftime('%Y-%m-%dT%H:%M:%S')},{job['pattern']},"
+                    f"{job['write_rc']},{'' if returncode is None else returncode},"
+                    f"{'' if mismatches is None else mismatches},{first}\n")
+                    
+        if mismatches is None:
+            self.log_console(f"✗ Burn-in cycle {job['cycle']} ({job['pattern']}): programmer error",
+                             color="#f44336")
+        elif mismatches:
+            self.log_console(f"✗ Burn-in cycle {job['cycle']} ({job['pattern']}): {mismatches} byte(s) differ",
+                             color="#f44336")
+        else:
+            self.log_console(f"✓ Burn-in cycle {job['cycle']} ({job['pattern']}): OK", color="#4caf50")
+        address, data = stats.suspect_lines()
+        suspects = f"; suspect {' '.join(address + data)}" if address or data else ""
+        self.burnin_status.setText(f"{job['cycle']} cycle(s), {stats.failed_cycles} with mismatches, "
+                                   f"{stats.mismatches} bad byte(s){suspects}")
+        if (mismatches and self.burnin_stop_on_fail.isChecked()) or job["command_errors"] >= 3:
+            job["stop"] = True
+        QTimer.singleShot(0, self.burnin_cycle)
+        
+    def burnin_finished(self):
+        """Report the run's totals and clean up"""
+        job, self.burnin_job = self.burnin_job, None
+        shutil.rmtree(job["workdir"], ignore_errors=True)
+        self.console.document().setMaximumBlockCount(0)
+        self.console_log.limit = 0
+        self.burnin_button.blockSignals(True)
+        self.burnin_button.setChecked(False)
+        self.burnin_button.blockSignals(False)
+        self.burnin_button.setText("Start Burn-In")
+        
+        stats = job["stats"]
+        hours = (time.perf_counter() - job["started"]) / 3600
+        color = "#4caf50" if not stats.mismatches and not job["command_errors"] else "#f44336"
+        self.log_console(f"\nBurn-in finished: {job['cycle']} cycle(s) in {hours:.2f} h, "
+                         f"{stats.failed_cycles} with mismatches, {stats.mismatches} bad byte(s) "
+                         f"of {stats.bytes_compared}", color=color)
+        if stats.mismatches:
+            width = stats.address_bits
+            self.log_console("  Failures with address bit set: " +
+                             " ".join(f"A{bit}={stats.address_counts[bit]}" for bit in range(width)))
+            self.log_console("  Flipped data bits: " +
+                             " ".join(f"D{bit}={count}" for bit, count in enumerate(stats.data_counts)))
+            self.log_console("  First failing addresses: " +
+                             " ".join(f"0x{address:X}" for address in stats.first_failures))
+            address, data = stats.suspect_lines()
+            if address or data:
+                self.log_console(f"  Suspect lines: {' '.join(address + data)}", color="#ff9800")
+        self.log_console(f"  Cycle log: {job['log']}\n")
+        self.burnin_status.setText("Idle")
+        
+    # Logic IC batches
+    
+    def toggle_logic_batch(self, checked):
+        """Start a batch (fresh counts and log) or end it with a summary"""
+        if not checked:
+            batch, self.logic_batch = self.logic_batch, None
+            self.logic_next_button.setEnabled(False)
+            self.logic_next_shortcut.setEnabled(False)
+            self.logic_batch_button.setText("Start Batch")
+            if batch:
+                self.log_console(f"Batch finished: {self.logic_yield_text(batch)}\n  Log: {batch['log']}\n",
+                                 color="#4fc3f7")
+            return
             
-    def update_progress(self, percentage, status):
-        """Update progress bar and label"""
-        self.progress_bar.setValue(percentage)
-        self.progress_label.setText(status)
-        self.statusBar().showMessage(status)
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            self.logic_batch_button.blockSignals(True)
+            self.logic_batch_button.setChecked(False)
+            self.logic_batch_button.blockSignals(False)
+            return
+        safe_name = re.sub(r"[^\w@.-]", "_", device)
+        log_path = os.path.join(data_dir("logic"), f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+        with open(log_path, "w") as f:
+            f.write("part,time,bin,failing_pins,failed_vectors,vectors,seconds\n")
+        self.logic_batch = {"device": device, "tested": 0, "bins": {}, "log": log_path,
+                            "started": time.perf_counter()}
+        self.logic_next_button.setEnabled(True)
+        self.logic_next_shortcut.setEnabled(True)
+        self.logic_batch_button.setText("End Batch")
+        self.logic_yield.setText(self.logic_yield_text(self.logic_batch))
+        self.log_console(f"Logic test batch of {device}; log {log_path}", color="#4fc3f7")
+        self.logic_batch_next()
+        
+    def logic_batch_next(self):
+        """Test the part now in the socket"""
+        if not self.logic_batch or self.job_running():
+            return
+        device_arg = f'-p "{self.logic_batch["device"]}"'
+        self.count_logic_use(self.logic_batch["device"])
+        self.logic_last.setText(f"Testing part {self.logic_batch['tested'] + 1}...")
+        self.run_command(f"{device_arg} -T {self.get_vcc_arg()}".strip(), on_finished=self.logic_batch_done)
+        
+    def logic_batch_done(self, returncode):
+        """Bin the part and update the running yield"""
+        batch = self.logic_batch
+        if not batch:
+            return
+        result = parse_logic_test("".join(self.command_output))
+        verdict = bin_logic_part(result, returncode)
+        self.show_logic_matrix(result)
+        if verdict == "error":
+            self.logic_last.setText("✗ No test vectors (programmer or device problem); part not binned — retest")
+            return
             
-    def log_console(self, message, color=None):
-        """Append message to console with optional color"""
-        cursor = self.console.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        
-        if color:
-            self.console.setTextColor(QColor(color))
+        batch["tested"] += 1
+        batch["bins"][verdict] = batch["bins"].get(verdict, 0) + 1
+        failed_vectors = sum(1 for vector in result["vectors"] if vector["failed"])
+        seconds = time.perf_counter() - self.command_started
+        with open(batch["log"], "a") as f:
+            f.write(f"{batch['tested']},{time.strftime('%Y-%m-%dT%H:%M:%S')},\"{verdict}\","
+                    f"\"{' '.join(map(str, sorted(result['failures'])))}\",{failed_vectors},"
+                    f"{len(result['vectors'])},{seconds:.2f}\n")
+        mark = "✓" if verdict == "good" else "✗"
+        self.logic_last.setText(f"{mark} Part {batch['tested']}: {verdict}")
+        self.logic_last.setStyleSheet(f"color: {'#4caf50' if verdict == 'good' else '#f44336'};")
+        self.logic_yield.setText(self.logic_yield_text(batch))
+        
+    @staticmethod
+    def logic_yield_text(batch):
+        """Running yield from the batch counters"""
+        tested = batch["tested"]
+        if not tested:
+            return f"{batch['device']}: no parts tested yet"
+        good = batch["bins"].get("good", 0)
+        rate = tested / max(time.perf_counter() - batch["started"], 1e-9) * 3600
+        others = ", ".join(f"{name} {count}" for name, count in sorted(batch["bins"].items(),
+                                                                       key=lambda item: -item[1])
+                           if name != "good")
+        return (f"{batch['device']}: {tested} tested, {good} good ({good / tested:.1%} yield)"
+                + (f"; {others}" if others else "") + f"; {rate:.0f} parts/h")
+                
+    def show_logic_matrix(self, result):
+        """Fill the pin matrix with the last part's vectors"""
+        vectors = result["vectors"]
+        pins = result["pins"] or (list(range(1, len(vectors[0]["states"]) + 1)) if vectors else [])
+        self.logic_matrix.clear()
+        self.logic_matrix.setRowCount(len(vectors))
+        self.logic_matrix.setColumnCount(len(pins))
+        self.logic_matrix.setHorizontalHeaderLabels([str(pin) for pin in pins])
+        self.logic_matrix.setVerticalHeaderLabels([f"{vector['index']:04d}" for vector in vectors])
+        for row, vector in enumerate(vectors):
+            for column, state in enumerate(vector["states"][:len(pins)]):
+                item = QTableWidgetItem(state)
+                if pins[column] in vector["failed"]:
+                    item.setBackground(QColor("#f44336"))
+                self.logic_matrix.setItem(row, column, item)
+        self.logic_matrix.resizeColumnsToContents()
+        
+    # Logic IC identification
+    
+    def count_logic_use(self, device):
+        """Remember how often each logic part is tested, to order identification candidates"""
+        if device:
+            self.logic_usage[device] = self.logic_usage.get(device, 0) + 1
+            self.settings.setValue("logic_usage", json.dumps(self.logic_usage, sort_keys=True))
+            
+    def toggle_identify(self, checked):
+        """Start identifying the part in the socket, or cancel"""
+        if not checked:
+            if self.logic_identify:
+                self.logic_identify["cancelled"] = True
+            return
+        if self.job_running():
+            QMessageBox.warning(self, "Command Running",
+                                "A command is already running. Please wait for it to complete.")
+            self.identify_button.setChecked(False)
+            return
+            
+        if self.logic_db is None:
+            try:
+                self.logic_db = LogicDatabase()
+            except (OSError, ElementTree.ParseError) as e:
+                self.log_console(f"Cannot read the logic IC database: {e}", color="#f44336")
+                self.logic_db = LogicDatabase(path="")
+        pins = int(self.identify_package.currentText()[3:])
+        known = [self.device_combo.itemText(i) for i in range(self.device_combo.count())]
+        candidates = self.logic_db.candidates(pins, known, self.logic_usage)
+        if not candidates:
+            QMessageBox.warning(self, "Identify",
+                                "No logic IC candidates: minipro's logicic.xml was not found and the device "
+                                "list has no logic parts. Load the device list first.")
+            self.identify_button.setChecked(False)
+            return
+            
+        reply = QMessageBox.question(self, "Identify",
+                                     f"Test the part in the socket against up to {len(candidates)} logic ICs?\n\n"
+                                     "Each candidate drives the part's pins with its own vectors; only do this "
+                                     "with parts that tolerate the programmer's supply voltage.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.identify_button.setChecked(False)
+            return
+            
+        self.logic_identify = {"pins": pins, "candidates": candidates, "tested": {}, "runs": 0,
+                               "cancelled": False, "started": time.perf_counter()}
+        self.identify_button.setText("Cancel")
+        if self.logic_db.parts:
+            self.identify_started(os.path.basename(self.logic_db.path))
         else:
-            self.console.setTextColor(QColor("#d4d4d4"))
+            # Without the database the package comes from minipro -d, looked up in the background
+            self.identify_status.setText(f"Checking the packages of {len(candidates)} candidates...")
+            self.start_device_info([name for name, _ in candidates], self.identify_packages_ready)
             
-        self.console.append(message.rstrip())
-        self.console.setTextCursor(cursor)
-        self.console.ensureCursorVisible()
-        
-    def get_device_arg(self):
-        """Get the device argument if specified"""
+    def identify_packages_ready(self, infos):
+        """Drop device-list candidates whose package has another pin count"""
+        job = self.logic_identify
+        suffix = str(job["pins"])
+        for name, info in infos.items():
+            package = (info or {}).get("fields", {}).get("package", "").upper()
+            if package and not package.endswith(suffix):
+                job["candidates"] = [candidate for candidate in job["candidates"] if candidate[0] != name]
+        self.identify_started("device list")
+        
+    def identify_started(self, source):
+        """Announce the candidates and test the first one"""
+        job = self.logic_identify
+        self.log_console(f"Identifying {self.identify_package.currentText()} part: "
+                         f"{len(job['candidates'])} candidates from {source}", color="#4fc3f7")
+        self.identify_next()
+        
+    def identify_next(self):
+        """Test the next candidate whose vectors have not been tried on this part"""
+        job = self.logic_identify
+        while job["candidates"] and not job["cancelled"]:
+            name, fingerprint = job["candidates"][0]
+            if fingerprint in job["tested"]:
+                # Same vectors as a part that already failed; no need to run them again
+                job["candidates"].pop(0)
+                continue
+            job["runs"] += 1
+            self.identify_status.setText(f"Trying {name} ({job['runs']} tested, "
+                                         f"{len(job['candidates']) - 1} left)...")
+            if not self.run_command(f'-p "{name}" -T {self.get_vcc_arg()}'.strip(),
+                                    on_finished=self.identify_tested):
+                job["cancelled"] = True
+                break
+            return
+        self.identify_finished(None)
+        
+    def identify_tested(self, returncode):
+        """Stop at the first candidate that passes"""
+        job = self.logic_identify
+        name, fingerprint = job["candidates"].pop(0)
+        result = parse_logic_test("".join(self.command_output))
+        if returncode == 0 and result["passed"]:
+            self.identify_finished(name, fingerprint)
+            return
+        job["tested"][fingerprint] = name
+        self.identify_next()
+        
+    def identify_finished(self, name, fingerprint=None):
+        """Report the match (and parts with the same vectors) or that nothing matched"""
+        job, self.logic_identify = self.logic_identify, None
+        elapsed = time.perf_counter() - job["started"]
+        self.identify_button.blockSignals(True)
+        self.identify_button.setChecked(False)
+        self.identify_button.blockSignals(False)
+        self.identify_button.setText("Identify")
+        if name:
+            equivalents = [other for other, other_fingerprint in job["candidates"]
+                           if other_fingerprint == fingerprint and other != name]
+            also = f" (same vectors: {', '.join(equivalents[:8])}{'...' if len(equivalents) > 8 else ''})" \
+                if equivalents else ""
+            self.identify_status.setText(f"✓ {name}{also} — {job['runs']} test(s) in {elapsed:.1f}s")
+            self.log_console(f"✓ Identified as {name}{also} after {job['runs']} test(s) in {elapsed:.1f}s\n",
+                             color="#4caf50")
+            self.count_logic_use(name)
+            self.device_combo.setCurrentText(name)
+        elif job["cancelled"]:
+            self.identify_status.setText(f"Cancelled after {job['runs']} test(s)")
+        else:
+            self.identify_status.setText(f"✗ No candidate passed ({job['runs']} test(s), {elapsed:.1f}s)")
+            self.log_console(f"✗ No {job['pins']}-pin logic IC matched after {job['runs']} test(s)\n",
+                             color="#f44336")
+            
+    # Watch mode
+    
+    def job_running(self):
+        """True while a command or a multi-step job owns the programmer"""
+        return not self.command_done or bool(self.snapshot_job or self.rom_set_job or self.spi_tuning
+                                             or self.retry_state or self.burnin_job or self.logic_identify)
+        
+    def toggle_watch(self, checked):
+        """Start or stop watch mode"""
+        if self.artifact_watcher:
+            self.artifact_watcher.stop()
+            self.artifact_watcher.deleteLater()
+            self.artifact_watcher = None
+        self.watch_pending = None
+        if not checked:
+            self.watch_button.setText("Start Watching")
+            self.watch_status.setText("Not watching")
+            return
+            
+        path = self.watch_path.text().strip()
+        if not self.get_device_arg():
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+        elif not path or not os.path.exists(path):
+            QMessageBox.warning(self, "Watch Mode", "Choose an existing artifact file or folder to watch.")
+        else:
+            patterns = tuple(self.watch_patterns.text().split()) or ("*",)
+            self.artifact_watcher = ArtifactWatcher(path, patterns)
+            self.artifact_watcher.artifact_ready.connect(self.watch_artifact_ready)
+            mode = "inotify" if self.artifact_watcher.start() else "polling"
+            self.watch_button.setText("Stop Watching")
+            self.watch_status.setText(f"Watching ({mode})")
+            self.log_console(f"[WATCH] Watching {path} ({mode}); programming "
+                             f"{self.device_combo.currentText().strip()} on every new artifact", color="#4fc3f7")
+            return
+        self.watch_button.blockSignals(True)
+        self.watch_button.setChecked(False)
+        self.watch_button.blockSignals(False)
+        
+    def watch_artifact_ready(self, path):
+        """A new artifact settled; program it now or as soon as the programmer is free"""
+        self.watch_pending = path
+        self.watch_status.setText(f"New artifact: {os.path.basename(path)}")
+        self.watch_program_pending()
+        
+    def watch_program_pending(self):
+        """Start the queued watch-mode write once nothing else is running"""
+        if not self.watch_pending or not self.artifact_watcher:
+            return
+        if self.job_running():
+            QTimer.singleShot(100, self.watch_program_pending)
+            return
+        path, self.watch_pending = self.watch_pending, None
         device = self.device_combo.currentText().strip()
-        if device:
-            return f'-p "{device}"'
-        return ""
-        
-    def get_memory_arg(self):
-        """Get memory type argument"""
-        mem_type = self.memory_type.currentText()
-        if mem_type and mem_type != "code":
-            return f"-c {mem_type}"
-        return ""
-        
-    def get_format_arg(self):
-        """Get file format argument"""
-        format_text = self.file_format.currentText()
-        if "ihex" in format_text:
-            return "-f ihex"
-        elif "srec" in format_text:
-            return "-f srec"
-        return ""
-        
-    def get_voltage_args(self):
-        """Get voltage configuration arguments"""
-        args = []
         
-        if self.vpp_voltage.currentText() != "Default":
-            args.append(f"--vpp {self.vpp_voltage.currentText()}")
+        try:
+            saved = os.path.getmtime(path)
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            self.log_console(f"[WATCH] ✗ Cannot read {path}: {e}", color="#f44336")
+            return
+        if self.watch_skip_unchanged.isChecked() and self.watch_programmed.get(device) == digest:
+            self.log_console(f"[WATCH] {os.path.basename(path)} is unchanged since the last write; skipped",
+                             color="#ff9800")
+            self.watch_status.setText("Watching (unchanged)")
+            return
             
-        if self.vdd_voltage.currentText() != "Default":
-            args.append(f"--vdd {self.vdd_voltage.currentText()}")
+        self.log_console(f"[WATCH] {os.path.basename(path)} changed; programming starts "
+                         f"{(time.time() - saved) * 1000:.0f} ms after it was saved", color="#4fc3f7")
+        self.watch_status.setText(f"Programming {os.path.basename(path)}")
+        self.write_image(path, on_done=lambda code: self.watch_write_done(code, path, device, digest))
+        
+    def watch_write_done(self, returncode, path, device, digest):
+        """Record a watch-mode write and verify it if the write itself skipped verification"""
+        name = os.path.basename(path)
+        if returncode != 0:
+            self.watch_programmed.pop(device, None)
+            self.watch_status.setText(f"Failed: {name}")
+            return
+        self.watch_programmed[device] = digest
+        self.watch_status.setText(f"Programmed {name} at {time.strftime('%H:%M:%S')}")
+        if self.skip_verify.isChecked():
+            expanded = self.expand_input(path)
+            if expanded:
+                self.run_command(f'{self.get_device_arg()} -m "{expanded}" {self.get_memory_arg()}'.strip())
+                
+    # Post-read pipeline
+    
+    def post_read_checks(self):
+        """Pipeline checkboxes keyed by their settings name"""
+        return {
+            "post_read_enabled": self.post_read_enabled,
+            "post_read_hash": self.post_read_hash,
+            "post_read_blank": self.post_read_blank,
+            "post_read_convert": self.post_read_convert,
+            "post_read_compare": self.post_read_compare,
+        }
+        
+    def start_post_read(self, path):
+        """Run the configured post-read stages on a finished dump"""
+        if not os.path.isfile(path):
+            self.log_console(f"✗ Post-read pipeline: {path} not found\n", color="#f44336")
+            return
             
-        if self.vcc_voltage.currentText() != "Default":
-            args.append(f"--vcc {self.vcc_voltage.currentText()}")
+        stages = []
+        if self.post_read_hash.isChecked():
+            stages.append(("hash", stage_hash, (path,)))
+        if self.post_read_blank.isChecked():
+            stages.append(("blank regions", stage_blank_regions, (path,)))
+        if self.post_read_convert.isChecked():
+            stages.append(("convert", stage_convert, (path, self.post_read_target.currentText())))
+        golden = self.golden_file.text().strip()
+        if self.post_read_compare.isChecked() and golden:
+            if os.path.isfile(golden):
+                stages.append(("compare", stage_compare, (path, golden)))
+            else:
+                self.log_console(f"✗ Golden image not found: {golden}", color="#f44336")
+        if not stages:
+            return
             
-        if self.spi_clock.currentText() != "Default":
-            args.append(f"--spi_clock {self.spi_clock.currentText()}")
+        if self.post_read_executor is None:
+            # spawn: forking a process that runs Qt threads is not safe
+            self.post_read_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn")
+            )
             
-        if self.pulse_delay.value() > 0:
-            args.append(f"--pulse {self.pulse_delay.value()}")
+        self.log_console(f"Post-read pipeline: {', '.join(name for name, _, _ in stages)}", color="#4fc3f7")
+        # An earlier dump's pipeline may still be running; keep its thread until it ends
+        self.post_read_threads = [thread for thread in self.post_read_threads if thread.isRunning()]
+        thread = PostReadThread(self.post_read_executor, stages)
+        thread.stage_finished.connect(self.post_read_stage_finished)
+        thread.pipeline_finished.connect(
+            lambda seconds: self.log_console(f"✓ Post-read pipeline finished in {seconds:.2f} s\n",
+                                             color="#4caf50"))
+        self.post_read_threads.append(thread)
+        thread.start()
+        
+    def post_read_stage_finished(self, name, summary, seconds, ok):
+        """Report one stage with its timing"""
+        mark, color = ("✓", "#4caf50") if ok else ("✗", "#f44336")
+        self.log_console(f"{mark} [{name}] {seconds * 1000:.1f} ms: {summary}", color=color)
+        
+    # SPI clock tuning
+    
+    def tune_spi_clock(self):
+        """Sweep SPI clock speeds with read-back-and-compare passes"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
             
-        return " ".join(args)
-        
-    def get_protection_args(self):
-        """Get protection arguments"""
-        args = []
-        if self.unprotect.isChecked():
-            args.append("-u")
-        if self.protect.isChecked():
-            args.append("-P")
-        return " ".join(args)
+        adapter = self.spi_adapter.text().strip()
+        previous = self.spi_tuning_store.get(device, adapter)
+        if previous:
+            reply = QMessageBox.question(self, "Tune SPI Clock",
+                                         f"{device} on '{adapter or 'default'}' was tuned on "
+                                         f"{previous['tested']}.\nRecommended clock: "
+                                         f"{previous['recommended'] or 'none error-free'} MHz\n\n"
+                                         "Run the sweep again?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                         QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                self.apply_spi_recommendation(device, previous["recommended"])
+                return
+                
+        workdir = os.path.join(os.path.expanduser("~"), ".cache", "minipro-gui", "spi-tuning")
+        os.makedirs(workdir, exist_ok=True)
+        
+        # Slowest clock first: its read is the reference the others must match
+        clocks = [self.spi_clock.itemText(i) for i in range(self.spi_clock.count())
+                  if self.spi_clock.itemText(i) != "Default"]
+        clocks.sort(key=float)
+        self.spi_tuning = {
+            "device": device,
+            "adapter": adapter,
+            "steps": [(clock, n) for clock in clocks for n in range(self.spi_tune_passes.value())],
+            "reference": None,
+            "workdir": workdir,
+            "results": {clock: {"passes": 0, "errors": 0, "times": []} for clock in clocks},
+        }
+        self.log_console(f"SPI clock sweep for {device}: {', '.join(clocks)} MHz × "
+                         f"{self.spi_tune_passes.value()} pass(es)\n", color="#4fc3f7")
+        self.spi_tuning_step()
+        
+    def spi_tuning_step(self):
+        """Start the next read pass of the sweep"""
+        tuning = self.spi_tuning
+        if not tuning["steps"]:
+            self.spi_tuning_finished()
+            return
+            
+        clock, n = tuning["steps"][0]
+        output = os.path.join(tuning["workdir"], f"pass-{clock}-{n}.bin")
+        tuning["output"] = output
+        tuning["started"] = time.perf_counter()
+        command = f'-p "{tuning["device"]}" -r "{output}" --spi_clock {clock} {self.get_icsp_args()}'
+        if not self.run_command(command.strip(), on_finished=self.spi_tuning_pass_done):
+            self.log_console(f"✗ {clock} MHz pass {n + 1} could not start; SPI sweep aborted\n", color="#f44336")
+            self.spi_tuning = None
+        
+    def spi_tuning_pass_done(self, returncode):
+        """Compare a finished pass against the reference read"""
+        tuning = self.spi_tuning
+        clock, n = tuning["steps"].pop(0)
+        result = tuning["results"][clock]
+        result["passes"] += 1
+        result["times"].append(round(time.perf_counter() - tuning["started"], 3))
+        
+        error = None
+        if returncode != 0:
+            error = f"exit code {returncode}"
+        else:
+            with open(tuning["output"], "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if tuning["reference"] is None:
+                tuning["reference"] = digest
+                tuning["size"] = os.path.getsize(tuning["output"])
+            elif digest != tuning["reference"]:
+                error = "read-back differs from reference"
+        if os.path.exists(tuning["output"]):
+            os.remove(tuning["output"])
+        
+        if error:
+            result["errors"] += 1
+            self.log_console(f"✗ {clock} MHz pass {n + 1}: {error}", color="#f44336")
+            # A clock that failed once is not reliable; skip its remaining passes
+            tuning["steps"] = [step for step in tuning["steps"] if step[0] != clock]
+        else:
+            self.log_console(f"✓ {clock} MHz pass {n + 1}: {result['times'][-1]:.2f} s", color="#4caf50")
+            
+        if tuning["reference"] is None:
+            # Without a clean reference read nothing can be compared
+            self.log_console("✗ Reference read failed; SPI sweep aborted\n", color="#f44336")
+            self.spi_tuning = None
+            return
+        self.spi_tuning_step()
+        
+    def spi_tuning_finished(self):
+        """Summarize the sweep, store it and apply the recommendation"""
+        tuning, self.spi_tuning = self.spi_tuning, None
+        clocks = {}
+        for clock, result in tuning["results"].items():
+            times = result.pop("times")
+            result["mean_s"] = round(sum(times) / len(times), 3) if times else None
+            clocks[clock] = result
+            status = "untested" if not result["passes"] else (
+                f"{result['errors']} error(s)" if result["errors"] else f"OK, {result['mean_s']:.2f} s")
+            self.log_console(f"  {clock:>3} MHz: {status}")
+            
+        recommended = SpiTuningStore.recommend(clocks)
+        self.spi_tuning_store.save(tuning["device"], tuning["adapter"], clocks, recommended)
+        if recommended:
+            # Feed the profile defaults so later runs pick this clock up
+            mean = clocks[recommended]["mean_s"]
+            if mean:
+                # Sweep passes run without --pulse, i.e. at minipro's default
+                self.profile_store.record_throughput(tuning["device"], "read", tuning["size"] / mean,
+                                                     recommended, 0)
+        self.apply_spi_recommendation(tuning["device"], recommended)
+        
+    def apply_spi_recommendation(self, device, clock):
+        """Select the recommended SPI clock"""
+        if not clock:
+            self.log_console(f"✗ No error-free SPI clock found for {device}\n", color="#f44336")
+            return
+        self.spi_clock.setCurrentText(clock)
+        self.update_best_settings_label(device)
+        self.log_console(f"✓ Recommended SPI clock for {device}: {clock} MHz\n", color="#4caf50")
         
-    def get_icsp_args(self):
-        """Get ICSP arguments"""
-        if self.icsp_vcc.isChecked():
-            return "-i"
-        elif self.icsp_no_vcc.isChecked():
-            return "-I"
-        return ""
+    # Programmer monitor
+    
+    def start_programmer_monitor(self):
+        """(Re)start watching USB for the programmer under the configured sysfs root"""
+        if self.programmer_monitor:
+            self.programmer_monitor.stop()
+        # MINIPRO_SYSFS_ROOT lets the replay stand-in's fake tree take the place of /sys
+        root = os.environ.get("MINIPRO_SYSFS_ROOT") or self.sysfs_root.text().strip() or "/sys"
+        self.programmer_monitor = ProgrammerMonitor(self.backend.binary, root)
+        self.programmer_monitor.can_probe = lambda: not self.job_running()
+        self.programmer_monitor.changed.connect(self.programmer_changed)
+        mode = self.programmer_monitor.start()
+        if self.debug_mode.isChecked():
+            self.log_console(f"[MONITOR] Watching {root} ({mode})", color="#9c27b0")
+            
+    def programmer_changed(self, state):
+        """Keep the status bar indicator current and log plugging and unplugging"""
+        previous, self.programmer_state = self.programmer_state, state
+        if not state["known"]:
+            text, color, tip = "Programmer: unknown", "#9e9e9e", "No sysfs here; the programmer is not monitored"
+        elif not state["connected"]:
+            text, color, tip = "● No programmer", "#f44336", "Connect a supported programmer over USB"
+        elif state["probing"]:
+            text, color, tip = f"● {state['usb_model']} (probing...)", "#ff9800", ""
+        elif state["model"]:
+            text, color = f"● {state['model']} {state['firmware']}", "#4caf50"
+            tip = f"Serial {state['serial']}" if state["serial"] else ""
+        else:
+            text, color, tip = f"● {state['usb_model']}", "#ff9800", f"minipro -k failed: {state['error']}"
+        if state["count"] > 1:
+            text += f" (+{state['count'] - 1})"
+        self.programmer_status.setText(text)
+        self.programmer_status.setStyleSheet(f"color: {color};")
+        self.programmer_status.setToolTip(tip)
+        
+        if previous and previous["connected"] and not state["connected"]:
+            self.log_console("✗ Programmer disconnected", color="#ff9800")
+        elif state["model"] and not (previous and previous["model"]):
+            self.log_console(f"✓ Programmer connected: {state['model']} firmware {state['firmware']}",
+                             color="#4caf50")
+            
+    def programmer_ready(self, command):
+        """Check the cached USB state, without starting minipro, before an operation"""
+        monitor = self.programmer_monitor
+        if not monitor or not self.require_programmer.isChecked():
+            return True
+        if operation_name(command) in PROGRAMMER_FREE_OPERATIONS:
+            return True
+        state = monitor.state()
+        if state["known"] and not state["connected"]:
+            # An event may still be settling; sysfs is cheap to look at (the -k
+            # probe waits, as the command about to start needs the programmer)
+            monitor.scan(probe=False)
+            state = monitor.state()
+        if not state["known"] or state["connected"]:
+            return True
+        if os.path.abspath(self.backend.binary) == REPLAY_SCRIPT and monitor.sysfs_root == "/sys":
+            # The stand-in needs no hardware unless it is given a fake sysfs tree
+            return True
+        self.log_console("✗ No programmer connected; command not started\n", color="#f44336")
+        QMessageBox.warning(self, "Programmer Not Found",
+                            "No supported programmer is connected.\n\n"
+                            "Plug in the programmer, or turn off 'Check programmer before operations' "
+                            "on the Device Info tab.")
+        return False
         
     # Command methods
     
@@ -982,68 +7341,68 @@ class MiniProGUI(QMainWindow):
                                      "This may take a few moments.\n\nContinue?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            self.device_combo.clear()
-            self.device_combo.addItem("Loading devices...")
-            self.device_combo.setEnabled(False)
+            self.start_device_list_load()
             
-            # Run in thread to parse output
-            class DeviceListThread(QThread):
-                devices_loaded = pyqtSignal(list)
-                
-                def run(self):
-                    try:
-                        result = subprocess.run(
-                            ["minipro", "-l"],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        
-                        devices = []
-                        in_device_list = False
-                        
-                        for line in result.stdout.split('\n'):
-                            line = line.strip()
-                            
-                            # Skip header lines and empty lines
-                            if not line or line.startswith('-') or line.startswith('Device'):
-                                continue
-                            
-                            # Start capturing after we see device listings
-                            if any(keyword in line.lower() for keyword in ['supported', 'device', 'name']):
-                                in_device_list = True
-                                continue
-                            
-                            # Extract device name (first column/word)
-                            # Device names can have @ for package or be standalone
-                            parts = line.split()
-                            if parts:
-                                device_name = parts[0]
-                                # Filter out obvious non-device lines
-                                if (device_name and 
-                                    not device_name.startswith('#') and
-                                    not device_name.lower() in ['note:', 'warning:', 'error:', 'found', 'total']):
-                                    devices.append(device_name)
-                        
-                        # Remove duplicates and sort
-                        devices = sorted(list(set(devices)))
-                        self.devices_loaded.emit(devices)
-                    except Exception as e:
-                        self.devices_loaded.emit([])
-            
-            self.device_thread = DeviceListThread()
-            self.device_thread.devices_loaded.connect(self.populate_device_list)
-            self.device_thread.start()
-            
-    def populate_device_list(self, devices):
-        """Populate the dropdown with device list"""
+    def start_device_list_load(self):
+        """Start loading the full device list in the background"""
+        if self.device_thread:
+            return
+        # The list stays searchable while it fills; the typed text is kept
+        text = self.device_combo.currentText()
+        self.device_combo.blockSignals(True)
         self.device_combo.clear()
-        self.device_combo.setEnabled(True)
-        
-        if devices:
-            self.device_combo.addItems(sorted(devices))
-            self.statusBar().showMessage(f"Loaded {len(devices)} devices", 3000)
-            self.log_console(f"✓ Loaded {len(devices)} devices into dropdown\n", color="#4caf50")
+        self.device_combo.setEditText(text)
+        self.device_combo.blockSignals(False)
+        self.device_list_started = time.perf_counter()
+        self.statusBar().showMessage("Loading devices...")
+        
+        thread = self.device_thread = DeviceListThread(self.backend.binary)
+        thread.devices_found.connect(self.add_device_batch)
+        thread.devices_loaded.connect(self.populate_device_list)
+        thread.finished.connect(lambda: self.device_list_thread_done(thread))
+        thread.start()
+        
+    def device_list_thread_done(self, thread):
+        """Release a device list thread once it has returned"""
+        if thread is self.device_thread:
+            self.device_thread = None
+        thread.deleteLater()
+        
+    def start_device_info(self, devices, callback):
+        """Look devices up in the device database, then call back with {device: info}"""
+        thread = self.device_info_thread = DeviceInfoThread(self.device_db, devices)
+        thread.info_ready.connect(callback)
+        thread.finished.connect(lambda: self.device_info_thread_done(thread))
+        thread.start()
+        
+    def device_info_thread_done(self, thread):
+        """Release a device lookup thread once it has returned"""
+        if thread is self.device_info_thread:
+            self.device_info_thread = None
+        thread.deleteLater()
+            
+    def add_device_batch(self, devices):
+        """Append a batch of streamed device names without changing the selection"""
+        combo = self.device_combo
+        text = combo.currentText()
+        combo.blockSignals(True)
+        combo.addItems(devices)
+        combo.setEditText(text)
+        combo.blockSignals(False)
+        self.statusBar().showMessage(f"Loading devices... {combo.count()} so far")
+        
+    def populate_device_list(self, count):
+        """Finish the streamed device list: sort it once all names are in"""
+        if count:
+            combo = self.device_combo
+            text = combo.currentText()
+            combo.blockSignals(True)
+            combo.model().sort(0)
+            combo.setEditText(text)
+            combo.blockSignals(False)
+            elapsed = time.perf_counter() - self.device_list_started
+            self.statusBar().showMessage(f"Loaded {count} devices", 3000)
+            self.log_console(f"✓ Loaded {count} devices into dropdown ({elapsed:.2f}s)\n", color="#4caf50")
         else:
             QMessageBox.warning(self, "Load Failed", 
                               "Failed to load device list. Make sure minipro is installed.")
@@ -1099,7 +7458,10 @@ class MiniProGUI(QMainWindow):
         skip_id = "-x" if self.skip_id_check.isChecked() else ""
         
         command = f'{device_arg} -r "{output_file}" {mem_arg} {format_arg} {skip_id}'.strip()
-        self.run_command(command)
+        if self.post_read_enabled.isChecked():
+            self.run_command(command, on_finished=lambda code: code == 0 and self.start_post_read(output_file))
+        else:
+            self.run_command(command)
         
     def write_device(self):
         """Write to device"""
@@ -1117,6 +7479,81 @@ class MiniProGUI(QMainWindow):
             QMessageBox.warning(self, "File Not Found", f"File not found: {input_file}")
             return
             
+        reply = QMessageBox.question(self, "Write Device",
+                                     f"Write {input_file} to device?\n\n"
+                                     "This will modify the device contents.\n\nContinue?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+            
+        self.write_image(input_file)
+        
+    def write_image(self, input_file, on_done=None):
+        """Prepare and write an image, backing the device up first if enabled
+        
+        on_done, if given, is called with the write's return code.
+        """
+        if self.backup_before_write.isChecked():
+            job = {"on_done": on_done}
+            if not self.start_backup(lambda ok: self.write_after_backup(ok, job)):
+                if on_done:
+                    on_done(-1)
+                return
+            # Prepare the image while minipro is busy reading the backup
+            job["prepared"] = self.prepare_write_image(input_file, on_done)
+        else:
+            prepared = self.prepare_write_image(input_file, on_done)
+            if prepared:
+                self.run_prepared_write(prepared)
+            elif on_done:
+                on_done(-1)
+                
+    def prepare_write_image(self, input_file, on_done=None):
+        """Return (image path, completion callback), or None if preparation failed"""
+        input_file = self.expand_input(input_file)
+        if not input_file or not self.check_jedec_file(input_file):
+            return None
+        if self.serialize_enabled.isChecked():
+            prepared = self.serialize_image(input_file)
+        else:
+            prepared = input_file, None
+        if not prepared or not on_done:
+            return prepared
+            
+        image, finished = prepared
+        
+        def done(returncode):
+            if finished:
+                finished(returncode)
+            on_done(returncode)
+            
+        return image, done
+        
+    def run_prepared_write(self, prepared):
+        """Write an image returned by prepare_write_image"""
+        image, finished = prepared
+        if not self.run_command(self.get_write_command(image), on_finished=finished) and finished:
+            finished(-1)
+            
+    def write_after_backup(self, ok, job):
+        """Continue with the write once the backup is safely stored"""
+        prepared = job.get("prepared")
+        if not prepared:
+            if job.get("on_done"):
+                job["on_done"](-1)
+            return
+        if not ok:
+            self.log_console("✗ Backup failed; write cancelled\n", color="#f44336")
+            image, finished = prepared
+            if finished:
+                finished(-1)
+            return
+        self.run_prepared_write(prepared)
+        
+
+    def get_write_command(self, input_file):
+        """Build the minipro arguments writing a file with the current options"""
+        device_arg = self.get_device_arg()
         mem_arg = self.get_memory_arg()
         voltage_args = self.get_voltage_args()
         protection_args = self.get_protection_args()
@@ -1127,16 +7564,9 @@ class MiniProGUI(QMainWindow):
         no_id_error = "-y" if self.no_id_error.isChecked() else ""
         no_size_error = "-s" if self.no_size_error.isChecked() else ""
         
-        command = (f'{device_arg} -w "{input_file}" {mem_arg} {voltage_args} '
-                  f'{protection_args} {icsp_args} {skip_erase} {skip_verify} '
-                  f'{no_id_error} {no_size_error}').strip()
-        
-        reply = QMessageBox.question(self, "Write Device",
-                                     f"Write {input_file} to device?\n\n"
-                                     "This will modify the device contents.\n\nContinue?",
-                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        if reply == QMessageBox.StandardButton.Yes:
-            self.run_command(command)
+        return (f'{device_arg} -w {shlex.quote(input_file)} {mem_arg} {voltage_args} '
+                f'{protection_args} {icsp_args} {skip_erase} {skip_verify} '
+                f'{no_id_error} {no_size_error}').strip()
             
     def verify_device(self):
         """Verify device contents"""
@@ -1154,10 +7584,332 @@ class MiniProGUI(QMainWindow):
             QMessageBox.warning(self, "File Not Found", f"File not found: {input_file}")
             return
             
+        input_file = self.expand_input(input_file)
+        if not input_file or not self.check_jedec_file(input_file):
+            return
+            
         mem_arg = self.get_memory_arg()
         command = f'{device_arg} -m "{input_file}" {mem_arg}'.strip()
         self.run_command(command)
         
+    def expand_input(self, input_file):
+        """Plain path minipro can open for a possibly compressed or zipped image, or None"""
+        if not self.expanded_images.is_packed(input_file):
+            return input_file
+        started = time.perf_counter()
+        try:
+            expanded = self.expanded_images.expand(input_file)
+        except DECOMPRESS_ERRORS as e:
+            QMessageBox.warning(self, "Image Error", f"Could not decompress {input_file}: {e}")
+            return None
+        self.log_console(f"Using {os.path.basename(expanded)} expanded from {os.path.basename(input_file)} "
+                         f"({time.perf_counter() - started:.2f}s)", color="#4fc3f7")
+        return expanded
+        
+    # Config (fuse) words
+    
+    def expected_config(self):
+        """(profile label, expected config words) of the selected profile, or (label, None)"""
+        label = self.profile_combo.currentText()
+        profile = self.profile_store.get(self.device_combo.currentText().strip(), label)
+        return label, (profile["settings"].get("config") if profile else None)
+        
+    def show_config_words(self, device, words):
+        """Decode config words into the field table"""
+        self.config_device = device
+        self.config_words = dict(words)
+        definition = self.config_defs.for_device(device)
+        for problem in self.config_defs.problems:
+            self.log_console(f"✗ Config definitions: {problem}", color="#f44336")
+        self.config_defs.problems = []
+        self.config_rows = decode_config(definition, self.config_words)
+        
+        self.config_table.setRowCount(0)
+        self.config_table.setRowCount(len(self.config_rows))
+        fields = {field["name"]: field for field in definition["fields"]} if definition else {}
+        for row, entry in enumerate(self.config_rows):
+            self.config_table.setItem(row, 0, QTableWidgetItem(entry["word"]))
+            self.config_table.setItem(row, 1, QTableWidgetItem(entry["field"]))
+            width = bin(entry["mask"]).count("1")
+            values = fields.get(entry["field"], {}).get("values", {})
+            if width <= 4:
+                editor = QComboBox()
+                for value in range(1 << width):
+                    editor.addItem(f"{value:#x}" + (f" {values[value]}" if value in values else ""), value)
+                editor.setCurrentIndex(entry["value"])
+                editor.currentIndexChanged.connect(lambda value, row=row: self.config_field_edited(row, value))
+            else:
+                editor = QSpinBox()
+                editor.setDisplayIntegerBase(16)
+                editor.setPrefix("0x")
+                editor.setRange(0, min((1 << width) - 1, 2**31 - 1))
+                editor.setValue(entry["value"])
+                editor.valueChanged.connect(lambda value, row=row: self.config_field_edited(row, value))
+            self.config_table.setCellWidget(row, 2, editor)
+            self.config_table.setItem(row, 3, QTableWidgetItem())
+        self.config_table.resizeColumnsToContents()
+        self.update_config_status()
+        if not definition:
+            self.config_status.setText(f"No field definitions for {device}; words are shown whole. "
+                                       + self.config_status.text())
+            
+    def config_field_edited(self, row, value):
+        """Re-encode the word holding an edited field and refresh the feedback"""
+        entry = self.config_rows[row]
+        self.config_words[entry["word"]] = deposit_bits(self.config_words[entry["word"]], entry["mask"], value)
+        definition = self.config_defs.for_device(self.config_device)
+        self.config_rows = decode_config(definition, self.config_words)
+        self.update_config_status()
+        
+    def update_config_status(self):
+        """Meanings, dangerous values and differences from the selected profile"""
+        if not self.config_rows:
+            return
+        label, expected = self.expected_config()
+        definition = self.config_defs.for_device(self.config_device)
+        expected_rows = {entry["field"]: entry for entry in decode_config(definition, expected or {})}
+        for row, entry in enumerate(self.config_rows):
+            item = self.config_table.item(row, 3)
+            if item is None:
+                continue
+            want = expected_rows.get(entry["field"])
+            differs = want is not None and want["value"] != entry["value"]
+            item.setText(f"⚠ {entry['danger']}" if entry["danger"] else entry["meaning"])
+            color = "#f44336" if entry["danger"] else "#ff9800" if differs else None
+            for column in (0, 1, 3):
+                cell = self.config_table.item(row, column)
+                cell.setForeground(QColor(color) if color else self.config_table.palette().text().color())
+            item.setToolTip(f"Profile expects {want['value']:#x} {want['meaning']}" if differs else "")
+        self.config_words_label.setText("  ".join(f"{name}=0x{value:02X}"
+                                                  for name, value in self.config_words.items()))
+        
+        dangers = [f"{entry['field']}: {entry['danger']}" for entry in self.config_rows if entry["danger"]]
+        if expected:
+            differences = config_differences(definition, self.config_words, expected)
+            summary = (f"✓ Matches profile '{label}'" if not differences else
+                       f"✗ {len(differences)} field(s) differ from profile '{label}'")
+        else:
+            summary = "No expected config in the selected profile (save a profile to record one)"
+        self.config_status.setText(summary + ("\n⚠ " + "\n⚠ ".join(dangers) if dangers else ""))
+        
+    def config_file_words(self, path, device):
+        """Config words parsed from a file, or None after telling the user why not"""
+        try:
+            with open(path, "rb") as f:
+                return parse_config_words(f.read(), self.config_defs.for_device(device))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Config Error", f"Cannot read {path}:\n{e}")
+            return None
+            
+    def read_config_words(self):
+        """Read the chip's config memory and decode it"""
+        device_arg = self.get_device_arg()
+        if not device_arg:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        device = self.device_combo.currentText().strip()
+        fd, path = tempfile.mkstemp(suffix=".conf")
+        os.close(fd)
+        
+        def decode(returncode):
+            try:
+                if returncode == 0:
+                    words = self.config_file_words(path, device)
+                    if words:
+                        self.show_config_words(device, words)
+                        label, expected = self.expected_config()
+                        for difference in config_differences(self.config_defs.for_device(device), words,
+                                                             expected or {}):
+                            self.log_console(f"✗ Config differs from '{label}': {difference}", color="#f44336")
+            finally:
+                os.unlink(path)
+                
+        if not self.run_command(f'{device_arg} -c config -r "{path}"', on_finished=decode):
+            os.unlink(path)
+            
+    def load_config_file(self):
+        """Decode a config file"""
+        device = self.device_combo.currentText().strip()
+        if not device:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        filename, _ = QFileDialog.getOpenFileName(self, "Config File", "",
+                                                  "Config files (*.conf *.cfg *.txt *.bin);;All Files (*)")
+        if filename:
+            words = self.config_file_words(filename, device)
+            if words:
+                self.show_config_words(device, words)
+                
+    def save_config_file(self):
+        """Write the edited words as a minipro config file"""
+        if not self.config_words:
+            QMessageBox.warning(self, "Config Required", "Read, load or reset the config words first.")
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Config File", "", "Config files (*.conf);;All Files (*)")
+        if filename:
+            try:
+                atomic_write(filename, format_config_words(self.config_words).encode())
+            except OSError as e:
+                QMessageBox.warning(self, "Config Error", f"Cannot write {filename}:\n{e}")
+                
+    def default_config_words(self):
+        """Start from the factory defaults of the selected device"""
+        device = self.device_combo.currentText().strip()
+        definition = self.config_defs.for_device(device)
+        if not definition:
+            QMessageBox.warning(self, "Config", f"No config word definitions for {device or 'this device'}.")
+            return
+        self.show_config_words(device, {name: default for name, _, default in definition["words"]})
+        
+    def write_config_words(self):
+        """Program the edited config words after checking them against the profile"""
+        device_arg = self.get_device_arg()
+        if not device_arg:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        device = self.device_combo.currentText().strip()
+        if not self.config_words or self.config_device != device:
+            QMessageBox.warning(self, "Config Required",
+                                f"Read, load or reset the config words of {device} first.")
+            return
+            
+        label, expected = self.expected_config()
+        warnings = [f"⚠ {entry['field']}: {entry['danger']}" for entry in self.config_rows if entry["danger"]]
+        if expected:
+            warnings += config_differences(self.config_defs.for_device(device), self.config_words, expected)
+        words = "  ".join(f"{name}=0x{value:02X}" for name, value in self.config_words.items())
+        message = f"Write config words to {device}?\n\n{words}"
+        if warnings:
+            heading = f"Differs from profile '{label}' or is risky" if expected else "Risky values"
+            message += f"\n\n{heading}:\n" + "\n".join(warnings)
+        reply = QMessageBox.question(self, "Write Config", message + "\n\nContinue?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+            
+        fd, path = tempfile.mkstemp(suffix=".conf")
+        with os.fdopen(fd, "w") as f:
+            f.write(format_config_words(self.config_words))
+        if not self.run_command(f'{device_arg} -c config -w "{path}"',
+                                on_finished=lambda returncode: os.unlink(path)):
+            os.unlink(path)
+            
+    # JEDEC fuse maps
+    
+    def read_jedec(self, path):
+        """Parsed JEDEC file, or None after telling the user why it cannot be read"""
+        try:
+            with open(path, "rb") as f:
+                return parse_jedec(f.read())
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "JEDEC Error", f"Cannot read {path}:\n{e}")
+            return None
+            
+    def check_jedec_file(self, path):
+        """Reject a damaged or mismatched .jed before minipro starts writing it"""
+        if not path.lower().endswith(".jed"):
+            return True
+        jed = self.read_jedec(path)
+        if not jed:
+            return False
+        problems = jedec_problems(jed, self.device_combo.currentText().strip())
+        if problems:
+            QMessageBox.warning(self, "JEDEC Error",
+                                f"{os.path.basename(path)} was not written:\n\n" + "\n".join(problems))
+            return False
+        self.log_console(f"✓ {os.path.basename(path)}: {jed['fuse_count']} fuses, "
+                         f"checksum {jed['checksum'][1]:04X}", color="#4caf50")
+        return True
+        
+    def load_jedec(self):
+        """Show a JEDEC file's fuse map and checksum status"""
+        path = self.jedec_file.text().strip()
+        if not path:
+            QMessageBox.warning(self, "File Required", "Please specify a JEDEC file.")
+            return
+        jed = self.read_jedec(path)
+        if not jed:
+            return
+        self.jedec = jed
+        device = self.device_combo.currentText().strip()
+        declared, computed = jed["checksum"]
+        lines = [f"{jed['device'] or 'Unknown device'}: {jed['fuse_count']} fuses"
+                 + (f", {jed['pins']} pins" if jed["pins"] else "")
+                 + (", security fuse set" if jed["security"] else ""),
+                 f"Fuse checksum {computed:04X}"
+                 + (" (not in file)" if declared is None else " ✓" if declared == computed else " ✗")]
+        if jed["transmission"][0] is not None:
+            lines[-1] += ", transmission checksum " + ("✓" if len(set(jed["transmission"])) == 1 else "✗")
+        problems = jedec_problems(jed, device)
+        lines.extend(f"✗ {problem}" for problem in problems)
+        self.jedec_info.setText("\n".join(lines))
+        self.jedec_info.setStyleSheet("color: #f44336;" if problems else "")
+        self.jedec_diff.setText("")
+        self.fuse_map.set_fuses(jed["fuses"], self.jedec_row_width(jed))
+        
+    def jedec_row_width(self, jed):
+        """Fuses per grid row: one product term for known GALs"""
+        for fuse_count, row_width in GAL_LAYOUTS.values():
+            if fuse_count == jed["fuse_count"]:
+                return row_width
+        return 32
+        
+    def show_fuse_diff(self, other, source):
+        """Mark the fuses of the loaded map that differ from another map"""
+        differing = diff_fuse_maps(self.jedec["fuses"], other["fuses"])
+        self.fuse_map.set_fuses(self.jedec["fuses"], self.jedec_row_width(self.jedec), differing)
+        if not differing:
+            self.jedec_diff.setText(f"✓ Identical to {source}")
+            self.jedec_diff.setStyleSheet("color: #4caf50;")
+            return
+        row_width = self.jedec_row_width(self.jedec)
+        rows = sorted({index // row_width for index in differing})
+        self.jedec_diff.setText(f"✗ {len(differing)} fuse(s) differ from {source}, in {len(rows)} row(s): "
+                                + ", ".join(map(str, rows[:12])) + ("..." if len(rows) > 12 else ""))
+        self.jedec_diff.setStyleSheet("color: #f44336;")
+        
+    def compare_jedec_file(self):
+        """Diff the loaded fuse map against another JEDEC file"""
+        if not self.jedec:
+            self.load_jedec()
+            if not self.jedec:
+                return
+        path = self.jedec_compare_file.text().strip()
+        if not path:
+            QMessageBox.warning(self, "File Required", "Please specify a JEDEC file to compare with.")
+            return
+        other = self.read_jedec(path)
+        if other:
+            self.show_fuse_diff(other, os.path.basename(path))
+            
+    def compare_jedec_chip(self):
+        """Read the device's fuses back and diff them against the loaded map"""
+        device_arg = self.get_device_arg()
+        if not device_arg:
+            QMessageBox.warning(self, "Device Required", "Please enter a device name.")
+            return
+        if not self.jedec:
+            self.load_jedec()
+            if not self.jedec:
+                return
+        fd, path = tempfile.mkstemp(suffix=".jed")
+        os.close(fd)
+        
+        def compare(returncode):
+            try:
+                if returncode == 0:
+                    other = self.read_jedec(path)
+                    if other:
+                        self.show_fuse_diff(other, "the chip")
+                        if self.jedec["security"]:
+                            self.jedec_diff.setText(self.jedec_diff.text() +
+                                                    " (security fuse set: a programmed chip reads back blank)")
+            finally:
+                os.unlink(path)
+                
+        if not self.run_command(f'{device_arg} -r "{path}"', on_finished=compare):
+            os.unlink(path)
+            
     def erase_device(self):
         """Erase device"""
         device_arg = self.get_device_arg()
@@ -1202,11 +7954,14 @@ class MiniProGUI(QMainWindow):
             QMessageBox.warning(self, "Device Required", "Please enter a device name.")
             return
             
-        vcc_arg = ""
+        self.count_logic_use(self.device_combo.currentText().strip())
+        self.run_command(f"{device_arg} -T {self.get_vcc_arg()}".strip())
+        
+    def get_vcc_arg(self):
+        """VCC override for logic tests"""
         if self.vcc_voltage.currentText() != "Default":
-            vcc_arg = f"--vcc {self.vcc_voltage.currentText()}"
-            
-        self.run_command(f"{device_arg} -T {vcc_arg}".strip())
+            return f"--vcc {self.vcc_voltage.currentText()}"
+        return ""
         
     def auto_detect(self):
         """Auto-detect SPI device"""
@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+MiniPro record/replay harness
+A stand-in for the minipro binary so the GUI can be exercised without a T48
+
+Usage:
+    minipro_replay.py record --out DIR -- minipro -p DEVICE -r dump.bin
+        Run the real minipro, pass its output through unchanged and save
+        the stdout/stderr bytes with timing to DIR.
+
+    minipro_replay.py -p DEVICE -r dump.bin
+        Act as minipro: replay the newest recording for the operation found
+        in $MINIPRO_REPLAY_DIR, or a synthetic session if none is recorded.
+
+    minipro_replay.py sysfs DIR [--unplug]
+        Plug a fake T48 into (or unplug it from) a sysfs tree under DIR, for
+        the GUI's programmer monitor started with MINIPRO_SYSFS_ROOT=DIR.
+
+    minipro_replay.py bench [--scenarios read,write,verify,list]
+        Drive the GUI against the replay stand-in and report output-to-screen
+        latency, event loop stalls and memory for each scenario.
+
+    minipro_replay.py soak [--count 10000] [--stand-in shell|replay]
+        Run thousands of short commands through the GUI and check that
+        memory, threads and open file descriptors stay flat; exits 1 if not.
+
+Environment (replay mode):
+    MINIPRO_REPLAY_DIR    directory holding recordings (*.json)
+    MINIPRO_REPLAY_SPEED  time scale, 1.0 = recorded speed, 0 = no delays
+    MINIPRO_REPLAY_TRACE  file to append per-line emit timestamps to
+    MINIPRO_REPLAY_FAULTS inject failures, e.g. "write:verify_error:1,pin:pin_contact"
+                          (scenario:class[:count]); classes are verify_error,
+                          id_mismatch, pin_contact, overcurrent and usb, plus
+                          stuck_pin and dead for logic tests
+    MINIPRO_REPLAY_FAULT_STATE  file counting injected faults, so a count of N
+                          fails only the first N runs (without it every run fails)
+    MINIPRO_REPLAY_MEMORY directory emulating chip contents: writes store the
+                          image (or -c config words) per device and reads return
+                          it (blank, or default fuses, otherwise)
+    MINIPRO_REPLAY_LOGIC_PART  part(s) in the socket for logic tests, comma
+                          separated; testing any other part fails every output
+
+@author: Oscar Yanez-Suarez 2026
+"""
+
+import sys
+import os
+import json
+import time
+import glob
+import select
+import argparse
+import subprocess
+
+
+# Operation flag -> scenario name, checked in order
+SCENARIO_FLAGS = [
+    ("-l", "list"), ("-r", "read"), ("-w", "write"), ("-m", "verify"),
+    ("-E", "erase"), ("-b", "blank"), ("-T", "logic"), ("-z", "pin"),
+    ("-D", "id"), ("-k", "detect"), ("-d", "info"),
+]
+
+STREAM_FDS = {"stdout": 1, "stderr": 2}
+
+# Config words read from a chip that was never written (ATmega328P defaults)
+REPLAY_CONFIG = b"fuses_lo = 0x62\nfuses_hi = 0xd9\nfuses_ext = 0xff\nlock_byte = 0xff\n"
+
+
+def scenario_for_args(args):
+    """Map minipro arguments to a scenario name"""
+    for flag, name in SCENARIO_FLAGS:
+        if flag in args:
+            return name
+    return "other"
+
+
+def option_value(args, flag):
+    """Return the value following a flag in an argument list"""
+    if flag in args:
+        index = args.index(flag)
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+# Recording
+
+def record(command, out_dir):
+    """Run command, mirror its output and save a timed recording"""
+    start = time.monotonic()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    streams = {process.stdout.fileno(): "stdout", process.stderr.fileno(): "stderr"}
+    events = []
+
+    open_fds = list(streams)
+    while open_fds:
+        readable, _, _ = select.select(open_fds, [], [], 0.1)
+        for fd in readable:
+            data = os.read(fd, 4096)
+            if not data:
+                open_fds.remove(fd)
+                continue
+            name = streams[fd]
+            os.write(STREAM_FDS[name], data)
+            # latin-1 maps every byte to one code point, so JSON round-trips
+            events.append([round(time.monotonic() - start, 6), name, data.decode("latin-1")])
+
+    returncode = process.wait()
+    args = command[1:]
+    recording = {
+        "argv": args,
+        "scenario": scenario_for_args(args),
+        "returncode": returncode,
+        "duration": round(time.monotonic() - start, 6),
+        "events": events,
+    }
+
+    # Remember the dump size so replayed reads produce a file of the same size
+    output_file = option_value(args, "-r")
+    if output_file and os.path.exists(output_file):
+        recording["output_size"] = os.path.getsize(output_file)
+
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(out_dir, f"{recording['scenario']}-{stamp}-{os.getpid()}.json")
+    with open(path, "w") as f:
+        json.dump(recording, f)
+    return returncode
+
+
+# Replay
+
+def synthetic_recording(args):
+    """Build a plausible session for when nothing has been recorded"""
+    scenario = scenario_for_args(args)
+    events = []
+    t = 0.0
+
+    def emit(stream, text, delay=0.0):
+        nonlocal t
+        t += delay
+        events.append([round(t, 6), stream, text])
+
+    def phase(label, seconds, result="OK"):
+        for percent in range(0, 101, 5):
+            emit("stderr", f"\r\x1b[K{label}... {percent:2d}%", seconds / 21)
+        emit("stderr", f"\r\x1b[K{label}... {seconds:.2f}Sec  {result}\n")
+
+    if scenario == "list":
+        for i in range(13000):
+            emit("stdout", f"DEV{i:05d}@DIP28\n", 0.00002)
+    elif scenario == "info":
+        device = option_value(args, "-d") or "ATMEGA328P@DIP28"
+        emit("stderr", f"Name: {device}\nAvailable on: TL866A/CS, TL866II+, T48, T56\n", 0.03)
+        emit("stderr", "Memory: 16384 Words + 1024 Bytes\nPackage: DIP28\nProtocol: 0x71\n")
+    elif scenario == "detect":
+        emit("stdout", "Found T48 01.1.31 (0x11f)\n", 0.05)
+        emit("stdout", "Device code: 46A16257\nSerial code: HSSCVO9LARFMOYKYOMVE5123\n")
+    else:
+        emit("stderr", "Found T48 01.1.31 (0x11f)\n", 0.05)
+        if scenario not in ("logic", "pin"):
+            emit("stderr", "Chip ID: 0x1E95  OK\n", 0.02)
+        if scenario == "read":
+            phase("Reading Code", 1.0)
+        elif scenario == "write":
+            phase("Erasing", 0.2)
+            phase("Writing Code", 1.5)
+            phase("Reading Code", 1.0)
+            emit("stderr", "Verification OK\n")
+        elif scenario == "verify":
+            phase("Reading Code", 1.0)
+            emit("stderr", "Verification OK\n")
+        elif scenario == "erase":
+            phase("Erasing", 0.3)
+        elif scenario == "pin":
+            emit("stderr", "Pin test passed.\n", 0.1)
+        elif scenario == "logic":
+            for text in logic_test_output():
+                emit("stdout", text, 0.005)
+
+    return {
+        "argv": args,
+        "scenario": scenario,
+        "returncode": 0,
+        "duration": t,
+        "events": events,
+        "output_size": 32768,
+    }
+
+
+def logic_test_output(fault=None):
+    """7400 quad NAND test vectors in minipro's -T layout
+    
+    fault "stuck_pin" holds pin 3 high; "dead" fails every output.
+    Failing pins are marked with a trailing '-'.
+    """
+    outputs = (3, 6, 8, 11)
+    inputs = {3: (1, 2), 6: (4, 5), 8: (9, 10), 11: (12, 13)}
+    lines = ["      " + " ".join(f"{pin:>2}" for pin in range(1, 15)) + "\n"]
+    errors = 0
+    for index, (a, b) in enumerate([(0, 0), (0, 1), (1, 0), (1, 1)]):
+        states = {7: "G", 14: "V"}
+        for out in outputs:
+            first, second = inputs[out]
+            states[first], states[second] = str(a), str(b)
+            expected = "L" if a and b else "H"
+            failed = fault == "dead" or (fault == "stuck_pin" and out == 3 and expected == "L")
+            errors += failed
+            states[out] = expected + ("-" if failed else "")
+        lines.append(f"{index:04d}: " + " ".join(f"{states[pin]:>2}" for pin in range(1, 15)) + "\n")
+    lines.append(f"Logic test failed: {errors} errors.\n" if errors else "Logic test successful.\n")
+    return lines
+
+
+# Failure class -> (phases to keep before failing, message)
+FAULTS = {
+    "verify_error": ("Reading", "Verification failed at address 0x0010: File=0x12, Device=0xFF\n"),
+    "id_mismatch": ("Found", "Invalid Chip ID: expected 0x1E95, got 0x0000 (unknown)\n"),
+    "pin_contact": ("Found", "Bad contact on pin:12\nBad contact on pin:13\n"),
+    "overcurrent": ("Erasing", "Overcurrent protection!\n"),
+    "usb": ("Found", "IO error: bulk_transfer: LIBUSB_ERROR_PIPE\n"),
+}
+
+
+def inject_fault(recording):
+    """Turn a recording into a failure if MINIPRO_REPLAY_FAULTS asks for one"""
+    spec = os.environ.get("MINIPRO_REPLAY_FAULTS", "")
+    for item in filter(None, spec.split(",")):
+        scenario, fault, *count = item.split(":")
+        if scenario != recording["scenario"] or fault not in FAULTS and fault not in ("stuck_pin", "dead"):
+            continue
+        state_path = os.environ.get("MINIPRO_REPLAY_FAULT_STATE")
+        if state_path and count:
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            if state.get(item, 0) >= int(count[0]):
+                continue
+            state[item] = state.get(item, 0) + 1
+            with open(state_path, "w") as f:
+                json.dump(state, f)
+
+        if recording["scenario"] == "logic":
+            events = [[i * 0.005, "stdout", text] for i, text in enumerate(logic_test_output(fault))]
+            return dict(recording, events=events, returncode=1, duration=events[-1][0])
+            
+        # Keep events up to and including the last one mentioning the failing phase
+        keep_until, message = FAULTS[fault]
+        events = recording["events"]
+        last = max((i for i, event in enumerate(events) if keep_until in event[2]), default=-1)
+        if fault == "verify_error":
+            events = [e for e in events if "Verification OK" not in e[2]]
+        else:
+            events = events[:last + 1]
+        t = events[-1][0] if events else 0.0
+        events = events + [[t + 0.01, "stderr", message]]
+        return dict(recording, events=events, returncode=1, duration=t + 0.01)
+    return recording
+
+
+def find_recording(args):
+    """Return the newest recording matching the requested operation"""
+    replay_dir = os.environ.get("MINIPRO_REPLAY_DIR")
+    if replay_dir:
+        scenario = scenario_for_args(args)
+        paths = glob.glob(os.path.join(replay_dir, f"{scenario}-*.json"))
+        if paths:
+            with open(max(paths, key=os.path.getmtime)) as f:
+                return json.load(f)
+    return synthetic_recording(args)
+
+
+def replay(args):
+    """Play a recording back as if minipro were running"""
+    recording = inject_fault(find_recording(args))
+    socket_parts = os.environ.get("MINIPRO_REPLAY_LOGIC_PART")
+    if recording["scenario"] == "logic" and socket_parts and \
+            option_value(args, "-p") not in socket_parts.split(","):
+        events = [[i * 0.005, "stdout", text] for i, text in enumerate(logic_test_output("dead"))]
+        recording = dict(recording, events=events, returncode=1, duration=events[-1][0])
+    speed = float(os.environ.get("MINIPRO_REPLAY_SPEED", "1.0"))
+    trace_path = os.environ.get("MINIPRO_REPLAY_TRACE")
+    trace = []
+    partial = {"stdout": "", "stderr": ""}
+
+    # Reads leave a dump behind, just like the real tool
+    memory_dir = os.environ.get("MINIPRO_REPLAY_MEMORY")
+    config = option_value(args, "-c") == "config"
+    chip = memory_dir and os.path.join(memory_dir, (option_value(args, "-p") or "chip").replace("/", "_")
+                                       + (".conf" if config else ".bin"))
+    output_file = option_value(args, "-r")
+    if output_file:
+        contents = REPLAY_CONFIG if config else b"\xff" * recording.get("output_size", 0)
+        if chip and os.path.exists(chip):
+            with open(chip, "rb") as f:
+                contents = f.read()
+        with open(output_file, "wb") as f:
+            f.write(contents)
+    input_file = option_value(args, "-w")
+    if chip and input_file and recording.get("returncode", 0) == 0:
+        os.makedirs(memory_dir, exist_ok=True)
+        with open(input_file, "rb") as source, open(chip, "wb") as f:
+            f.write(source.read())
+
+    start = time.monotonic()
+    for offset, stream, text in recording["events"]:
+        if speed > 0:
+            delay = offset / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        # Stamped before the write, so the reader can never appear to be ahead of it
+        now = time.monotonic_ns()
+        os.write(STREAM_FDS[stream], text.encode("latin-1"))
+
+        if trace_path:
+            # One trace entry per completed line, matching how the GUI splits output
+            buffer = partial[stream] + text
+            lines = buffer.replace("\r", "\n").split("\n")
+            partial[stream] = lines.pop()
+            trace.extend([now, stream, line] for line in lines if line.strip())
+
+    if trace_path:
+        with open(trace_path, "a") as f:
+            for entry in trace:
+                f.write(json.dumps(entry) + "\n")
+
+    return recording.get("returncode", 0)
+
+
+# Fake sysfs tree for the programmer monitor
+
+def fake_sysfs(root, unplug=False, port="1-1", vendor="a466", product="0a53"):
+    """Add or remove a programmer's USB device directory under root"""
+    path = os.path.join(root, "bus", "usb", "devices", port)
+    if unplug:
+        for name in ("idVendor", "idProduct"):
+            if os.path.exists(os.path.join(path, name)):
+                os.unlink(os.path.join(path, name))
+        if os.path.isdir(path):
+            os.rmdir(path)
+        return 0
+    os.makedirs(path, exist_ok=True)
+    for name, value in (("idVendor", vendor), ("idProduct", product)):
+        with open(os.path.join(path, name), "w") as f:
+            f.write(value + "\n")
+    return 0
+
+
+# Benchmarks
+
+BENCH_SCENARIOS = {
+    "read": '-p "AT28C256@DIP28" -r "{tmp}/bench_read.bin"',
+    "write": '-p "AT28C256@DIP28" -w "{tmp}/bench_image.bin"',
+    "verify": '-p "AT28C256@DIP28" -m "{tmp}/bench_image.bin"',
+    "list": None,  # Goes through the device list loader instead
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench(options):
+    """Run GUI scenarios against the replay stand-in and print a report"""
+    import tempfile
+    import shutil
+    import tracemalloc
+    import resource
+
+    tmp = tempfile.mkdtemp(prefix="minipro-bench-")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Keep the station's own settings and stores out of the run
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(tmp, "config")
+    os.environ["XDG_DATA_HOME"] = os.path.join(tmp, "data")
+    os.environ["MINIPRO_BINARY"] = os.path.abspath(__file__)
+    os.environ["MINIPRO_REPLAY_SPEED"] = str(options.speed)
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QEventLoop, QTimer
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import minipro_gui
+
+    # Set before the window exists: pooled helpers inherit the environment at spawn
+    trace_path = os.path.join(tmp, "replay.trace")
+    os.environ["MINIPRO_REPLAY_TRACE"] = trace_path
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = minipro_gui.MiniProGUI()
+    with open(os.path.join(tmp, "bench_image.bin"), "wb") as f:
+        f.write(os.urandom(32768))
+
+    # Instance attributes shadow the methods the worker signals connect to; they
+    # are set before the first command creates the (session-long) worker
+    current = {}
+    original_log = minipro_gui.MiniProGUI.log_console
+
+    def log_console(message, color=None):
+        original_log(window, message, color)
+        current["shown"].append((time.monotonic_ns(), message.strip()))
+
+    def command_finished(code):
+        window.command_done = True
+        current["loop"].quit()
+
+    def add_device_batch(devices):
+        minipro_gui.MiniProGUI.add_device_batch(window, devices)
+        current["populated"].append((time.monotonic_ns(), devices[-1]))
+
+    def populate_device_list(count):
+        minipro_gui.MiniProGUI.populate_device_list(window, count)
+        current["loop"].quit()
+
+    window.log_console = log_console
+    window.command_finished = command_finished
+    window.add_device_batch = add_device_batch
+    window.populate_device_list = populate_device_list
+
+    results = []
+    for name in options.scenarios.split(","):
+        name = name.strip()
+        if name not in BENCH_SCENARIOS:
+            print(f"Unknown scenario: {name}", file=sys.stderr)
+            continue
+
+        for run in range(options.rounds):
+            shown = []
+            populated = []
+            loop = QEventLoop()
+            current.update(shown=shown, populated=populated, loop=loop)
+
+            # Event loop stalls: how late a 10 ms heartbeat fires
+            stalls = []
+            last_tick = [time.perf_counter()]
+
+            def tick():
+                now = time.perf_counter()
+                stalls.append(max(0.0, now - last_tick[0] - 0.010))
+                last_tick[0] = now
+
+            heartbeat = QTimer()
+            heartbeat.timeout.connect(tick)
+            heartbeat.start(10)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            if BENCH_SCENARIOS[name] is None:
+                window.start_device_list_load()
+            else:
+                window.run_command(BENCH_SCENARIOS[name].format(tmp=tmp))
+            deadline = QTimer()
+            deadline.setSingleShot(True)
+            deadline.timeout.connect(loop.quit)
+            deadline.start(int(options.timeout * 1000))
+            loop.exec()
+            elapsed = time.perf_counter() - started
+            deadline.stop()
+
+            # devices_loaded fires just before the list thread returns; let it exit
+            if window.device_thread is not None:
+                window.device_thread.wait()
+                app.processEvents()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            heartbeat.stop()
+
+            # Pair each emitted line with the first later console entry showing it
+            latencies = []
+            emitted = []
+            if os.path.exists(trace_path):
+                with open(trace_path) as f:
+                    emitted = [json.loads(line) for line in f]
+                os.remove(trace_path)
+            if populated and emitted:
+                # Device names go to the dropdown in batches; a batch is shown once
+                # its last name has been printed, so time it from that line
+                printed = {}
+                for emitted_ns, _, text in emitted:
+                    printed.setdefault(minipro_gui.parse_device_list_line(text), emitted_ns)
+                latencies.extend((shown_ns - printed[last]) / 1e6
+                                 for shown_ns, last in populated if last in printed)
+            else:
+                cursor = 0
+                for emitted_ns, _, text in emitted:
+                    text = text.strip()
+                    for index in range(cursor, len(shown)):
+                        if shown[index][1] == text:
+                            latencies.append((shown[index][0] - emitted_ns) / 1e6)
+                            cursor = index + 1
+                            break
+
+            spawns = [ms for samples in window.backend.spawn_times.values() for ms in samples]
+            window.backend.spawn_times.clear()
+
+            results.append({
+                "scenario": name,
+                "run": run,
+                "elapsed_s": round(elapsed, 4),
+                "lines": len(emitted),
+                "spawn_ms": round(spawns[-1], 3) if spawns else 0.0,
+                "latency_p50_ms": round(percentile(latencies, 0.50), 3),
+                "latency_p99_ms": round(percentile(latencies, 0.99), 3),
+                "stall_max_ms": round(max(stalls, default=0.0) * 1000, 3),
+                "py_peak_kib": peak // 1024,
+                "rss_max_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            })
+
+    window.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        header = ("scenario", "run", "elapsed_s", "lines", "spawn_ms", "latency_p50_ms",
+                  "latency_p99_ms", "stall_max_ms", "py_peak_kib", "rss_max_kib")
+        print("  ".join(f"{h:>14}" for h in header))
+        for row in results:
+            print("  ".join(f"{row[h]!s:>14}" for h in header))
+    return 0
+
+
+# Soak test
+
+SOAK_STAND_IN = """#!/bin/sh
+# Minimal minipro stand-in for soak runs: a few output lines, no delays
+case "$*" in
+    *-E*) echo "Erasing... FAILED" >&2; echo "Error: erase failed" >&2; exit 1 ;;
+    *-D*) echo "Chip ID: 0x1E35  OK" ;;
+    *) echo "Reading Code...  OK" >&2; echo "Verification OK" ;;
+esac
+"""
+
+SOAK_COMMANDS = [
+    '-p "AT28C256@DIP28" -m "{tmp}/soak_image.bin"',
+    '-p "AT28C256@DIP28" -D',
+    '-p "AT28C256@DIP28" -b',
+    '-p "AT28C256@DIP28" -E',
+]
+
+
+def process_usage():
+    """Resident memory (KiB), thread count and open descriptors of this process, from /proc"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident = int(f.read().split()[1])
+        return {"rss_kib": resident * os.sysconf("SC_PAGE_SIZE") // 1024,
+                "threads": len(os.listdir("/proc/self/task")),
+                "fds": len(os.listdir("/proc/self/fd"))}
+    except OSError:
+        return None
+
+
+def soak(options):
+    """Run many short commands through the GUI and check resource use stays flat"""
+    import tempfile
+    import shutil
+    import gc
+
+    if process_usage() is None:
+        print("soak needs /proc (Linux)", file=sys.stderr)
+        return 2
+    tmp = tempfile.mkdtemp(prefix="minipro-soak-")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Keep the station's own settings, logs and image store out of the run
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(tmp, "config")
+    os.environ["XDG_DATA_HOME"] = os.path.join(tmp, "data")
+    os.environ["MINIPRO_REPLAY_SPEED"] = "0"
+    if options.stand_in == "replay":
+        os.environ["MINIPRO_BINARY"] = os.path.abspath(__file__)
+    else:
+        stand_in = os.path.join(tmp, "minipro-soak.sh")
+        with open(stand_in, "w") as f:
+            f.write(SOAK_STAND_IN)
+        os.chmod(stand_in, 0o755)
+        os.environ["MINIPRO_BINARY"] = stand_in
+    with open(os.path.join(tmp, "soak_image.bin"), "wb") as f:
+        f.write(bytes(32768))
+
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    from PyQt6.QtCore import QTimer
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import minipro_gui
+
+    # A dialog would block the run
+    QMessageBox.warning = QMessageBox.critical = staticmethod(lambda *args, **kwargs: None)
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = minipro_gui.MiniProGUI()
+    # Bound the console and its line index as a burn-in does, so any growth
+    # left in the samples is a leak (including one in the index itself)
+    window.console.document().setMaximumBlockCount(minipro_gui.BURNIN_CONSOLE_LINES)
+    window.console_log.limit = minipro_gui.BURNIN_CONSOLE_LINES
+    samples = []
+    state = {"done": 0, "failed": 0, "started": time.perf_counter()}
+
+    def sample():
+        gc.collect()
+        usage = process_usage()
+        usage.update(ops=state["done"], seconds=round(time.perf_counter() - state["started"], 1))
+        samples.append(usage)
+        if not options.json:
+            print(f"{usage['ops']:>8} ops  {usage['seconds']:>8}s  rss {usage['rss_kib']:>8} KiB  "
+                  f"threads {usage['threads']:>3}  fds {usage['fds']:>4}", flush=True)
+
+    def finished(returncode):
+        state["done"] += 1
+        state["failed"] += returncode != 0
+        if state["done"] == options.warmup or (state["done"] > options.warmup and
+                                               (state["done"] - options.warmup) % options.sample == 0):
+            sample()
+        if state["done"] >= options.count:
+            app.quit()
+        else:
+            QTimer.singleShot(0, next_command)
+
+    def next_command():
+        command = SOAK_COMMANDS[state["done"] % len(SOAK_COMMANDS)].format(tmp=tmp)
+        if not window.run_command(command, on_finished=finished):
+            print(f"command refused after {state['done']} ops", file=sys.stderr)
+            app.quit()
+
+    QTimer.singleShot(0, next_command)
+    app.exec()
+    if state["done"] < options.count or options.count <= options.warmup:
+        sample()
+    window.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    first, last = samples[0], samples[-1]
+    growth = {key: last[key] - first[key] for key in ("rss_kib", "threads", "fds")}
+    flat = (growth["threads"] <= 0 and growth["fds"] <= 0
+            and growth["rss_kib"] <= options.rss_slack * 1024)
+    report = {"ops": state["done"], "failed": state["failed"], "growth": growth,
+              "flat": flat, "samples": samples}
+    if options.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{state['done']} ops ({state['failed']} failed) after warm-up of "
+              f"{options.warmup}: rss {growth['rss_kib']:+} KiB, threads {growth['threads']:+}, "
+              f"fds {growth['fds']:+} -> {'flat' if flat else 'GROWING'}")
+    return 0 if flat and state["done"] >= options.count else 1
+
+
+def main():
+    argv = sys.argv[1:]
+
+    if argv[:1] == ["record"]:
+        parser = argparse.ArgumentParser(prog="minipro_replay.py record",
+                                         usage="%(prog)s [--out DIR] -- minipro ARGS...")
+        parser.add_argument("--out", default="recordings", help="directory for recordings")
+        split = argv.index("--") if "--" in argv else len(argv)
+        options = parser.parse_args(argv[1:split])
+        command = argv[split + 1:]
+        if not command:
+            parser.error("no command to record")
+        return record(command, options.out)
+
+    if argv[:1] == ["sysfs"]:
+        parser = argparse.ArgumentParser(prog="minipro_replay.py sysfs")
+        parser.add_argument("root", help="fake sysfs root (MINIPRO_SYSFS_ROOT)")
+        parser.add_argument("--unplug", action="store_true", help="remove the programmer")
+        parser.add_argument("--port", default="1-1", help="USB port name")
+        options = parser.parse_args(argv[1:])
+        return fake_sysfs(options.root, options.unplug, options.port)
+
+    if argv[:1] == ["bench"]:
+        parser = argparse.ArgumentParser(prog="minipro_replay.py bench")
+        parser.add_argument("--scenarios", default="read,write,verify,list")
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--speed", type=float, default=1.0,
+                            help="replay time scale (0 = as fast as possible)")
+        parser.add_argument("--timeout", type=float, default=60.0)
+        parser.add_argument("--json", action="store_true", help="print results as JSON")
+        return bench(parser.parse_args(argv[1:]))
+
+    if argv[:1] == ["soak"]:
+        parser = argparse.ArgumentParser(prog="minipro_replay.py soak")
+        parser.add_argument("--count", type=int, default=10000, help="commands to run")
+        parser.add_argument("--warmup", type=int, default=200,
+                            help="commands run before the baseline sample")
+        parser.add_argument("--sample", type=int, default=1000, help="commands between samples")
+        parser.add_argument("--stand-in", choices=("shell", "replay"), default="shell",
+                            help="minipro stand-in: a tiny shell script, or this replay script")
+        parser.add_argument("--rss-slack", type=float, default=8.0,
+                            help="resident memory growth allowed, in MiB")
+        parser.add_argument("--json", action="store_true", help="print results as JSON")
+        return soak(parser.parse_args(argv[1:]))
+
+    return replay(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())